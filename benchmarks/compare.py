@@ -0,0 +1,221 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from scipy.stats import mannwhitneyu
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = REPO_DIR / "data" / "bench" / "baseline.json"
+
+# Сценарии гейта: бенчмарк и его аргументы. Небольшие, чтобы повторы укладывались в минуты
+SCENARIOS: Dict[str, List[str]] = {
+    "e2e_single_column": ["e2e.py", "--documents", "4", "--pages", "4", "--columns", "1"],
+    "e2e_two_columns": ["e2e.py", "--documents", "4", "--pages", "4", "--columns", "2"],
+    "e2e_parallel": ["e2e.py", "--documents", "6", "--pages", "3", "--workers", "2"],
+    "reading_order": ["reading_order.py", "--pages", "30"],
+}
+
+# Метрики меньше этого (секунды; для порядка чтения — мс) не гейтятся: шум больше эффекта
+MIN_GATED_SECONDS = 0.005
+
+# При 3 повторах наименьшее одностороннее p U-критерия — 1/20 = 0.05: регрессия
+# не обнаруживается ни при каком росте. С 4 повторов минимум 1/70
+MIN_REPEATS = 4
+
+Samples = Dict[str, List[float]]
+
+
+class BenchmarkRunError(Exception):
+    pass
+
+
+def run_scenario_once(scenario: str) -> Dict:
+    """Один прогон сценария в отдельном интерпретаторе: состояние и RSS не переносятся."""
+    script, *args = SCENARIOS[scenario]
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "report.json"
+        proc = subprocess.run(
+            [sys.executable, str(REPO_DIR / "benchmarks" / script), *args, "--output", str(output)],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0 or not output.exists():
+            raise BenchmarkRunError(f"{scenario} failed: {proc.stderr.strip()[-500:]}")
+        return json.loads(output.read_text(encoding="utf-8"))
+
+
+def extract_metrics(report: Dict) -> Dict[str, float]:
+    """Скалярные метрики прогона в секундах (для порядка чтения — мс на страницу)."""
+    if report["benchmark"] == "reading_order":
+        return {
+            f"{scenario}/{strategy}_ms_per_page": result["ms_per_page_median"]
+            for scenario, data in report["scenarios"].items()
+            for strategy, result in data["strategies"].items()
+        }
+    if report["documents"]["failed"]:
+        raise BenchmarkRunError(f"{report['documents']['failed']} documents failed")
+    metrics = {f"{phase}_s": data["seconds"] for phase, data in report["phases"].items()}
+    metrics["end_to_end_s"] = report["end_to_end"]["seconds"]
+    metrics.update(
+        {f"stage/{name}_s": stats["total_s"] for name, stats in report["stages"].items()}
+    )
+    return metrics
+
+
+def collect_samples(scenario: str, repeats: int) -> Samples:
+    samples: Samples = {}
+    for _ in range(repeats):
+        for name, value in extract_metrics(run_scenario_once(scenario)).items():
+            samples.setdefault(name, []).append(value)
+    return samples
+
+
+def compare_samples(
+    baseline: Sequence[float], current: Sequence[float], threshold: float, alpha: float
+) -> Dict:
+    """
+    Регрессия: медиана выросла больше чем на threshold и рост значим
+    (односторонний U-критерий Манна-Уитни, p < alpha). Улучшение — симметрично.
+    """
+    base_median, current_median = statistics.median(baseline), statistics.median(current)
+    if base_median:
+        ratio = current_median / base_median
+    else:
+        # Нулевая эталонная медиана: отношение не определено (None), 0 -> 0 — без изменений
+        ratio = None if current_median else 1.0
+    slower = mannwhitneyu(current, baseline, alternative="greater").pvalue
+    faster = mannwhitneyu(current, baseline, alternative="less").pvalue
+
+    status = "ok"
+    if max(base_median, current_median) >= MIN_GATED_SECONDS:
+        if (ratio is None or ratio > 1 + threshold) and slower < alpha:
+            status = "regression"
+        elif ratio is not None and ratio < 1 - threshold and faster < alpha:
+            status = "improvement"
+    return {
+        "baseline_median": round(base_median, 6),
+        "current_median": round(current_median, 6),
+        "ratio": round(ratio, 3) if ratio is not None else None,
+        "p_value": round(float(min(slower, faster)), 4),
+        "status": status,
+    }
+
+
+def compare_scenario(baseline: Samples, current: Samples, threshold: float, alpha: float) -> Dict:
+    diff = {}
+    for name in sorted(set(baseline) | set(current)):
+        if name not in baseline or name not in current:
+            diff[name] = {"status": "new" if name in current else "missing"}
+        else:
+            diff[name] = compare_samples(baseline[name], current[name], threshold, alpha)
+    return diff
+
+
+def format_diff(report: Dict) -> str:
+    lines = []
+    for scenario, diff in report["scenarios"].items():
+        lines.append(f"== {scenario}")
+        for name, row in diff.items():
+            if "ratio" not in row:
+                lines.append(f"  {name:<45} {row['status']}")
+                continue
+            lines.append(
+                f"  {name:<45} {row['baseline_median']:>10.4f} -> {row['current_median']:>10.4f}"
+                f"  x{str(row['ratio']):<6} p={row['p_value']:<7} {row['status']}"
+            )
+    return "\n".join(lines)
+
+
+def load_baseline(path: Path) -> Dict[str, Samples]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))["scenarios"]
+
+
+def record(scenarios: Sequence[str], repeats: int, path: Path) -> None:
+    """Записывает (или обновляет по сценариям) эталонные выборки."""
+    stored = load_baseline(path)
+    for scenario in scenarios:
+        stored[scenario] = collect_samples(scenario, repeats)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps({"python": sys.version.split()[0], "scenarios": stored}, indent=2),
+        encoding="utf-8",
+    )
+
+
+def compare(
+    scenarios: Sequence[str], repeats: int, path: Path, threshold: float, alpha: float
+) -> Dict:
+    stored = load_baseline(path)
+    missing = [scenario for scenario in scenarios if scenario not in stored]
+    if missing:
+        raise BenchmarkRunError(f"No baseline for {missing}: run `record` first")
+    short = [
+        scenario
+        for scenario in scenarios
+        if any(len(values) < MIN_REPEATS for values in stored[scenario].values())
+    ]
+    if short:
+        raise BenchmarkRunError(
+            f"Baseline for {short} has fewer than {MIN_REPEATS} repeats: record it again"
+        )
+
+    report = {"threshold": threshold, "alpha": alpha, "repeats": repeats, "scenarios": {}}
+    for scenario in scenarios:
+        current = collect_samples(scenario, repeats)
+        report["scenarios"][scenario] = compare_scenario(
+            stored[scenario], current, threshold, alpha
+        )
+    report["regressions"] = [
+        f"{scenario}: {name}"
+        for scenario, diff in report["scenarios"].items()
+        for name, row in diff.items()
+        if row["status"] == "regression"
+    ]
+    return report
+
+
+def repeats_arg(value: str) -> int:
+    repeats = int(value)
+    if repeats < MIN_REPEATS:
+        raise argparse.ArgumentTypeError(
+            f"at least {MIN_REPEATS} repeats are needed for a significant difference"
+        )
+    return repeats
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Performance regression gate.")
+    parser.add_argument("command", choices=("record", "compare"))
+    parser.add_argument("--scenario", action="append", dest="scenarios", choices=SCENARIOS)
+    parser.add_argument("--repeats", type=repeats_arg, default=5)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.10, help="Допустимый рост медианы.")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--output", type=Path, help="JSON-отчет сравнения.")
+    args = parser.parse_args(argv)
+    scenarios = args.scenarios or list(SCENARIOS)
+
+    if args.command == "record":
+        record(scenarios, args.repeats, args.baseline)
+        print(f"Baseline for {', '.join(scenarios)} written to {args.baseline}")
+        return
+
+    report = compare(scenarios, args.repeats, args.baseline, args.threshold, args.alpha)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(format_diff(report))
+    if report["regressions"]:
+        print("Regressions:\n" + "\n".join(report["regressions"]), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+import argparse
+import json
+import logging
+import random
+import re
+import resource
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image, ImageDraw, ImageFont  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+from benchmarks.layouts import A4_HEIGHT_PT, A4_WIDTH_PT, generate_page_layout  # noqa: E402
+from src.config import JsonFormatter, config_provider  # noqa: E402
+from src.database.engine import create_db_engine  # noqa: E402
+from src.database.models import Base  # noqa: E402
+from src.entities import ContentType  # noqa: E402
+from src.recognizers.base_recognizer import BaseRecognizer  # noqa: E402
+from src.utils.coordinates import POINTS_PER_INCH  # noqa: E402
+from src.utils.reading_order import get_xy_cut_order  # noqa: E402
+from src.utils.timing import read_spans, summarize_spans  # noqa: E402
+from src.workflows import recognize_fragments  # noqa: E402
+from src.workflows.process_pdf import process_bulk_pdf  # noqa: E402
+
+settings = config_provider.get_settings()
+
+WORDS = (
+    "документ страница текст распознавание государственный архив приказ отчет таблица "
+    "министерство область район год сведения порядок работы данные номер комиссия решение "
+    "управление заявление выписка протокол заседания председатель секретарь утвердить"
+).split()
+
+STUB_RECOGNIZER = "stub"
+
+
+def _load_font(size: int, font_path: Optional[str]) -> ImageFont.ImageFont:
+    for candidate in filter(None, (font_path, "DejaVuSans.ttf")):
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def random_line(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def generate_pdf(
+    path: Path,
+    pages: int,
+    rng: random.Random,
+    layout_kwargs: Dict,
+    scan_dpi: int,
+    font_path: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Синтетический "скан": страницы A4 с кириллическим текстом в блоках разметки,
+    сохраненные в PDF как серые изображения. Возвращает эталонную разметку (RawFragment).
+    """
+    scale = scan_dpi / POINTS_PER_INCH
+    size = (round(A4_WIDTH_PT * scale), round(A4_HEIGHT_PT * scale))
+    images, raw_fragments = [], []
+    for page_number in range(1, pages + 1):
+        image = Image.new("L", size, 255)
+        draw = ImageDraw.Draw(image)
+        for box in generate_page_layout(rng, **layout_kwargs):
+            line_height = (box.bottom - box.top) / box.lines
+            font = _load_font(max(8, int(line_height * scale * 0.7)), font_path)
+            lines = [random_line(rng, rng.randint(3, 8)) for _ in range(box.lines)]
+            for index, line in enumerate(lines):
+                position = (box.left * scale, (box.top + index * line_height) * scale)
+                draw.text(position, line, fill=0, font=font)
+            raw_fragments.append(
+                {
+                    "left": box.left,
+                    "top": box.top,
+                    "width": box.right - box.left,
+                    "height": box.bottom - box.top,
+                    "page_number": page_number,
+                    "page_width": A4_WIDTH_PT,
+                    "page_height": A4_HEIGHT_PT,
+                    "type": box.content_type.value,
+                    "text": "\n".join(lines),
+                }
+            )
+        images.append(image)
+
+    images[0].save(path, save_all=True, append_images=images[1:], resolution=scan_dpi)
+    path.with_suffix(".layout.json").write_text(
+        json.dumps(raw_fragments, ensure_ascii=False), encoding="utf-8"
+    )
+    return raw_fragments
+
+
+class StubLayoutAnalyzer:
+    """
+    HTTP-заглушка контейнера анализа разметки: на POST с PDF отдает эталонную
+    разметку из {stem}.layout.json рядом с PDF, с задержкой ms_per_page на страницу.
+    """
+
+    def __init__(self, pdf_dir: Path, ms_per_page: float):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                match = re.search(rb'filename="([^"]+)"', body)
+                stem = Path(match.group(1).decode()).stem if match else ""
+                layout = pdf_dir / f"{stem}.layout.json"
+                if not layout.exists():
+                    self.send_error(404)
+                    return
+                payload = layout.read_bytes()
+                pages = max(f["page_number"] for f in json.loads(payload))
+                time.sleep(stub.ms_per_page * pages / 1000)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.ms_per_page = ms_per_page
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self) -> "StubLayoutAnalyzer":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+
+
+class StubRecognizer(BaseRecognizer):
+    """Распознаватель без модели: задержка base_ms + ms_per_mpx на мегапиксель изображения."""
+
+    recognizer_type = STUB_RECOGNIZER
+    supports_composites = True
+
+    def __init__(self, base_ms: float, ms_per_mpx: float):
+        self.base_ms = base_ms
+        self.ms_per_mpx = ms_per_mpx
+
+    def recognize(
+        self,
+        image: Image.Image,
+        content_type: Optional[ContentType] = None,
+        prompt: Optional[str] = None,
+    ) -> Optional[str]:
+        time.sleep((self.base_ms + self.ms_per_mpx * image.width * image.height / 1e6) / 1000)
+        return random_line(random.Random(image.width * image.height), 5)
+
+
+def peak_rss_mb() -> Dict[str, float]:
+    # ru_maxrss в Linux — килобайты; children — максимум среди завершенных воркеров
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+    }
+
+
+def throughput(seconds: float, pages: int, fragments: int) -> Dict[str, float]:
+    return {
+        "seconds": round(seconds, 3),
+        "pages_per_s": round(pages / seconds, 3) if seconds else 0.0,
+        "fragments_per_s": round(fragments / seconds, 3) if seconds else 0.0,
+    }
+
+
+def run_benchmark(args: argparse.Namespace, workdir: Path) -> Dict:
+    pdf_dir, image_dir, log_file = workdir / "pdfs", workdir / "images", workdir / "bench.log"
+    pdf_dir.mkdir(parents=True, exist_ok=True)
+    settings.PDF_INPUT_DIR, settings.IMAGE_OUTPUT_DIR = pdf_dir, image_dir
+
+    rng = random.Random(args.seed)
+    layout_kwargs = {"columns": args.columns, "paragraphs_per_column": args.paragraphs}
+    start = time.perf_counter()
+    pdf_files, fragments = [], 0
+    for index in range(args.documents):
+        pdf_path = pdf_dir / f"doc_{index:04d}.pdf"
+        fragments += len(
+            generate_pdf(pdf_path, args.pages, rng, layout_kwargs, args.scan_dpi, args.font)
+        )
+        pdf_files.append(pdf_path)
+    generate_s = time.perf_counter() - start
+    pages = args.documents * args.pages
+
+    # Все записи (в том числе из процессов-воркеров) идут в один JSON-лог прогона
+    base_logger = config_provider.get_base_logger()
+    saved_handlers, saved_level = base_logger.handlers[:], base_logger.level
+    handler = logging.FileHandler(log_file, encoding="utf-8")
+    handler.setFormatter(JsonFormatter())
+    base_logger.handlers = [handler]
+    base_logger.setLevel(logging.INFO)
+
+    recognize_fragments.RECOGNIZER_FACTORIES[STUB_RECOGNIZER] = lambda: StubRecognizer(
+        args.recognizer_ms, args.recognizer_ms_per_mpx
+    )
+    settings.RECOGNIZER_ALLOWED_TYPES[STUB_RECOGNIZER] = settings.RECOGNIZER_ALLOWED_TYPES["text"]
+    logger = config_provider.get_logger("benchmark")
+    engine = create_db_engine(f"sqlite:///{workdir / 'bench.db'}")
+    Base.metadata.create_all(engine)
+    try:
+        with StubLayoutAnalyzer(pdf_dir, args.analyzer_ms_per_page) as analyzer:
+            settings.LAYOUT_ANALYZER_URL = analyzer.url
+            with Session(engine) as session:
+                start = time.perf_counter()
+                results = process_bulk_pdf(
+                    pdf_files=pdf_files,
+                    output_dir=image_dir,
+                    dpi=args.dpi,
+                    session=session,
+                    order_strategy=get_xy_cut_order,
+                    logger=logger,
+                    workers=args.workers,
+                )
+                ingest_s = time.perf_counter() - start
+
+                documents = [result.document for result in results if result.document]
+                start = time.perf_counter()
+                if not args.skip_recognition:
+                    recognize_fragments.recognize_bulk_fragments(
+                        documents, session, logger, recognizer_type=STUB_RECOGNIZER
+                    )
+                recognize_s = time.perf_counter() - start
+    finally:
+        handler.close()
+        base_logger.handlers, base_logger.level = saved_handlers, saved_level
+
+    with open(log_file, encoding="utf-8") as lines:
+        stages = summarize_spans(read_spans(lines))
+    return {
+        "benchmark": "e2e",
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "documents": {
+            "total": args.documents,
+            "succeeded": len(documents),
+            "failed": args.documents - len(documents),
+        },
+        "pages": pages,
+        "fragments": fragments,
+        "generate_s": round(generate_s, 3),
+        "phases": {
+            "ingest": throughput(ingest_s, pages, fragments),
+            "recognize": throughput(recognize_s, pages, fragments),
+        },
+        "end_to_end": throughput(ingest_s + recognize_s, pages, fragments),
+        "stages": stages,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="End-to-end throughput on synthetic PDFs with stub analyzer and recognizer."
+    )
+    parser.add_argument("--documents", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=5, help="Страниц в документе.")
+    parser.add_argument("--columns", type=int, default=2)
+    parser.add_argument("--paragraphs", type=int, default=5, help="Абзацев в колонке.")
+    parser.add_argument("--scan-dpi", type=int, default=100, help="DPI изображений внутри PDF.")
+    parser.add_argument("--dpi", type=int, default=150, help="DPI растеризации пайплайном.")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--analyzer-ms-per-page", type=float, default=50.0)
+    parser.add_argument("--recognizer-ms", type=float, default=20.0)
+    parser.add_argument("--recognizer-ms-per-mpx", type=float, default=100.0)
+    parser.add_argument("--skip-recognition", action="store_true")
+    parser.add_argument("--font", help="TTF-шрифт с кириллицей (по умолчанию DejaVuSans).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", type=Path, help="Каталог прогона (по умолчанию временный).")
+    parser.add_argument("--output", type=Path)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.workdir:
+        report = run_benchmark(args, args.workdir)
+    else:
+        with tempfile.TemporaryDirectory(prefix="pdf2text-bench-") as workdir:
+            report = run_benchmark(args, Path(workdir))
+
+    output = json.dumps(report, ensure_ascii=False, indent=2, default=str)
+    if args.output:
+        args.output.write_text(output, encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
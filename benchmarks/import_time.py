@@ -0,0 +1,116 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = (
+    "main",
+    "src.workflows.process_pdf",
+    "src.workflows.recognize_fragments",
+    "src.utils.reading_order",
+    "src.recognizers.text_recognizer",
+    "src.recognizers.formula_recognizer",
+)
+
+HEAVY_MODULES = ("torch", "transformers", "qwen_vl_utils", "sklearn", "pix2text", "onnxruntime")
+
+PROBE_TEMPLATE = """
+import importlib, json, resource, sys, time
+start = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "import_s": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "heavy_modules": sorted(m for m in {heavy!r} if m in sys.modules),
+}}))
+"""
+
+
+class ImportProbeError(Exception):
+    pass
+
+
+def probe_import(module: str) -> Dict:
+    """Импортирует модуль в чистом интерпретаторе и возвращает замеры одного запуска."""
+    code = PROBE_TEMPLATE.format(module=module, heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_DIR, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise ImportProbeError(f"Import of {module} failed: {proc.stderr.strip()[-500:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["wall_s"] = wall
+    return result
+
+
+def measure_entry_point(module: str, repeats: int) -> Dict:
+    runs = [probe_import(module) for _ in range(repeats)]
+    import_times = [run["import_s"] for run in runs]
+    wall_times = [run["wall_s"] for run in runs]
+    return {
+        "import_s_median": statistics.median(import_times),
+        "import_s_min": min(import_times),
+        "wall_s_median": statistics.median(wall_times),
+        "max_rss_mb": max(run["max_rss_kb"] for run in runs) / 1024,
+        "heavy_modules": runs[-1]["heavy_modules"],
+    }
+
+
+def run_benchmark(entry_points: Sequence[str], repeats: int) -> Dict:
+    results = {}
+    for module in entry_points:
+        try:
+            results[module] = measure_entry_point(module, repeats)
+        except ImportProbeError as e:
+            results[module] = {"error": str(e)}
+    return {
+        "benchmark": "import_time",
+        "python": sys.version.split()[0],
+        "repeats": repeats,
+        "entry_points": results,
+    }
+
+
+def find_heavy_imports(report: Dict) -> List[str]:
+    return [
+        f"{module}: {', '.join(result['heavy_modules'])}"
+        for module, result in report["entry_points"].items()
+        if result.get("heavy_modules")
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import latency per entry point.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--module", action="append", dest="modules", help="Entry point module")
+    parser.add_argument("--output", type=Path, help="Write JSON report to this file")
+    parser.add_argument(
+        "--fail-on-heavy",
+        action="store_true",
+        help="Exit with code 1 if any entry point imports heavy ML dependencies",
+    )
+    args = parser.parse_args()
+
+    report = run_benchmark(args.modules or ENTRY_POINTS, args.repeats)
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(output, encoding="utf-8")
+    print(output)
+
+    heavy = find_heavy_imports(report)
+    if args.fail_on_heavy and heavy:
+        print("Heavy modules imported at startup:\n" + "\n".join(heavy), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import random
+from dataclasses import dataclass
+from typing import List, Optional
+from src.entities import ContentType
+
+A4_WIDTH_PT = 595.0
+A4_HEIGHT_PT = 842.0
+
+
+@dataclass
+class LayoutBox:
+    """Прямоугольник синтетической разметки в пунктах (pt), в эталонном порядке чтения."""
+
+    left: float
+    top: float
+    right: float
+    bottom: float
+    content_type: ContentType
+    lines: int = 1
+    text: Optional[str] = None
+
+
+def generate_page_layout(
+    rng: random.Random,
+    columns: int = 2,
+    paragraphs_per_column: int = 4,
+    with_title: bool = True,
+    with_header: bool = True,
+    with_footer: bool = True,
+    line_height: float = 14.0,
+    margin: float = 50.0,
+    gutter: float = 20.0,
+) -> List[LayoutBox]:
+    """Генерирует разметку страницы A4: колонтитулы, заголовок и абзацы по колонкам."""
+    boxes: List[LayoutBox] = []
+    content_right = A4_WIDTH_PT - margin
+    top = margin
+
+    if with_header:
+        boxes.append(
+            LayoutBox(margin, 20.0, margin + 200.0, 20.0 + line_height, ContentType.PAGE_HEADER)
+        )
+    if with_title:
+        boxes.append(
+            LayoutBox(margin, top, content_right, top + 2 * line_height, ContentType.TITLE)
+        )
+        top += 2 * line_height + 16.0
+
+    footer_top = A4_HEIGHT_PT - 20.0 - line_height
+    body_bottom = footer_top - 20.0
+    column_width = (content_right - margin - gutter * (columns - 1)) / columns
+    for column in range(columns):
+        left = margin + column * (column_width + gutter)
+        cursor = top
+        for _ in range(paragraphs_per_column):
+            lines = rng.randint(1, 10)
+            height = lines * line_height
+            if cursor + height > body_bottom:
+                break
+            content_type = ContentType.LIST_ITEM if lines == 1 else ContentType.TEXT
+            boxes.append(
+                LayoutBox(left, cursor, left + column_width, cursor + height, content_type, lines)
+            )
+            cursor += height + rng.uniform(6.0, 14.0)
+
+    if with_footer:
+        boxes.append(
+            LayoutBox(
+                A4_WIDTH_PT / 2 - 10.0,
+                footer_top,
+                A4_WIDTH_PT / 2 + 10.0,
+                footer_top + line_height,
+                ContentType.PAGE_FOOTER,
+            )
+        )
+    return boxes
@@ -0,0 +1,131 @@
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+from benchmarks.layouts import generate_page_layout  # noqa: E402
+from src.entities import Fragment  # noqa: E402
+from src.utils.coordinates import POINTS_PER_INCH  # noqa: E402
+from src.utils.reading_order import ReadingOrderService, get_xy_cut_order  # noqa: E402
+
+SCENARIOS = {
+    "single_column": {"columns": 1, "paragraphs_per_column": 8},
+    "two_columns": {"columns": 2, "paragraphs_per_column": 5},
+    "three_columns": {"columns": 3, "paragraphs_per_column": 4},
+}
+
+Page = Tuple[List[Fragment], List[int]]
+
+
+def kendall_tau(order_a: Sequence[int], order_b: Sequence[int]) -> float:
+    """Согласие двух перестановок одних и тех же индексов: 1 — совпадают, -1 — обратны."""
+    n = len(order_a)
+    if n < 2:
+        return 1.0
+    rank_b = {item: rank for rank, item in enumerate(order_b)}
+    ranks = [rank_b[item] for item in order_a]
+    concordant = sum(1 if ranks[i] < ranks[j] else -1 for i in range(n) for j in range(i + 1, n))
+    return concordant / (n * (n - 1) / 2)
+
+
+def build_page(rng: random.Random, dpi: int, layout_kwargs: Dict) -> Page:
+    """Фрагменты страницы в перемешанном порядке и эталонный порядок чтения (индексы)."""
+    scale = dpi / POINTS_PER_INCH
+    layout = generate_page_layout(rng, **layout_kwargs)
+    shuffled = list(range(len(layout)))
+    rng.shuffle(shuffled)
+    fragments = [
+        Fragment(
+            fragment_id=None,
+            page_id=None,
+            page_number=1,
+            content_type=layout[i].content_type,
+            order_number=None,
+            left=layout[i].left * scale,
+            top=layout[i].top * scale,
+            width=layout[i].right * scale,
+            height=layout[i].bottom * scale,
+            text=None,
+        )
+        for i in shuffled
+    ]
+    position = {original: index for index, original in enumerate(shuffled)}
+    return fragments, [position[i] for i in range(len(layout))]
+
+
+def measure_strategy(strategy: Callable[[List[Fragment]], List[int]], pages: List[Page]) -> Dict:
+    timings, taus, orders = [], [], []
+    for fragments, truth in pages:
+        start = time.perf_counter()
+        order = list(strategy(fragments))
+        timings.append((time.perf_counter() - start) * 1000)
+        taus.append(kendall_tau(order, truth))
+        orders.append(order)
+    return {
+        "ms_per_page_median": statistics.median(timings),
+        "ms_per_page_max": max(timings),
+        "exact_match_rate": sum(tau == 1.0 for tau in taus) / len(taus),
+        "kendall_tau_mean": statistics.fmean(taus),
+        "orders": orders,
+    }
+
+
+def run_scenario(name: str, pages_count: int, dpi: int, seed: int) -> Dict:
+    rng = random.Random(seed)
+    pages = [build_page(rng, dpi, SCENARIOS[name]) for _ in range(pages_count)]
+    service = ReadingOrderService()
+    strategies = {
+        "kmeans": service.get_reading_order,
+        "xy_cut": get_xy_cut_order,
+    }
+    kmeans_fits = [
+        service._estimate_clusters(np.array([service.center(f) for f in fragments])) > 1
+        for fragments, _ in pages
+    ]
+    results = {key: measure_strategy(strategy, pages) for key, strategy in strategies.items()}
+    agreement = [
+        kendall_tau(a, b) for a, b in zip(results["kmeans"]["orders"], results["xy_cut"]["orders"])
+    ]
+    for result in results.values():
+        del result["orders"]
+    return {
+        "pages": pages_count,
+        "strategies": results,
+        "kmeans_vs_xy_cut_tau_mean": statistics.fmean(agreement),
+        "kmeans_fit_rate": sum(kmeans_fits) / len(pages),
+        "speedup": results["kmeans"]["ms_per_page_median"]
+        / max(results["xy_cut"]["ms_per_page_median"], 1e-9),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KMeans vs XY-cut reading order.")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scenario", action="append", dest="scenarios", choices=SCENARIOS)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    report = {
+        "benchmark": "reading_order",
+        "scenarios": {
+            name: run_scenario(name, args.pages, args.dpi, args.seed)
+            for name in args.scenarios or SCENARIOS
+        },
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(output, encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
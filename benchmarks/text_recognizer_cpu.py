@@ -0,0 +1,108 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image  # noqa: E402
+from src.recognizers import text_recognizer  # noqa: E402
+from src.recognizers.text_recognizer import CPU_MODES, TextRecognizer  # noqa: E402
+
+IMAGE_SUFFIXES = (".png", ".webp", ".jpg", ".jpeg")
+
+
+def levenshtein(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            )
+        previous = current
+    return previous[-1]
+
+
+def character_error_rate(reference: str, hypothesis: str) -> float:
+    if not reference:
+        return float(bool(hypothesis))
+    return levenshtein(reference, hypothesis) / len(reference)
+
+
+def load_fragment_set(fragments_dir: Path, limit: Optional[int] = None) -> List[Tuple[Path, str]]:
+    """
+    Набор фрагментов: изображение и эталонный текст с тем же именем (frag.png + frag.txt).
+    """
+    images = sorted(p for p in fragments_dir.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    fragment_set = [
+        (image, image.with_suffix(".txt").read_text(encoding="utf-8").strip())
+        for image in images
+        if image.with_suffix(".txt").exists()
+    ]
+    return fragment_set[:limit] if limit else fragment_set
+
+
+def run_mode(cpu_mode: str, fragment_set: Sequence[Tuple[Path, str]]) -> Dict:
+    text_recognizer.unload_model()
+    start = time.perf_counter()
+    text_recognizer.load_model(cpu_mode=cpu_mode)
+    load_s = time.perf_counter() - start
+
+    recognizer = TextRecognizer()
+    latencies, errors = [], []
+    for image_path, reference in fragment_set:
+        with Image.open(image_path) as image:
+            image.load()
+            start = time.perf_counter()
+            hypothesis = recognizer.recognize(image) or ""
+        latencies.append(time.perf_counter() - start)
+        errors.append(character_error_rate(reference, hypothesis))
+
+    return {
+        "effective_mode": text_recognizer._cpu_mode,
+        "load_s": load_s,
+        "latency_s_median": statistics.median(latencies),
+        "latency_s_p90": (
+            statistics.quantiles(latencies, n=10)[-1] if len(latencies) > 1 else latencies[0]
+        ),
+        "latency_s_total": sum(latencies),
+        "cer_mean": statistics.fmean(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy vs latency of CPU inference modes.")
+    parser.add_argument("fragments_dir", type=Path, help="Directory with frag.png + frag.txt pairs")
+    parser.add_argument("--mode", action="append", dest="modes", choices=CPU_MODES)
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    fragment_set = load_fragment_set(args.fragments_dir, args.limit)
+    if not fragment_set:
+        sys.exit(f"No image/text pairs found in {args.fragments_dir}")
+
+    results = {mode: run_mode(mode, fragment_set) for mode in args.modes or CPU_MODES}
+    baseline = results.get("fp32")
+    if baseline:
+        for result in results.values():
+            result["speedup_vs_fp32"] = baseline["latency_s_total"] / result["latency_s_total"]
+            result["cer_delta_vs_fp32"] = result["cer_mean"] - baseline["cer_mean"]
+
+    report = {
+        "benchmark": "text_recognizer_cpu",
+        "fragments": len(fragment_set),
+        "modes": results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(output, encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,217 @@
-from sqlalchemy import create_engine
+import argparse
+import signal
+import threading
+from pathlib import Path
+from typing import List
 from sqlalchemy.orm import Session
 from src.converters.pdf_to_page_images import get_all_pdf_files
-from src.repository.documents import get_cut_documents, get_document_by_filename
+from src.repository.documents import get_document_by_filename, get_document_by_id
+from src.repository.fulltext import FullTextSearchUnavailableError, search_fragments
+from src.database.engine import create_db_engine
 from src.database.models import Base
+from src.entities import Document
+from src.workflows.export_text import EXPORT_FORMATS, export_documents
+from src.workflows.manifest import IngestionPlan, plan_ingestion, record_ingested
 from src.workflows.process_pdf import process_bulk_pdf
 from src.workflows.recognize_fragments import recognize_bulk_fragments, recognize_single_document
-from src.utils.reading_order import ReadingOrderService
+from src.workflows.watch_folder import FolderWatcher, run_watch
+from src.utils.reading_order import get_xy_cut_order
 from src.utils.docker_manager import managed_docker_container
+from src.utils.image_store import get_image_store
+from src.utils.metrics_exporter import start_exporters
+from src.utils.timing import build_report
 from src.config import config_provider
 
+settings = config_provider.get_settings()
+logger = config_provider.get_logger("main")
 
-def main():
-    settings = config_provider.get_settings()
-    logger = config_provider.get_logger("main")
+DOCKER_RUN_COMMAND = [
+    "docker",
+    "run",
+    "--name",
+    "pla",
+    "--gpus",
+    '"device=0"',
+    "-p",
+    "5060:5060",
+    "--entrypoint",
+    "./start.sh",
+    "huridocs/pdf-document-layout-analysis:v0.0.24",
+]
 
-    settings.LOG_DIR.mkdir(parents=True, exist_ok=True)
-    settings.DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-    engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
-    Base.metadata.create_all(engine)
+def ingest(session: Session, plan: IngestionPlan) -> List[Document]:
+    """Загружает новые и измененные PDF плана (контейнер анализа разметки должен быть запущен)."""
+    if not plan.to_process:
+        return []
+
+    results = process_bulk_pdf(
+        pdf_files=plan.to_process,
+        output_dir=settings.IMAGE_OUTPUT_DIR,
+        dpi=150,
+        session=session,
+        order_strategy=get_xy_cut_order,
+        logger=logger,
+        workers=settings.PDF_PROCESS_WORKERS,
+    )
+
+    for result in results:
+        if result.document:
+            logger.info({"document": result.document.filename, "id": result.document.document_id})
+        elif result.error:
+            logger.error({"document": result.pdf_path.name, "error": result.error})
+
+    record_ingested(session, plan, {r.pdf_path: r.document for r in results})
+    session.commit()
+    return [result.document for result in results if result.document]
+
 
-    order_strategy = ReadingOrderService().get_reading_order
-
-    docker_run_command = [
-        "docker",
-        "run",
-        "--name",
-        "pla",
-        "--gpus",
-        '"device=0"',
-        "-p",
-        "5060:5060",
-        "--entrypoint",
-        "./start.sh",
-        "huridocs/pdf-document-layout-analysis:v0.0.24",
-    ]
-
-    with Session(engine) as session:
+def run_batch(session: Session) -> None:
+    try:
+        pdf_files = get_all_pdf_files(settings.PDF_INPUT_DIR)
+    except FileNotFoundError:
+        logger.warning(f"No PDF files found in {settings.PDF_INPUT_DIR}")
+        return None
+
+    plan = plan_ingestion(session, pdf_files, settings.IMAGE_OUTPUT_DIR)
+    session.commit()
+    if plan.to_process:
+        with managed_docker_container(
+            container_name="pla", run_command=DOCKER_RUN_COMMAND, logger=logger
+        ):
+            ingest(session, plan)
+
+    # 2 STAGE TEXT FRAGMENT RECOGNIZER
+    document = get_document_by_filename(session, "test")
+    recognize_single_document(
+        document=document, session=session, logger=logger, recognizer_type="text"
+    )
+    # for doc in recognized_docs:
+    #     logger.info({"recognized_document": doc.filename, "id": doc.document_id})
+
+
+def run_service(session: Session, poll_interval_s: float, settle_s: float) -> None:
+    """
+    Сервисный режим: контейнер анализа разметки и модель распознавания остаются
+    загруженными между поступлениями, новый PDF проходит загрузку и распознавание сразу.
+    Контейнер и модель делят GPU: следите за VRAM.
+    """
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_event.set())
+
+    def handle_batch(pdf_files: List[Path]) -> List[Path]:
         try:
-            pdf_files = get_all_pdf_files(settings.PDF_INPUT_DIR)
-        except FileNotFoundError:
-            logger.warning(f"No PDF files found in {settings.PDF_INPUT_DIR}")
-            return None
-
-        cut_docs = map(lambda doc: doc.filename + "." + doc.extension, get_cut_documents(session))
-        docs_already_processed = all(pdf_file in cut_docs for pdf_file in pdf_files)
-
-        if not docs_already_processed:
-            with managed_docker_container(
-                container_name="pla", run_command=docker_run_command, logger=logger
-            ):
-                documents = process_bulk_pdf(
-                    pdf_files=pdf_files,
-                    output_dir=settings.IMAGE_OUTPUT_DIR,
-                    dpi=150,
-                    session=session,
-                    order_strategy=order_strategy,
-                    logger=logger,
-                )
+            plan = plan_ingestion(session, pdf_files, settings.IMAGE_OUTPUT_DIR)
+            session.commit()
+            ingest(session, plan)
+            # Включая загруженные при прошлой попытке: распознаются только ожидающие фрагменты
+            documents = [get_document_by_id(session, doc_id) for doc_id in plan.document_ids]
+            documents = [document for document in documents if document is not None]
+            recognize_bulk_fragments(documents, session, logger, recognizer_type="text")
+        except Exception:
+            # Сессия общая для всех пачек: повтор должен начаться с чистой транзакции
+            session.rollback()
+            raise
+        return plan.unlinked
 
-                for doc in documents:
-                    logger.info({"document": doc.filename, "id": doc.document_id})
+    settings.PDF_INPUT_DIR.mkdir(parents=True, exist_ok=True)
+    watcher = FolderWatcher(
+        settings.PDF_INPUT_DIR, settle_s, retry_delay_s=settings.WATCH_RETRY_DELAY_S
+    )
+    with managed_docker_container(
+        container_name="pla", run_command=DOCKER_RUN_COMMAND, logger=logger
+    ):
+        run_watch(watcher, handle_batch, poll_interval_s, stop_event)
 
-        # 2 STAGE TEXT FRAGMENT RECOGNIZER
-        document = get_document_by_filename(session, "test")
-        recognize_single_document(
-            document=document, session=session, logger=logger, recognizer_type="text"
+
+def run_search(session: Session, args: argparse.Namespace) -> None:
+    try:
+        hits = search_fragments(
+            session, args.query, args.limit, filenames=args.documents, prefix=not args.exact
+        )
+    except FullTextSearchUnavailableError as e:
+        logger.error({"msg": str(e)})
+        raise SystemExit(1)
+    for hit in hits:
+        bbox = ",".join(f"{value:.0f}" for value in hit.bbox)
+        print(
+            f"{hit.score:9.3f}  {hit.document}  p.{hit.page_number}  fragment {hit.fragment_id}"
+            f"  [{bbox}]  {hit.snippet}"
         )
-        # for doc in recognized_docs:
-        #     logger.info({"recognized_document": doc.filename, "id": doc.document_id})
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="PDF to text pipeline.")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("batch", help="Однократная обработка PDF_INPUT_DIR (по умолчанию).")
+    watch = commands.add_parser("watch", help="Сервис: следить за PDF_INPUT_DIR.")
+    watch.add_argument("--poll-interval", type=float, default=settings.WATCH_POLL_INTERVAL_S)
+    watch.add_argument("--settle", type=float, default=settings.WATCH_SETTLE_S)
+    report = commands.add_parser("report", help="Перцентили длительности стадий по JSON-логу.")
+    report.add_argument("--log-file", type=Path, default=settings.LOG_FILE)
+    commands.add_parser(
+        "repack", help="Сжать pack-файлы изображений (офлайн, при остановленной загрузке)."
+    )
+    export = commands.add_parser("export", help="Текст документов в порядке чтения для RAG.")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="jsonl")
+    export.add_argument("--output", type=Path, help="По умолчанию EXPORT_DIR/documents.<format>.")
+    export.add_argument("--document", action="append", dest="documents", help="Имя документа.")
+    export.add_argument(
+        "--recognizer",
+        action="append",
+        dest="recognizers",
+        help="Приоритет распознавателей (повторяемый), вместо EXPORT_RECOGNIZER_PRIORITY.",
+    )
+    export.add_argument("--include-unrecognized", action="store_true")
+    search = commands.add_parser("search", help="Полнотекстовый поиск по распознанному тексту.")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--document", action="append", dest="documents", help="Имя документа.")
+    search.add_argument(
+        "--exact", action="store_true", help="Слова целиком, без поиска по префиксу."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "report":
+        print(build_report(args.log_file))
+        return
+    if args.command == "repack":
+        reclaimed = get_image_store(settings.IMAGE_OUTPUT_DIR).compact()
+        for document, freed in reclaimed.items():
+            print(f"{document}: {freed} bytes reclaimed")
+        print(f"Total: {sum(reclaimed.values())} bytes reclaimed")
+        return
+
+    settings.LOG_DIR.mkdir(parents=True, exist_ok=True)
+    settings.DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    engine = create_db_engine(settings.SQLALCHEMY_DATABASE_URI)
+    Base.metadata.create_all(engine)
+
+    stop_exporters = start_exporters(config_provider.get_metrics())
+    try:
+        with Session(engine) as session:
+            if args.command == "watch":
+                run_service(session, args.poll_interval, args.settle)
+            elif args.command == "search":
+                run_search(session, args)
+            elif args.command == "export":
+                export_documents(
+                    session,
+                    args.output or settings.EXPORT_DIR / f"documents.{args.format}",
+                    args.format,
+                    recognizer_priority=args.recognizers,
+                    filenames=args.documents,
+                    include_unrecognized=args.include_unrecognized,
+                )
+            else:
+                run_batch(session)
+    finally:
+        stop_exporters()
 
 
 if __name__ == "__main__":
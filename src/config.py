@@ -1,8 +1,27 @@
+import atexit
 import logging
 import json
+import os
+import queue
+import threading
+import time
 from logging import Formatter
+from logging.handlers import QueueHandler, QueueListener
+from multiprocessing.util import Finalize, register_after_fork
+from typing import Any, Dict, List, Optional
+from src.metrics import MetricsRegistry
 from src.settings import Settings as BaseSettings
 
+try:
+    import orjson
+except ImportError:  # необязательная зависимость: без нее используется json
+    orjson = None
+
+# Атрибуты, которые есть у любой LogRecord: все остальное пришло через extra
+STANDARD_RECORD_ATTRS = frozenset(
+    [*logging.LogRecord("", 0, "", 0, "", (), None).__dict__, "message", "asctime"]
+)
+
 
 class JsonFormatter(Formatter):
     """
@@ -21,17 +40,88 @@ class JsonFormatter(Formatter):
         if hasattr(record, "context_module"):
             log_object["module"] = record.context_module
 
-        standard_attrs = set(logging.LogRecord("", "", "", "", "", "", "", "").__dict__.keys())
         extra_fields = {
             key: value
             for key, value in record.__dict__.items()
-            if key not in standard_attrs and key not in log_object
+            if key not in STANDARD_RECORD_ATTRS and key not in log_object
         }
 
         if extra_fields:
             log_object["extra"] = extra_fields
 
-        return json.dumps(log_object, ensure_ascii=False)
+        return dumps_log_object(log_object)
+
+
+def dumps_log_object(log_object: Dict[str, Any]) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(log_object, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        except (TypeError, orjson.JSONEncodeError):
+            pass  # например, int больше 64 бит: json справится
+    return json.dumps(log_object, ensure_ascii=False, default=str)
+
+
+class InProcessQueueHandler(QueueHandler):
+    """
+    Очередь в пределах процесса: запись не сериализуется, поэтому вместо полного
+    форматирования QueueHandler.prepare достаточно зафиксировать текст сообщения.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        return record
+
+
+class ContextLoggerAdapter(logging.LoggerAdapter):
+    """LoggerAdapter, который дополняет extra вызова контекстом, а не заменяет его."""
+
+    def process(self, msg, kwargs):
+        kwargs["extra"] = {**self.extra, **(kwargs.get("extra") or {})}
+        return msg, kwargs
+
+
+class DebugSampler:
+    """
+    Ограничитель отладочных записей из горячих циклов (по фрагменту): не больше
+    rate_per_s записей в секунду, число пропущенных добавляется к следующей записи.
+    rate_per_s=None — без ограничения.
+    """
+
+    def __init__(self, logger: logging.LoggerAdapter, rate_per_s: Optional[float]):
+        self.logger = logger
+        self.rate_per_s = rate_per_s
+        self._tokens = rate_per_s or 0.0
+        self._updated = time.monotonic()
+        self._suppressed = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> Optional[int]:
+        """Число пропущенных с прошлой записи или None, если запись надо пропустить."""
+        if self.rate_per_s is None:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.rate_per_s, self._tokens + (now - self._updated) * self.rate_per_s
+            )
+            self._updated = now
+            if self._tokens < 1:
+                self._suppressed += 1
+                return None
+            self._tokens -= 1
+            suppressed, self._suppressed = self._suppressed, 0
+            return suppressed
+
+    def debug(self, msg: Any, extra: Optional[Dict[str, Any]] = None) -> None:
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        suppressed = self._acquire()
+        if suppressed is None:
+            return
+        if suppressed:
+            extra = {**(extra or {}), "suppressed": suppressed}
+        self.logger.debug(msg, extra=extra)
 
 
 class ConfigProvider:
@@ -39,7 +129,10 @@ class ConfigProvider:
 
     def __init__(self):
         self.settings = BaseSettings()
+        self.log_listener: Optional[QueueListener] = None
+        self.log_handlers: List[logging.Handler] = []
         self.logger = self._setup_logger()
+        self.metrics = MetricsRegistry(namespace=self.settings.METRICS_NAMESPACE)
 
     def _setup_logger(self) -> logging.Logger:
         logger = logging.getLogger(__name__)
@@ -50,22 +143,61 @@ class ConfigProvider:
 
         formatter = JsonFormatter()
 
-        file_handler = logging.FileHandler(self.settings.LOG_FILE)
+        self.settings.LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.FileHandler(self.settings.LOG_FILE, encoding="utf-8")
         file_handler.setFormatter(formatter)
 
         stream_handler = logging.StreamHandler()
         stream_handler.setFormatter(formatter)
 
-        logger.addHandler(stream_handler)
+        self.log_handlers = [file_handler, stream_handler]
+        if not self.settings.LOG_QUEUE_ENABLED:
+            for handler in self.log_handlers:
+                logger.addHandler(handler)
+            return logger
+
+        # Форматирование и запись — в фоновом потоке; вызывающий поток только кладет запись
+        self._start_log_listener(logger)
+        atexit.register(self.stop_log_listener)
+        os.register_at_fork(after_in_child=lambda: self._start_log_listener(logger))
+        # Процессы multiprocessing завершаются через os._exit без atexit; финализаторы
+        # регистрируются после fork, потому что multiprocessing очищает их реестр
+        register_after_fork(
+            self, lambda provider: Finalize(provider, provider.stop_log_listener, exitpriority=0)
+        )
         return logger
 
+    def _start_log_listener(self, logger: logging.Logger) -> None:
+        # После fork поток-слушатель родителя не существует, а очередь могла остаться
+        # с захваченной им блокировкой: ребенок заводит свою очередь и свой поток
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self.log_listener = QueueListener(log_queue, *self.log_handlers, respect_handler_level=True)
+        self.log_listener.start()
+        logger.handlers = [
+            handler for handler in logger.handlers if not isinstance(handler, QueueHandler)
+        ]
+        logger.addHandler(InProcessQueueHandler(log_queue))
+
+    def stop_log_listener(self) -> None:
+        """Дописывает накопленные в очереди записи; повторный вызов безопасен."""
+        listener, self.log_listener = self.log_listener, None
+        if listener is not None:
+            listener.stop()
+
     def get_logger(self, module_name: str) -> logging.LoggerAdapter:
         """Get logger with context."""
-        return logging.LoggerAdapter(self.get_base_logger(), {"context_module": module_name})
+        return ContextLoggerAdapter(self.get_base_logger(), {"context_module": module_name})
+
+    def get_debug_sampler(self, module_name: str) -> DebugSampler:
+        """Отладочный лог горячих циклов с ограничением частоты LOG_DEBUG_RATE_PER_S."""
+        return DebugSampler(self.get_logger(module_name), self.settings.LOG_DEBUG_RATE_PER_S)
 
     def get_base_logger(self) -> logging.Logger:
         return self.logger
 
+    def get_metrics(self) -> MetricsRegistry:
+        return self.metrics
+
     def get_settings(self) -> BaseSettings:
         return self.settings
 
@@ -2,6 +2,11 @@ from pathlib import Path
 from typing import List, Optional, Iterator, NamedTuple
 from PIL import Image
 from pdf2image import pdfinfo_from_path, convert_from_path
+from src.config import config_provider
+
+settings = config_provider.get_settings()
+
+RENDER_COLOR_MODES = ("rgb", "gray", "1bit")
 
 
 class PDFPageCountError(Exception):
@@ -86,10 +91,53 @@ def get_pdf_page_count(pdf_path: Path) -> int:
     try:
         pdf_info = pdfinfo_from_path(pdf_path)
         return pdf_info["Pages"]
-    except PDFPageCountError as e:
+    except Exception as e:
         raise PdfConversionError(f"Failed to get page count for {pdf_path}: {e}")
 
 
+def apply_color_mode(
+    image: Image.Image, color_mode: str, threshold: Optional[int] = None
+) -> Image.Image:
+    """Brings a rendered page to the requested color mode ("1bit" thresholds a gray image)."""
+    if color_mode == "rgb":
+        return image if image.mode == "RGB" else image.convert("RGB")
+    gray = image if image.mode == "L" else image.convert("L")
+    if color_mode == "gray":
+        return gray
+    threshold = settings.RENDER_BW_THRESHOLD if threshold is None else threshold
+    return gray.point(lambda value: 255 if value > threshold else 0, mode="1")
+
+
+def convert_pdf_page(
+    pdf_path: Path, page_num: int, dpi: int = 150, color_mode: Optional[str] = None
+) -> PageConversionResult:
+    """Converts a single PDF page; errors are returned in the result instead of raised.
+
+    Each call spawns its own pdftoppm process, so pages can be rendered from several threads.
+    color_mode (RENDER_COLOR_MODE by default): "gray" and "1bit" are rendered by poppler
+    in grayscale, "1bit" is then thresholded at RENDER_BW_THRESHOLD.
+    """
+    color_mode = color_mode or settings.RENDER_COLOR_MODE
+    try:
+        if color_mode not in RENDER_COLOR_MODES:
+            raise ValueError(f"Unknown render color mode: {color_mode}")
+        images = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            first_page=page_num,
+            last_page=page_num,
+            thread_count=1,
+            grayscale=color_mode != "rgb",
+        )
+        return PageConversionResult(
+            page_number=page_num,
+            image=apply_color_mode(images[0], color_mode) if images else None,
+            error=None,
+        )
+    except Exception as e:
+        return PageConversionResult(page_number=page_num, image=None, error=str(e))
+
+
 def convert_pdf_to_images(
     pdf_path: Path, max_pages: Optional[int] = None, dpi: int = 150
 ) -> Iterator[PageConversionResult]:
@@ -117,15 +165,6 @@ def convert_pdf_to_images(
         pages_to_convert = min(total_pages, max_pages) if max_pages is not None else total_pages
 
         for page_num in range(1, pages_to_convert + 1):
-            try:
-                images = convert_from_path(
-                    pdf_path, dpi=dpi, first_page=page_num, last_page=page_num, thread_count=1
-                )
-                yield PageConversionResult(
-                    page_number=page_num, image=images[0] if images else None, error=None
-                )
-                del images
-            except Exception as e:
-                yield PageConversionResult(page_number=page_num, image=None, error=str(e))
+            yield convert_pdf_page(pdf_path, page_num, dpi)
     except Exception as e:
         raise PdfConversionError(f"Failed to process {pdf_path}: {e}")
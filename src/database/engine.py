@@ -0,0 +1,24 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from src.config import config_provider
+
+settings = config_provider.get_settings()
+
+
+def create_db_engine(database_uri: str = settings.SQLALCHEMY_DATABASE_URI) -> Engine:
+    """
+    Engine для SQLite с busy timeout и WAL: несколько процессов загрузки пишут
+    в одну базу, и конкурентная транзакция ждет блокировку вместо "database is locked".
+    """
+    engine = create_engine(database_uri, connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT_S})
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        if settings.SQLITE_WAL:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_S * 1000)}")
+        cursor.close()
+
+    return engine
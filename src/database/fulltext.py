@@ -0,0 +1,93 @@
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+from src.config import config_provider
+
+logger = config_provider.get_logger(__name__)
+
+FTS_TABLE = "recognized_fragment_fts"
+
+
+def _fold(column: str) -> str:
+    """
+    unicode61 приводит кириллицу к нижнему регистру, но не считает "ё" вариантом "е".
+    Замена сохраняет длину и границы токенов, поэтому snippet() по исходному тексту
+    подсвечивает те же позиции.
+    """
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+# External content: текст хранится только в recognized_fragment, индекс — в FTS5.
+# Триггеры передают в 'delete' те же (свернутые) значения, что были проиндексированы
+FTS_DDL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        text,
+        content='recognized_fragment',
+        content_rowid='recognized_fragment_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON recognized_fragment
+    WHEN new.text IS NOT NULL BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text)
+        VALUES (new.recognized_fragment_id, {_fold("new.text")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON recognized_fragment
+    WHEN old.text IS NOT NULL BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.recognized_fragment_id, {_fold("old.text")});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF text ON recognized_fragment
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        SELECT 'delete', old.recognized_fragment_id, {_fold("old.text")}
+        WHERE old.text IS NOT NULL;
+        INSERT INTO {FTS_TABLE}(rowid, text)
+        SELECT new.recognized_fragment_id, {_fold("new.text")}
+        WHERE new.text IS NOT NULL;
+    END
+    """,
+)
+
+
+def fulltext_index_exists(connection: Connection) -> bool:
+    return (
+        connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        ).first()
+        is not None
+    )
+
+
+def ensure_fulltext_index(connection: Connection) -> bool:
+    """
+    Создает FTS5-индекс и триггеры синхронизации; для существующей базы индекс
+    заполняется один раз по уже сохраненным результатам. False — SQLite без FTS5.
+    """
+    exists = fulltext_index_exists(connection)
+    try:
+        for statement in FTS_DDL:
+            connection.exec_driver_sql(statement)
+    except OperationalError as e:
+        logger.warning({"msg": "Full-text index is unavailable", "error": str(e)})
+        return False
+    if not exists:
+        # 'rebuild' прочитал бы несвернутый текст: заполняем тем же выражением, что и триггеры
+        connection.exec_driver_sql(
+            f"INSERT INTO {FTS_TABLE}(rowid, text) "
+            f"SELECT recognized_fragment_id, {_fold('text')} FROM recognized_fragment "
+            "WHERE text IS NOT NULL"
+        )
+    return True
+
+
+def create_fulltext_index(target, connection: Connection, **kw) -> None:
+    """Обработчик after_create метаданных: индекс появляется вместе со схемой."""
+    if connection.dialect.name == "sqlite":
+        ensure_fulltext_index(connection)
@@ -0,0 +1,32 @@
+from typing import List
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+from src.config import config_provider
+
+logger = config_provider.get_logger(__name__)
+
+# Колонки, добавленные в модели после выпуска схемы: create_all не меняет существующие
+# таблицы, поэтому в старых базах они добавляются через ALTER TABLE. Только nullable
+ADDED_COLUMNS = (("recognized_fragment", "skip_reason", "VARCHAR"),)
+
+
+def add_missing_columns(connection: Connection) -> List[str]:
+    """Добавляет недостающие колонки из ADDED_COLUMNS; повторный вызов ничего не меняет."""
+    inspector = inspect(connection)
+    added = []
+    for table, column, column_type in ADDED_COLUMNS:
+        if not inspector.has_table(table):
+            continue
+        if column in {existing["name"] for existing in inspector.get_columns(table)}:
+            continue
+        connection.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+        added.append(f"{table}.{column}")
+    if added:
+        logger.info({"msg": "Database schema upgraded", "added_columns": added})
+    return added
+
+
+def upgrade_schema(target, connection: Connection, **kw) -> None:
+    """Обработчик after_create метаданных: старая база догоняет модели при запуске."""
+    add_missing_columns(connection)
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Index, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from src.database.fulltext import create_fulltext_index
+from src.database.migrations import upgrade_schema
 
 Base = declarative_base()
 
@@ -19,6 +21,20 @@ class Document(Base):
     __table_args__ = (Index("ix_document_filename", "filename"),)
 
 
+class InputFile(Base):
+    __tablename__ = "input_file"
+
+    input_file_id = Column(Integer, primary_key=True, autoincrement=True)
+    path = Column(String, nullable=False, unique=True)
+    size = Column(Integer, nullable=False)
+    mtime = Column(Float, nullable=False)
+    sha256 = Column(String, nullable=False)
+    document_id = Column(Integer, ForeignKey("document.document_id"), nullable=True)
+    checked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_input_file_sha256", "sha256"),)
+
+
 class Page(Base):
     __tablename__ = "page"
     page_id = Column(Integer, primary_key=True, autoincrement=True)
@@ -67,7 +83,15 @@ class RecognizedFragment(Base):
     text = Column(String, nullable=True)
 
     confidence = Column(Float, nullable=True)
+    skip_reason = Column(String, nullable=True)
     recognized_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     fragment = relationship("Fragment", back_populates="recognized_fragments")
 
     __table_args__ = (Index("ix_recognized_fragment_fragment_id", "fragment_id"),)
+
+
+# FTS5-индекс по recognized_fragment.text и триггеры синхронизации (src/database/fulltext.py)
+event.listen(Base.metadata, "after_create", create_fulltext_index)
+
+# Колонки, добавленные в существующие таблицы (src/database/migrations.py)
+event.listen(Base.metadata, "after_create", upgrade_schema)
@@ -4,6 +4,13 @@ from enum import Enum
 from typing import Optional, Tuple, TypedDict
 
 
+def _with_primary_key(row: dict, key: str, value: Optional[int]) -> dict:
+    """Строка для Core insert: первичный ключ передается, только если уже известен."""
+    if value is not None:
+        row[key] = value
+    return row
+
+
 class ContentType(Enum):
     SECTION_HEADER = "Section header"
     TITLE = "Title"
@@ -18,7 +25,7 @@ class ContentType(Enum):
     TABLE = "Table"
 
 
-@dataclass
+@dataclass(slots=True)
 class Document:
     document_id: Optional[int]
     filename: str
@@ -35,6 +42,18 @@ class Document:
             processed_at=self.processed_at,
         )
 
+    def to_row(self) -> dict:
+        return _with_primary_key(
+            {
+                "filename": self.filename,
+                "extension": self.extension,
+                "is_success_processed": self.is_success_processed,
+                "processed_at": self.processed_at or datetime.utcnow(),
+            },
+            "document_id",
+            self.document_id,
+        )
+
     @classmethod
     def from_orm(cls, orm_doc):
         return cls(
@@ -45,8 +64,50 @@ class Document:
             processed_at=orm_doc.processed_at,
         )
 
+    # Строки Core (Row) отдают колонки атрибутами, как ORM-объекты
+    from_row = from_orm
+
+
+@dataclass(slots=True)
+class InputFile:
+    """Запись манифеста входных PDF: document_id может ссылаться на документ-дубликат."""
+
+    input_file_id: Optional[int]
+    path: str
+    size: int
+    mtime: float
+    sha256: str
+    document_id: Optional[int] = None
+    checked_at: Optional[datetime] = None
+
+    def to_row(self) -> dict:
+        return _with_primary_key(
+            {
+                "path": self.path,
+                "size": self.size,
+                "mtime": self.mtime,
+                "sha256": self.sha256,
+                "document_id": self.document_id,
+                "checked_at": self.checked_at or datetime.utcnow(),
+            },
+            "input_file_id",
+            self.input_file_id,
+        )
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(
+            input_file_id=row.input_file_id,
+            path=row.path,
+            size=row.size,
+            mtime=row.mtime,
+            sha256=row.sha256,
+            document_id=row.document_id,
+            checked_at=row.checked_at,
+        )
+
 
-@dataclass
+@dataclass(slots=True)
 class Page:
     page_id: Optional[int]
     document_id: int
@@ -65,6 +126,19 @@ class Page:
             height=self.height,
         )
 
+    def to_row(self) -> dict:
+        return _with_primary_key(
+            {
+                "document_id": self.document_id,
+                "number": self.number,
+                "dpi": self.dpi,
+                "width": self.width,
+                "height": self.height,
+            },
+            "page_id",
+            self.page_id,
+        )
+
     @classmethod
     def from_orm(cls, orm_page):
         return cls(
@@ -76,6 +150,8 @@ class Page:
             height=orm_page.height,
         )
 
+    from_row = from_orm
+
 
 class RawFragment(TypedDict):
     left: float
@@ -89,7 +165,7 @@ class RawFragment(TypedDict):
     text: str | None
 
 
-@dataclass
+@dataclass(slots=True)
 class Fragment:
     fragment_id: Optional[int]
     page_id: Optional[int]
@@ -121,6 +197,25 @@ class Fragment:
             cropped_at=self.cropped_at,
         )
 
+    def to_row(self) -> dict:
+        return _with_primary_key(
+            {
+                "page_id": self.page_id,
+                "page_number": self.page_number,
+                "content_type": self.content_type.value,
+                "order_number": self.order_number,
+                "left": self.left,
+                "top": self.top,
+                "width": self.width,
+                "height": self.height,
+                "text": self.text,
+                "created_at": self.created_at or datetime.utcnow(),
+                "cropped_at": self.cropped_at,
+            },
+            "fragment_id",
+            self.fragment_id,
+        )
+
     @classmethod
     def from_dict(cls, data: dict, coords: Tuple[int, int, int, int], page_id: int = None):
         return cls(
@@ -153,30 +248,33 @@ class Fragment:
             cropped_at=orm_fragment.cropped_at,
         )
 
+    from_row = from_orm
+
 
-@dataclass
+@dataclass(slots=True)
 class TextFragment(Fragment):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class TableFragment(Fragment):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class ImageFragment(Fragment):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class RecognizedFragment:
     recognized_fragment_id: Optional[int]
     fragment_id: int
 
     recognizer: str
-    text: str
+    text: Optional[str]
     confidence: Optional[float]
+    skip_reason: Optional[str] = None
 
     def to_orm(self, orm_model):
         return orm_model(
@@ -185,6 +283,21 @@ class RecognizedFragment:
             recognizer=self.recognizer,
             text=self.text,
             confidence=self.confidence,
+            skip_reason=self.skip_reason,
+        )
+
+    def to_row(self) -> dict:
+        return _with_primary_key(
+            {
+                "fragment_id": self.fragment_id,
+                "recognizer": self.recognizer,
+                "text": self.text,
+                "confidence": self.confidence,
+                "skip_reason": self.skip_reason,
+                "recognized_at": datetime.utcnow(),
+            },
+            "recognized_fragment_id",
+            self.recognized_fragment_id,
         )
 
     @classmethod
@@ -195,4 +308,7 @@ class RecognizedFragment:
             recognizer=orm_recognized.recognizer,
             text=orm_recognized.text,
             confidence=orm_recognized.confidence,
+            skip_reason=orm_recognized.skip_reason,
         )
+
+    from_row = from_orm
@@ -1,11 +1,35 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Optional
+from PIL import Image
+from src.entities import ContentType
 
 
 class BaseRecognizer(ABC):
     recognizer_type: str
+    supports_composites: bool = False
+    # Режим изображения, который требует модель (например, "RGB"); None — любой
+    image_mode: Optional[str] = None
 
     @abstractmethod
-    def recognize_image(self, image_path: Path) -> Optional[str]:
+    def recognize(
+        self,
+        image: Image.Image,
+        content_type: Optional[ContentType] = None,
+        prompt: Optional[str] = None,
+    ) -> Optional[str]:
+        """Распознает загруженное изображение. prompt учитывают только VLM-распознаватели."""
         pass
+
+    def prepare_image(self, image: Image.Image) -> Image.Image:
+        """Расширяет каналы серых и 1-битных страниц только если этого требует модель."""
+        if self.image_mode and image.mode != self.image_mode:
+            return image.convert(self.image_mode)
+        return image
+
+    def recognize_image(
+        self, image_path: Path, content_type: Optional[ContentType] = None
+    ) -> Optional[str]:
+        with Image.open(image_path) as image:
+            image.load()
+            return self.recognize(image, content_type)
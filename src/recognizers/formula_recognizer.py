@@ -1,13 +1,18 @@
+import logging
 from pathlib import Path
-from typing import Optional
-import torch
-import onnxruntime as ort
-from pix2text import Pix2Text
+from typing import Optional, TYPE_CHECKING
+from PIL import Image
 from src.config import config_provider
+from src.entities import ContentType
 from src.recognizers.base_recognizer import BaseRecognizer
+from src.utils.timing import span
+
+if TYPE_CHECKING:
+    from pix2text import Pix2Text
 
 settings = config_provider.get_settings()
 logger = config_provider.get_logger(__name__)
+debug_log = config_provider.get_debug_sampler(__name__)
 
 
 class FormulaRecognizerError(Exception):
@@ -28,22 +33,28 @@ class ProcessingError(FormulaRecognizerError):
     pass
 
 
-_model: Optional[Pix2Text] = None
-_device: str = "cuda:0" if torch.cuda.is_available() else "cpu"
+_model: Optional["Pix2Text"] = None
+_device: Optional[str] = None
 
 
 def get_available_providers() -> list[str]:
     """Возвращает список доступных провайдеров ONNX Runtime."""
+    import onnxruntime as ort
+
     return ort.get_available_providers()
 
 
 def load_model() -> None:
     """Загружает модель Pix2Text с подходящим провайдером."""
-    global _model
+    global _model, _device
     if _model:
         return
 
     try:
+        import torch
+        from pix2text import Pix2Text
+
+        _device = "cuda:0" if torch.cuda.is_available() else "cpu"
         formula_config = {}
         formula_config["model_fp"] = str(settings.FORMULA_RECOGNIZER_MODEL_DIR / "model.onnx")
         formula_config["model_backend"] = settings.FORMULA_RECOGNIZER_MODEL_BACKEND
@@ -76,20 +87,33 @@ class FormulaRecognizer(BaseRecognizer):
     """Распознает математические формулы из изображений с помощью Pix2Text."""
 
     recognizer_type = "pix2text-mfr-onnx"
+    image_mode = "RGB"
 
-    def recognize_image(self, image_path: Path) -> Optional[str]:
+    def recognize_image(
+        self, image_path: Path, content_type: Optional[ContentType] = None
+    ) -> Optional[str]:
         """Распознает формулу из указанного изображения."""
-        load_model()
         if not image_path.exists():
             logger.error(f"Изображение не найдено: {image_path}")
             raise ProcessingError(f"Изображение не найдено: {image_path}")
-
+        return super().recognize_image(image_path, content_type)
+
+    def recognize(
+        self,
+        image: Image.Image,
+        content_type: Optional[ContentType] = None,
+        prompt: Optional[str] = None,
+    ) -> Optional[str]:
+        """Распознает формулу из загруженного изображения."""
+        load_model()
+        image = self.prepare_image(image)
         try:
-            latex_output = _model.recognize_formula(image_path, return_text=True)
-            logger.debug(
-                f"Распознанная формула (превью): {latex_output[:200] if latex_output else 'None'}"
+            with span("recognizer.formula", level=logging.DEBUG, pixels=image.width * image.height):
+                latex_output = _model.recognize_formula(image, return_text=True)
+            debug_log.debug(
+                "Распознанная формула (превью)", extra={"preview": (latex_output or "")[:200]}
             )
             return latex_output.strip() if latex_output else None
         except Exception as e:
-            logger.error(f"Не удалось распознать формулу из {image_path}: {str(e)}")
+            logger.error(f"Не удалось распознать формулу: {str(e)}")
             return None
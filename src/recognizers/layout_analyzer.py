@@ -4,6 +4,7 @@ from typing import List
 from src.config import config_provider
 from src.entities import Fragment, RawFragment
 from src.utils.raw_fragment_validators import validate_fragment_dict
+from src.utils.timing import span
 
 settings = config_provider.get_settings()
 logger = config_provider.get_logger(__name__)
@@ -30,17 +31,21 @@ def analyze_pdf(file_path: str) -> List[Fragment]:
         if not Path(file_path).is_file():
             raise FileNotFoundError(f"File {file_path} not found")
 
-        with open(file_path, "rb") as f:
-            files = {"file": (Path(file_path).name, f, "application/pdf")}
-            response = requests.post(
-                settings.LAYOUT_ANALYZER_URL, files=files, timeout=settings.LAYOUT_ANALYZER_TIMEOUT
-            )
-        response.raise_for_status()
+        with span("layout.analyze", document=Path(file_path).stem) as layout_span:
+            with open(file_path, "rb") as f:
+                files = {"file": (Path(file_path).name, f, "application/pdf")}
+                response = requests.post(
+                    settings.LAYOUT_ANALYZER_URL,
+                    files=files,
+                    timeout=settings.LAYOUT_ANALYZER_TIMEOUT,
+                )
+            response.raise_for_status()
 
-        raw_data: List[RawFragment] = response.json()
-        valid_fragments = tuple(
-            raw_fragment for raw_fragment in raw_data if validate_fragment_dict(raw_fragment)
-        )
+            raw_data: List[RawFragment] = response.json()
+            valid_fragments = tuple(
+                raw_fragment for raw_fragment in raw_data if validate_fragment_dict(raw_fragment)
+            )
+            layout_span.add(bytes=Path(file_path).stat().st_size, items=len(valid_fragments))
 
         logger.debug(
             "Processed PDF file",
@@ -1,14 +1,20 @@
+import logging
 from pathlib import Path
-from typing import Optional
-import torch
-from transformers import Qwen2VLForConditionalGeneration, AutoProcessor
+from typing import Optional, Tuple, TYPE_CHECKING
+from PIL import Image
 from src.config import config_provider
-from qwen_vl_utils import process_vision_info
+from src.entities import ContentType
 
 from .base_recognizer import BaseRecognizer
+from .token_budget import estimate_max_new_tokens, get_pixel_bounds, get_retry_budget
+from src.utils.timing import span
+
+if TYPE_CHECKING:
+    from transformers import Qwen2VLForConditionalGeneration, AutoProcessor
 
 settings = config_provider.get_settings()
 logger = config_provider.get_logger(__name__)
+debug_log = config_provider.get_debug_sampler(__name__)
 
 
 class TextRecognizerError(Exception):
@@ -23,47 +29,136 @@ class ProcessingError(TextRecognizerError):
     pass
 
 
-_model: Optional[Qwen2VLForConditionalGeneration] = None
-_processor: Optional[AutoProcessor] = None
-_device: str = "cuda" if torch.cuda.is_available() else "cpu"
+CPU_MODES = ("fp32", "bf16", "int8-dynamic")
+
+_model: Optional["Qwen2VLForConditionalGeneration"] = None
+_processor: Optional["AutoProcessor"] = None
+_device: Optional[str] = None
+_cpu_mode: Optional[str] = None
+
+
+def _resolve_cpu_mode(torch, cpu_mode: str) -> str:
+    if cpu_mode not in CPU_MODES:
+        raise ModelLoadError(f"Unknown CPU mode: {cpu_mode}, expected one of {CPU_MODES}")
+    if cpu_mode == "bf16" and not torch.ops.mkldnn._is_mkldnn_bf16_supported():
+        logger.warning("bf16 is not supported by this CPU, falling back to fp32")
+        return "fp32"
+    return cpu_mode
 
 
-def load_model() -> None:
-    global _model, _processor
+def _load_cpu_model(torch, model_cls, cpu_mode: str):
+    dtype = torch.bfloat16 if cpu_mode == "bf16" else torch.float32
+    model = model_cls.from_pretrained(
+        settings.TEXT_RECOGNIZER_MODEL_NAME,
+        torch_dtype=dtype,
+        cache_dir=str(settings.TEXT_RECOGNIZER_CACHE_DIR),
+        trust_remote_code=True,
+    ).eval()
+    if cpu_mode == "int8-dynamic":
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def load_model(cpu_mode: Optional[str] = None) -> None:
+    """Загружает модель; на CPU применяет режим TEXT_RECOGNIZER_CPU_MODE (fp32/bf16/int8)."""
+    global _model, _processor, _device, _cpu_mode
     if _model and _processor:
         return
     try:
-        _model = Qwen2VLForConditionalGeneration.from_pretrained(
-            settings.TEXT_RECOGNIZER_MODEL_NAME,
-            torch_dtype="auto",
-            device_map="auto",
-            cache_dir=str(settings.TEXT_RECOGNIZER_CACHE_DIR),
-            trust_remote_code=True,
-        )
+        import torch
+        from transformers import Qwen2VLForConditionalGeneration, AutoProcessor
+
+        _device = "cuda" if torch.cuda.is_available() else "cpu"
+        if _device == "cuda":
+            _model = Qwen2VLForConditionalGeneration.from_pretrained(
+                settings.TEXT_RECOGNIZER_MODEL_NAME,
+                torch_dtype="auto",
+                device_map="auto",
+                cache_dir=str(settings.TEXT_RECOGNIZER_CACHE_DIR),
+                trust_remote_code=True,
+            )
+        else:
+            if settings.TEXT_RECOGNIZER_CPU_THREADS:
+                torch.set_num_threads(settings.TEXT_RECOGNIZER_CPU_THREADS)
+            _cpu_mode = _resolve_cpu_mode(torch, cpu_mode or settings.TEXT_RECOGNIZER_CPU_MODE)
+            _model = _load_cpu_model(torch, Qwen2VLForConditionalGeneration, _cpu_mode)
         _processor = AutoProcessor.from_pretrained(
             settings.TEXT_RECOGNIZER_MODEL_NAME,
             cache_dir=str(settings.TEXT_RECOGNIZER_CACHE_DIR),
             trust_remote_code=True,
         )
-        logger.info(f"Text recognizer model loaded on {_device}")
+        logger.info(f"Text recognizer model loaded on {_device}", extra={"cpu_mode": _cpu_mode})
+    except ModelLoadError:
+        raise
     except Exception as e:
         raise ModelLoadError(f"Failed to load model: {str(e)}")
 
 
+def unload_model() -> None:
+    global _model, _processor, _cpu_mode
+    _model = None
+    _processor = None
+    _cpu_mode = None
+
+
+def _generate(inputs, max_new_tokens: int) -> Tuple[str, bool]:
+    """Returns decoded text and whether the token budget was exhausted (possible truncation)."""
+    with span(
+        "recognizer.generate", level=logging.DEBUG, max_new_tokens=max_new_tokens
+    ) as generate_span:
+        generated_ids = _model.generate(**inputs, max_new_tokens=max_new_tokens)
+        generated_ids_trimmed = [
+            out_ids[len(in_ids) :] for in_ids, out_ids in zip(inputs["input_ids"], generated_ids)
+        ]
+        generate_span.add(items=len(generated_ids_trimmed[0]))
+    output_text = (
+        _processor.batch_decode(
+            generated_ids_trimmed, skip_special_tokens=True, clean_up_tokenization_spaces=False
+        )[0]
+        .strip()
+        .replace("<|im_end|>", "")
+        .strip()
+    )
+    return output_text, len(generated_ids_trimmed[0]) >= max_new_tokens
+
+
 class TextRecognizer(BaseRecognizer):
     recognizer_type = "text-qwen2-vl-ocr-2b-instruct"
+    supports_composites = True
+    image_mode = "RGB"
 
-    def recognize_image(self, image_path: Path) -> Optional[str]:
-        load_model()
+    def recognize_image(
+        self, image_path: Path, content_type: Optional[ContentType] = None
+    ) -> Optional[str]:
         if not image_path.exists():
             raise ProcessingError(f"Image not found: {image_path}")
+        return super().recognize_image(image_path, content_type)
+
+    def recognize(
+        self,
+        image: Image.Image,
+        content_type: Optional[ContentType] = None,
+        prompt: Optional[str] = None,
+    ) -> Optional[str]:
+        load_model()
+        from qwen_vl_utils import process_vision_info
+
+        image = self.prepare_image(image)
+
+        min_pixels, max_pixels = get_pixel_bounds(content_type)
+        max_new_tokens = estimate_max_new_tokens(image.width, image.height, content_type)
 
         messages = [
             {
                 "role": "user",
                 "content": [
-                    {"type": "image", "image": str(image_path)},
-                    {"type": "text", "text": settings.TEXT_RECOGNIZER_PROMPT},
+                    {
+                        "type": "image",
+                        "image": image,
+                        "min_pixels": min_pixels,
+                        "max_pixels": max_pixels,
+                    },
+                    {"type": "text", "text": prompt or settings.TEXT_RECOGNIZER_PROMPT},
                 ],
             }
         ]
@@ -80,18 +175,14 @@ class TextRecognizer(BaseRecognizer):
             return_tensors="pt",
         ).to(_device)
 
-        generated_ids = _model.generate(**inputs, max_new_tokens=512)
-        generated_ids_trimmed = [
-            out_ids[len(in_ids) :] for in_ids, out_ids in zip(inputs["input_ids"], generated_ids)
-        ]
-        output_text = (
-            _processor.batch_decode(
-                generated_ids_trimmed, skip_special_tokens=True, clean_up_tokenization_spaces=False
-            )[0]
-            .strip()
-            .replace("<|im_end|>", "")
-            .strip()
-        )
+        output_text, exhausted = _generate(inputs, max_new_tokens)
+        retry_budget = get_retry_budget(max_new_tokens, exhausted)
+        if retry_budget:
+            logger.warning(
+                "Token budget exhausted, retrying with maximum budget",
+                extra={"size": image.size, "max_new_tokens": max_new_tokens},
+            )
+            output_text, _ = _generate(inputs, retry_budget)
 
-        logger.debug(f"Recognized text preview: {output_text[:200]}")
+        debug_log.debug("Recognized text preview", extra={"preview": output_text[:200]})
         return output_text if output_text.strip() else None
@@ -0,0 +1,40 @@
+import math
+from typing import Optional, Tuple
+from src.config import config_provider
+from src.entities import ContentType
+
+settings = config_provider.get_settings()
+
+
+def get_pixel_bounds(content_type: Optional[ContentType]) -> Tuple[int, int]:
+    """Возвращает (min_pixels, max_pixels) для ресайза фрагмента перед подачей в VLM."""
+    default = (settings.TEXT_RECOGNIZER_MIN_PIXELS, settings.TEXT_RECOGNIZER_MAX_PIXELS)
+    if content_type is None:
+        return default
+    return settings.TEXT_RECOGNIZER_PIXEL_BOUNDS.get(content_type.value, default)
+
+
+def estimate_max_new_tokens(width: int, height: int, content_type: Optional[ContentType]) -> int:
+    """
+    Оценивает бюджет выходных токенов по площади фрагмента (px при DPI нарезки) и его типу.
+    Результат ограничен TEXT_RECOGNIZER_MIN_NEW_TOKENS и TEXT_RECOGNIZER_MAX_NEW_TOKENS.
+    """
+    area = max(width, 0) * max(height, 0)
+    factor = settings.TEXT_RECOGNIZER_TOKEN_FACTORS.get(
+        content_type.value if content_type else None, 1.0
+    )
+    estimate = math.ceil(area * factor / settings.TEXT_RECOGNIZER_PX_PER_TOKEN)
+    return min(
+        max(estimate, settings.TEXT_RECOGNIZER_MIN_NEW_TOKENS),
+        settings.TEXT_RECOGNIZER_MAX_NEW_TOKENS,
+    )
+
+
+def get_retry_budget(max_new_tokens: int, exhausted: bool) -> Optional[int]:
+    """
+    Бюджет повторной генерации, если ответ уперся в max_new_tokens (возможно, обрезан);
+    None — повтор не нужен или бюджет уже максимальный.
+    """
+    if exhausted and max_new_tokens < settings.TEXT_RECOGNIZER_MAX_NEW_TOKENS:
+        return settings.TEXT_RECOGNIZER_MAX_NEW_TOKENS
+    return None
@@ -1,31 +1,84 @@
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.orm import Session
-from src.database.models import Document as ORMDocument
+from src.database.models import (
+    Document as ORMDocument,
+    Fragment as ORMFragment,
+    Page as ORMPage,
+    RecognizedFragment as ORMRecognizedFragment,
+)
 from src.entities import Document
-from typing import List, Optional
+from typing import Iterator, List, Optional, Sequence
+
+SCAN_BATCH_SIZE = 1000
+
+document_table = ORMDocument.__table__
+page_table = ORMPage.__table__
+fragment_table = ORMFragment.__table__
+recognized_fragment_table = ORMRecognizedFragment.__table__
 
 
 def create_document(session: Session, entity: Document) -> Document:
-    orm_doc = entity.to_orm(ORMDocument)
-    session.add(orm_doc)
-    session.flush()
-    entity.document_id = orm_doc.document_id
+    row = entity.to_row()
+    result = session.execute(insert(document_table).values(row))
+    entity.document_id = result.inserted_primary_key[0]
+    entity.processed_at = row["processed_at"]
     return entity
 
 
 def get_document_by_filename(session: Session, filename: str) -> Optional[Document]:
-    orm_doc = session.query(ORMDocument).filter(ORMDocument.filename == filename).first()
-    return Document.from_orm(orm_doc) if orm_doc else None
+    row = session.execute(
+        select(document_table).where(document_table.c.filename == filename)
+    ).first()
+    return Document.from_row(row) if row else None
+
+
+def get_document_by_id(session: Session, document_id: int) -> Optional[Document]:
+    row = session.execute(
+        select(document_table).where(document_table.c.document_id == document_id)
+    ).first()
+    return Document.from_row(row) if row else None
+
 
+def get_cut_documents(session: Session) -> List[Document]:
+    rows = session.execute(select(document_table).where(document_table.c.is_success_processed))
+    return [Document.from_row(row) for row in rows]
 
-def get_cut_documents(session: Session) -> Optional[List[ORMDocument]]:
-    return session.query(ORMDocument).filter(ORMDocument.is_success_processed).all()
+
+def iter_documents(
+    session: Session,
+    filenames: Optional[Sequence[str]] = None,
+    only_processed: bool = True,
+    batch_size: int = SCAN_BATCH_SIZE,
+) -> Iterator[Document]:
+    """Потоковый обход документов в порядке document_id."""
+    query = select(document_table).order_by(document_table.c.document_id)
+    if only_processed:
+        query = query.where(document_table.c.is_success_processed)
+    if filenames is not None:
+        query = query.where(document_table.c.filename.in_(filenames))
+    for row in session.execute(query, execution_options={"yield_per": batch_size}):
+        yield Document.from_row(row)
 
 
 def update_document_status(session: Session, entity: Document) -> None:
-    orm_doc = (
-        session.query(ORMDocument).filter(ORMDocument.document_id == entity.document_id).first()
+    session.execute(
+        update(document_table)
+        .where(document_table.c.document_id == entity.document_id)
+        .values(is_success_processed=entity.is_success_processed, processed_at=entity.processed_at)
+    )
+
+
+def delete_document_tree(session: Session, document_id: int) -> None:
+    """Удаляет документ вместе со страницами, фрагментами и результатами распознавания."""
+    page_ids = select(page_table.c.page_id).where(page_table.c.document_id == document_id)
+    fragment_ids = select(fragment_table.c.fragment_id).where(
+        fragment_table.c.page_id.in_(page_ids)
+    )
+    session.execute(
+        delete(recognized_fragment_table).where(
+            recognized_fragment_table.c.fragment_id.in_(fragment_ids)
+        )
     )
-    if orm_doc:
-        orm_doc.is_success_processed = entity.is_success_processed
-        orm_doc.processed_at = entity.processed_at
-        session.flush()
+    session.execute(delete(fragment_table).where(fragment_table.c.page_id.in_(page_ids)))
+    session.execute(delete(page_table).where(page_table.c.document_id == document_id))
+    session.execute(delete(document_table).where(document_table.c.document_id == document_id))
@@ -1,27 +1,70 @@
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
-from src.database.models import Fragment as ORMFragment
+from src.database.models import Fragment as ORMFragment, Page as ORMPage
 from src.entities import Fragment
-from typing import List
+from typing import Iterator, List, Optional, Sequence
+
+fragment_table = ORMFragment.__table__
+page_table = ORMPage.__table__
+
+SCAN_BATCH_SIZE = 1000
 
 
 def create_fragment(session: Session, entity: Fragment) -> Fragment:
-    orm_fragment = entity.to_orm(ORMFragment)
-    session.add(orm_fragment)
-    session.flush()
-    entity.fragment_id = orm_fragment.fragment_id
+    result = session.execute(insert(fragment_table).values(entity.to_row()))
+    entity.fragment_id = result.inserted_primary_key[0]
     return entity
 
 
+def create_fragments(session: Session, entities: Sequence[Fragment]) -> List[Fragment]:
+    """Один executemany INSERT ... RETURNING на страницу вместо flush на каждый фрагмент."""
+    if not entities:
+        return []
+    result = session.execute(
+        insert(fragment_table).returning(
+            fragment_table.c.fragment_id, sort_by_parameter_order=True
+        ),
+        [entity.to_row() for entity in entities],
+    )
+    for entity, fragment_id in zip(entities, result.scalars()):
+        entity.fragment_id = fragment_id
+    return list(entities)
+
+
 def get_fragments_by_page_id(session: Session, page_id: int) -> List[Fragment]:
-    orm_fragments = session.query(ORMFragment).filter(ORMFragment.page_id == page_id).all()
-    return [Fragment.from_orm(orm_fragment) for orm_fragment in orm_fragments]
+    rows = session.execute(select(fragment_table).where(fragment_table.c.page_id == page_id))
+    return [Fragment.from_row(row) for row in rows]
+
+
+def get_fragments_by_document_id(
+    session: Session, document_id: int, content_types: Optional[Sequence[str]] = None
+) -> List[Fragment]:
+    """Все фрагменты документа одним запросом вместо запроса на каждую страницу."""
+    query = (
+        select(fragment_table)
+        .join(page_table, page_table.c.page_id == fragment_table.c.page_id)
+        .where(page_table.c.document_id == document_id)
+        .order_by(fragment_table.c.page_number, fragment_table.c.order_number)
+    )
+    if content_types is not None:
+        query = query.where(fragment_table.c.content_type.in_(content_types))
+    return [Fragment.from_row(row) for row in session.execute(query)]
+
+
+def iter_fragments(session: Session, batch_size: int = SCAN_BATCH_SIZE) -> Iterator[Fragment]:
+    """Потоковый обход всего корпуса: строки читаются пачками, без identity map ORM."""
+    result = session.execute(
+        select(fragment_table).order_by(fragment_table.c.fragment_id),
+        execution_options={"yield_per": batch_size},
+    )
+    for row in result:
+        yield Fragment.from_row(row)
 
 
 def update_fragment_order(session: Session, entity: Fragment, order_number: int) -> None:
-    orm_fragment = (
-        session.query(ORMFragment).filter(ORMFragment.fragment_id == entity.fragment_id).first()
+    session.execute(
+        update(fragment_table)
+        .where(fragment_table.c.fragment_id == entity.fragment_id)
+        .values(order_number=order_number)
     )
-    if orm_fragment:
-        orm_fragment.order_number = order_number
-        entity.order_number = order_number
-        session.flush()
+    entity.order_number = order_number
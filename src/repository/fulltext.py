@@ -0,0 +1,118 @@
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from src.database.fulltext import FTS_TABLE, fulltext_index_exists
+
+TOKEN_RE = re.compile(r"\w+")
+
+SNIPPET_TOKENS = 12
+
+
+class FullTextSearchUnavailableError(RuntimeError):
+    """Индекса FTS5 нет: SQLite собран без FTS5 (см. предупреждение при запуске)."""
+
+    pass
+
+
+@dataclass(slots=True)
+class SearchHit:
+    document_id: int
+    document: str
+    page_number: int
+    fragment_id: int
+    content_type: str
+    # (left, top, right, bottom) в px страницы
+    bbox: Tuple[float, float, float, float]
+    recognizer: str
+    score: float
+    snippet: str
+
+
+def build_match_query(query: str, prefix: bool = True) -> str:
+    """
+    Пользовательский запрос -> выражение MATCH: все слова обязательны, каждое в кавычках
+    (операторы FTS5 в тексте не срабатывают). prefix — поиск по началу слова, что
+    заменяет стемминг для русских словоформ ("приказ" находит "приказа", "приказом").
+    """
+    tokens = TOKEN_RE.findall(query.replace("ё", "е").replace("Ё", "Е"))
+    if not tokens:
+        raise ValueError("Search query has no words")
+    suffix = "*" if prefix else ""
+    return " ".join(f'"{token}"{suffix}' for token in tokens)
+
+
+def search_fragments(
+    session: Session,
+    query: str,
+    limit: int = 20,
+    filenames: Optional[Sequence[str]] = None,
+    prefix: bool = True,
+) -> List[SearchHit]:
+    """
+    Фрагменты, в распознанном тексте которых есть все слова запроса, по убыванию
+    релевантности (bm25). Сначала FTS5 отбирает limit лучших строк, затем они
+    дополняются страницей и документом — соединения не зависят от числа совпадений.
+    """
+    if not fulltext_index_exists(session.connection()):
+        raise FullTextSearchUnavailableError(
+            f"Full-text search is unavailable: no {FTS_TABLE} table "
+            "(SQLite without FTS5 support)"
+        )
+
+    document_filter = ""
+    params = {"match": build_match_query(query, prefix), "limit": limit}
+    if filenames is not None:
+        document_filter = """
+            AND rowid IN (
+                SELECT rf.recognized_fragment_id
+                FROM recognized_fragment rf
+                JOIN fragment f ON f.fragment_id = rf.fragment_id
+                JOIN page p ON p.page_id = f.page_id
+                JOIN document d ON d.document_id = p.document_id
+                WHERE d.filename IN :filenames
+            )"""
+        params["filenames"] = list(filenames)
+
+    sql = f"""
+        WITH hits AS (
+            SELECT rowid AS recognized_fragment_id,
+                   rank AS score,
+                   snippet({FTS_TABLE}, 0, '[', ']', '…', {SNIPPET_TOKENS}) AS snippet
+            FROM {FTS_TABLE}
+            WHERE {FTS_TABLE} MATCH :match {document_filter}
+            ORDER BY rank
+            LIMIT :limit
+        )
+        SELECT d.document_id, d.filename, p.number AS page_number, f.fragment_id,
+               f.content_type, f."left", f.top, f.width, f.height,
+               rf.recognizer, hits.score, hits.snippet
+        FROM hits
+        JOIN recognized_fragment rf ON rf.recognized_fragment_id = hits.recognized_fragment_id
+        JOIN fragment f ON f.fragment_id = rf.fragment_id
+        JOIN page p ON p.page_id = f.page_id
+        JOIN document d ON d.document_id = p.document_id
+        ORDER BY hits.score
+    """
+    statement = text(sql)
+    if filenames is not None:
+        statement = statement.bindparams(bindparam("filenames", expanding=True))
+
+    return [
+        SearchHit(
+            document_id=row.document_id,
+            document=row.filename,
+            page_number=row.page_number,
+            fragment_id=row.fragment_id,
+            content_type=row.content_type,
+            # Fragment.width/height хранят правую и нижнюю границы
+            bbox=(row.left, row.top, row.width, row.height),
+            recognizer=row.recognizer,
+            score=row.score,
+            snippet=row.snippet,
+        )
+        for row in session.execute(statement, params)
+    ]
@@ -0,0 +1,62 @@
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from src.database.models import InputFile as ORMInputFile
+from src.entities import InputFile
+from typing import List, Optional
+
+input_file_table = ORMInputFile.__table__
+
+
+def get_input_file_by_path(session: Session, path: str) -> Optional[InputFile]:
+    row = session.execute(select(input_file_table).where(input_file_table.c.path == path)).first()
+    return InputFile.from_row(row) if row else None
+
+
+def get_input_files_by_document_id(session: Session, document_id: int) -> List[InputFile]:
+    rows = session.execute(
+        select(input_file_table)
+        .where(input_file_table.c.document_id == document_id)
+        .order_by(input_file_table.c.input_file_id)
+    )
+    return [InputFile.from_row(row) for row in rows]
+
+
+def get_processed_input_file_by_sha256(session: Session, sha256: str) -> Optional[InputFile]:
+    row = session.execute(
+        select(input_file_table)
+        .where(
+            input_file_table.c.sha256 == sha256,
+            input_file_table.c.document_id.is_not(None),
+        )
+        .order_by(input_file_table.c.input_file_id)
+    ).first()
+    return InputFile.from_row(row) if row else None
+
+
+def save_input_file(session: Session, entity: InputFile) -> InputFile:
+    """Создает запись манифеста или обновляет существующую по input_file_id."""
+    row = entity.to_row()
+    if entity.input_file_id is None:
+        result = session.execute(insert(input_file_table).values(row))
+        entity.input_file_id = result.inserted_primary_key[0]
+    else:
+        session.execute(
+            update(input_file_table)
+            .where(input_file_table.c.input_file_id == entity.input_file_id)
+            .values(row)
+        )
+    entity.checked_at = row["checked_at"]
+    return entity
+
+
+def detach_input_files(session: Session, document_id: int, keep_path: str) -> int:
+    """Отвязывает от документа все записи, кроме keep_path: они будут обработаны как новые."""
+    result = session.execute(
+        update(input_file_table)
+        .where(
+            input_file_table.c.document_id == document_id,
+            input_file_table.c.path != keep_path,
+        )
+        .values(document_id=None)
+    )
+    return result.rowcount
@@ -1,17 +1,18 @@
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 from src.database.models import Page as ORMPage
 from src.entities import Page
 from typing import List
 
+page_table = ORMPage.__table__
+
 
 def create_page(session: Session, entity: Page) -> Page:
-    orm_page = entity.to_orm(ORMPage)
-    session.add(orm_page)
-    session.flush()
-    entity.page_id = orm_page.page_id
+    result = session.execute(insert(page_table).values(entity.to_row()))
+    entity.page_id = result.inserted_primary_key[0]
     return entity
 
 
 def get_pages_by_document_id(session: Session, document_id: int) -> List[Page]:
-    orm_pages = session.query(ORMPage).filter(ORMPage.document_id == document_id).all()
-    return [Page.from_orm(orm_page) for orm_page in orm_pages]
+    rows = session.execute(select(page_table).where(page_table.c.document_id == document_id))
+    return [Page.from_row(row) for row in rows]
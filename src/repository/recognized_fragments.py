@@ -1,41 +1,115 @@
+from sqlalchemy import and_, case, insert, literal, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from src.database.models import RecognizedFragment as ORMRecognizedFragment
+from src.database.models import (
+    Fragment as ORMFragment,
+    Page as ORMPage,
+    RecognizedFragment as ORMRecognizedFragment,
+)
 from src.entities import RecognizedFragment
-from typing import Optional
+from typing import Iterator, Optional, Sequence
 from datetime import datetime
 
+recognized_fragment_table = ORMRecognizedFragment.__table__
+fragment_table = ORMFragment.__table__
+page_table = ORMPage.__table__
+
+SCAN_BATCH_SIZE = 1000
+
 
 def create_recognized_fragment(session: Session, entity: RecognizedFragment) -> RecognizedFragment:
-    orm_fragment = entity.to_orm(ORMRecognizedFragment)
-    session.add(orm_fragment)
-    session.flush()
-    entity.recognized_fragment_id = orm_fragment.recognized_fragment_id
+    result = session.execute(insert(recognized_fragment_table).values(entity.to_row()))
+    entity.recognized_fragment_id = result.inserted_primary_key[0]
     return entity
 
 
 def get_recognized_fragment_by_fragment_id(
     session: Session, fragment_id: int, recognizer: str
 ) -> Optional[RecognizedFragment]:
-    orm_frag = (
-        session.query(ORMRecognizedFragment)
-        .filter(
-            ORMRecognizedFragment.fragment_id == fragment_id,
-            ORMRecognizedFragment.recognizer == recognizer,
+    row = session.execute(
+        select(recognized_fragment_table).where(
+            recognized_fragment_table.c.fragment_id == fragment_id,
+            recognized_fragment_table.c.recognizer == recognizer,
+        )
+    ).first()
+    return RecognizedFragment.from_row(row) if row else None
+
+
+def iter_recognized_fragments(
+    session: Session, recognizer: Optional[str] = None, batch_size: int = SCAN_BATCH_SIZE
+) -> Iterator[RecognizedFragment]:
+    """Потоковый обход результатов распознавания пачками по batch_size строк."""
+    query = select(recognized_fragment_table).order_by(
+        recognized_fragment_table.c.recognized_fragment_id
+    )
+    if recognizer is not None:
+        query = query.where(recognized_fragment_table.c.recognizer == recognizer)
+    result = session.execute(query, execution_options={"yield_per": batch_size})
+    for row in result:
+        yield RecognizedFragment.from_row(row)
+
+
+def iter_document_texts(
+    session: Session,
+    document_id: int,
+    recognizer_priority: Sequence[str],
+    batch_size: int = SCAN_BATCH_SIZE,
+) -> Iterator[Row]:
+    """
+    Фрагменты документа в порядке чтения (страница, order_number) с распознанным текстом.
+    На фрагмент приходится строка на каждый непустой результат: первым идет лучший по
+    recognizer_priority (не указанные в нем — после, свежие раньше); фрагмент без
+    результатов — одна строка с recognizer/recognized_text = NULL.
+    """
+    rf = recognized_fragment_table
+    if recognizer_priority:
+        rank = case(
+            {name: index for index, name in enumerate(recognizer_priority)},
+            value=rf.c.recognizer,
+            else_=len(recognizer_priority),
+        )
+    else:
+        rank = literal(0)
+    query = (
+        select(
+            page_table.c.number.label("page_number"),
+            page_table.c.width.label("page_width"),
+            page_table.c.height.label("page_height"),
+            page_table.c.dpi,
+            fragment_table.c.fragment_id,
+            fragment_table.c.order_number,
+            fragment_table.c.content_type,
+            fragment_table.c.left,
+            fragment_table.c.top,
+            fragment_table.c.width,
+            fragment_table.c.height,
+            rf.c.recognizer,
+            rf.c.text.label("recognized_text"),
+        )
+        .select_from(
+            fragment_table.join(
+                page_table, page_table.c.page_id == fragment_table.c.page_id
+            ).outerjoin(
+                rf, and_(rf.c.fragment_id == fragment_table.c.fragment_id, rf.c.text.is_not(None))
+            )
+        )
+        .where(page_table.c.document_id == document_id)
+        .order_by(
+            page_table.c.number,
+            fragment_table.c.order_number,
+            fragment_table.c.fragment_id,
+            rank,
+            rf.c.recognized_at.desc(),
         )
-        .first()
     )
-    return RecognizedFragment.from_orm(orm_frag) if orm_frag else None
+    yield from session.execute(query, execution_options={"yield_per": batch_size})
 
 
 def update_recognized_fragment(
     session: Session, entity: RecognizedFragment, recognized_text: str
 ) -> None:
-    orm_frag = (
-        session.query(ORMRecognizedFragment)
-        .filter(ORMRecognizedFragment.recognized_fragment_id == entity.recognized_fragment_id)
-        .first()
+    session.execute(
+        update(recognized_fragment_table)
+        .where(recognized_fragment_table.c.recognized_fragment_id == entity.recognized_fragment_id)
+        .values(text=recognized_text, recognized_at=datetime.utcnow())
     )
-    if orm_frag:
-        orm_frag.text = recognized_text
-        orm_frag.recognized_at = datetime.utcnow()
-        session.flush()
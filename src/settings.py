@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
 from src.entities import ContentType
 
@@ -17,15 +17,73 @@ class Settings:
     DB_PATH: Path = DATA_DIR / "db" / "database.db"
 
     # Image settings
+    # Цветность растеризации: "rgb", "gray" или "1bit" (порог RENDER_BW_THRESHOLD по серому).
+    # Режим сохраняется при нарезке и в хранилище; "gray" втрое меньше RGB в памяти
+    RENDER_COLOR_MODE: str = "rgb"
+    RENDER_BW_THRESHOLD: int = 160
     IMAGE_FORMAT: str = "PNG"
+    # JPEG: качество; lossless WebP: усилие сжатия (0-100). PNG параметр не использует
     IMAGE_QUALITY: int = 85
+    # Уровень zlib для PNG (0-9): 1-3 кодируют примерно вдвое быстрее 6, но страница
+    # с текстом выходит в 2-3 раза больше. Кодирование идет в фоне, поэтому по умолчанию 6
+    IMAGE_PNG_COMPRESS_LEVEL: int = 6
+    IMAGE_WEBP_LOSSLESS: bool = True
+    IMAGE_WEBP_METHOD: int = 4
+    # Асинхронная запись изображений: потоки кодирования и предел изображений в очереди
+    IMAGE_WRITER_WORKERS: int = 4
+    IMAGE_WRITER_MAX_PENDING: int = 64
     IMAGE_FRAGMENT_PATH_TEMPLATE: str = (
         "{filename}/frag_p{page_number}_o{order_number}_i{fragment_id}_{content_type}.{extension}"
     )
     IMAGE_PAGE_PATH_TEMPLATE: str = "{filename}/page_{page_number}_i{page_id}.{extension}"
+    # Хранилище изображений фрагментов: "filesystem" (файл на фрагмент) или "pack"
+    # (append-only pack-файл на документ и индекс смещений в SQLite)
+    IMAGE_STORE_BACKEND: str = "filesystem"
+    # Открытые mmap pack-файлов (по одному на документ), остальные закрываются по LRU
+    IMAGE_PACK_MAX_OPEN_MAPS: int = 16
+    # Что сохраняется при загрузке: "fragments" — страницы и вырезки фрагментов,
+    # "pages" — только страницы, "pdf" — ничего (страница растеризуется из PDF_INPUT_DIR).
+    # В режимах "pages"/"pdf" фрагменты вырезаются по координатам при чтении
+    FRAGMENT_IMAGE_MODE: str = "fragments"
+    # Сколько декодированных страниц держать в LRU при ленивой нарезке фрагментов
+    PAGE_IMAGE_CACHE_SIZE: int = 8
+
+    # Сервисный режим (main.py watch): период опроса PDF_INPUT_DIR и время "успокоения" файла
+    WATCH_POLL_INTERVAL_S: float = 2.0
+    WATCH_SETTLE_S: float = 3.0
+    # Пауза перед повторной обработкой файлов, на которых упала пачка или документ
+    WATCH_RETRY_DELAY_S: float = 30.0
+
+    # Staged PDF pipeline: потоки на стадию и размер очереди перед стадией (в страницах)
+    PIPELINE_RASTERIZE_WORKERS: int = 2
+    PIPELINE_CROP_WORKERS: int = 2
+    PIPELINE_QUEUE_SIZE: int = 4
 
     # Database settings
     SQLALCHEMY_DATABASE_URI: str = f"sqlite:///{DB_PATH}"
+    SQLITE_BUSY_TIMEOUT_S: float = 30.0
+    SQLITE_WAL: bool = True
+
+    # Параллельная загрузка: число процессов, одновременно обрабатывающих документы;
+    # 1 — документы загружаются в основном процессе
+    PDF_PROCESS_WORKERS: int = 1
+    # Срок на документ в процессе-воркере: BASE + PER_PAGE * число страниц, с;
+    # зависший документ считается ошибкой, пул перезапускается. None — без срока
+    PDF_DOCUMENT_TIMEOUT_BASE_S: Optional[float] = 300.0
+    PDF_DOCUMENT_TIMEOUT_PER_PAGE_S: float = 30.0
+
+    # Бюджет памяти процесса (src/utils/memory_governor.py), МБ; None — без ограничения.
+    # При параллельной загрузке делится поровну между процессами-воркерами. Выше верхней
+    # границы число страниц в полете и размер кэша страниц делятся пополам, ниже нижней —
+    # растут на 1 не чаще раза в MEMORY_RAMP_INTERVAL_S
+    MEMORY_BUDGET_MB: Optional[int] = None
+    MEMORY_HIGH_WATERMARK: float = 0.85
+    MEMORY_LOW_WATERMARK: float = 0.6
+    MEMORY_RAMP_INTERVAL_S: float = 2.0
+
+    # Reading order (XY-cut): минимальная ширина пустого промежутка проекции, px
+    READING_ORDER_MIN_GAP_X: float = 5.0
+    READING_ORDER_MIN_GAP_Y: float = 0.0
 
     # Layout analyzer settings
     LAYOUT_ANALYZER_URL: str = "http://localhost:5060"
@@ -34,6 +92,42 @@ class Settings:
     # Logging settings
     LOG_FILE: Path = LOG_DIR / "convert_pdf_to_pages.log"
     LOG_LEVEL: str = "DEBUG"
+    # Запись логов в фоновом потоке (QueueHandler/QueueListener)
+    LOG_QUEUE_ENABLED: bool = True
+    # Отладочные записи из циклов по фрагментам: не больше N в секунду (None — все)
+    LOG_DEBUG_RATE_PER_S: Optional[float] = 20.0
+    # Замеры стадий (src/utils/timing.py) в JSON-лог; сводка: python main.py report
+    TIMING_ENABLED: bool = True
+
+    # Метрики Prometheus: HTTP-эндпоинт /metrics (порт или None) и/или textfile для
+    # node_exporter (каталог или None; процессы-воркеры пишут каждый свой файл)
+    METRICS_NAMESPACE: str = "pdf2text"
+    METRICS_HTTP_ADDR: str = "127.0.0.1"
+    METRICS_HTTP_PORT: Optional[int] = None
+    METRICS_TEXTFILE_DIR: Optional[Path] = None
+    METRICS_TEXTFILE_INTERVAL_S: float = 15.0
+
+    # Профилирование документов (src/utils/profiling.py): режим "cprofile", "sampling" или None.
+    # Выбор: по имени PDF, по доле выборки или все с сохранением только медленнее порога
+    PROFILE_MODE: Optional[str] = None
+    PROFILE_DOCUMENTS: Tuple[str, ...] = ()
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_SLOW_THRESHOLD_S: Optional[float] = None
+    PROFILE_SAMPLING_INTERVAL_S: float = 0.005
+    PROFILE_TRACEMALLOC: bool = False
+    PROFILE_TRACEMALLOC_FRAMES: int = 1
+    PROFILE_TRACEMALLOC_TOP: int = 25
+    PROFILE_DIR: Path = LOG_DIR / "profiles"
+
+    # Экспорт текста в порядке чтения (main.py export): при нескольких результатах
+    # распознавания фрагмента берется первый распознаватель из списка
+    EXPORT_DIR: Path = DATA_DIR / "export"
+    EXPORT_RECOGNIZER_PRIORITY: Tuple[str, ...] = (
+        "pix2text-mfr-onnx",
+        "text-qwen2-vl-ocr-2b-instruct",
+    )
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_PARQUET_ROW_GROUP_SIZE: int = 10000
 
     # Recognizer settings (общие)
     RECOGNIZER_ALLOWED_TYPES = {
@@ -54,6 +148,9 @@ class Settings:
     }
 
     TEXT_RECOGNIZER_MODEL_NAME = "prithivMLmods/Qwen2-VL-OCR-2B-Instruct"
+    # Режим инференса без GPU: "fp32", "bf16" (если CPU поддерживает) или "int8-dynamic"
+    TEXT_RECOGNIZER_CPU_MODE: str = "fp32"
+    TEXT_RECOGNIZER_CPU_THREADS: Optional[int] = None
     TEXT_RECOGNIZER_PROMPT = (
         "Extract the exact text from the image in RUSSIAN ONLY. "
         "Do not add, complete, or invent any words, sentences, or punctuation. "
@@ -61,6 +158,66 @@ class Settings:
     )
     TEXT_RECOGNIZER_CACHE_DIR = DATA_DIR / "cache" / "qwen2-vl-ocr-2b-instruct"
 
+    # Бюджет визуальных токенов: один токен Qwen2-VL — патч 28x28 px
+    TEXT_RECOGNIZER_MIN_PIXELS: int = 64 * 28 * 28
+    TEXT_RECOGNIZER_MAX_PIXELS: int = 1280 * 28 * 28
+    TEXT_RECOGNIZER_PIXEL_BOUNDS: Dict[str, Tuple[int, int]] = {
+        ContentType.PAGE_HEADER.value: (16 * 28 * 28, 256 * 28 * 28),
+        ContentType.PAGE_FOOTER.value: (16 * 28 * 28, 256 * 28 * 28),
+        ContentType.CAPTION.value: (32 * 28 * 28, 512 * 28 * 28),
+        ContentType.SECTION_HEADER.value: (32 * 28 * 28, 512 * 28 * 28),
+        ContentType.TITLE.value: (32 * 28 * 28, 512 * 28 * 28),
+    }
+
+    # Бюджет выходных токенов: площадь фрагмента (px при 150 DPI) на один токен
+    TEXT_RECOGNIZER_PX_PER_TOKEN: int = 400
+    TEXT_RECOGNIZER_MIN_NEW_TOKENS: int = 32
+    TEXT_RECOGNIZER_MAX_NEW_TOKENS: int = 1024
+    TEXT_RECOGNIZER_TOKEN_FACTORS: Dict[str, float] = {
+        ContentType.FORMULA.value: 2.0,
+    }
+
+    # Подготовка фрагментов к распознаванию: нарезка высоких и упаковка мелких
+    RECOGNITION_TILE_TYPES = [
+        ContentType.TEXT.value,
+        ContentType.LIST_ITEM.value,
+        ContentType.FOOTNOTE.value,
+    ]
+    RECOGNITION_TILE_MAX_HEIGHT: int = 640
+    RECOGNITION_TILE_OVERLAP: int = 48
+    RECOGNITION_PACK_TYPES = [
+        ContentType.LIST_ITEM.value,
+        ContentType.PAGE_FOOTER.value,
+        ContentType.PAGE_HEADER.value,
+        ContentType.CAPTION.value,
+        ContentType.FOOTNOTE.value,
+    ]
+    RECOGNITION_PACK_MAX_FRAGMENT_HEIGHT: int = 80
+    RECOGNITION_PACK_MAX_ITEMS: int = 8
+    RECOGNITION_PACK_MAX_HEIGHT: int = 640
+    RECOGNITION_PACK_SEPARATOR: str = "###"
+    TEXT_RECOGNIZER_PACKED_PROMPT = (
+        "The image contains several text fragments separated by lines with ###. "
+        "Extract the exact text of every fragment in RUSSIAN ONLY, in order, "
+        "and output a line with ### between fragments. "
+        "Do not add, complete, or invent any words, sentences, or punctuation."
+    )
+
+    # Отсев пустых и шумовых фрагментов перед распознаванием
+    BLANK_FILTER_ENABLED: bool = True
+    BLANK_FILTER_INK_THRESHOLD: int = 128
+    BLANK_FILTER_MIN_STD: float = 4.0
+    BLANK_FILTER_MIN_INK_RATIO: float = 0.003
+    # 1: одиночный символ (номер страницы, "№", формула из одного знака) распознается
+    BLANK_FILTER_MIN_COMPONENTS: int = 1
+    BLANK_FILTER_MIN_COMPONENT_AREA: int = 8
+    BLANK_FILTER_MIN_LARGE_INK_RATIO: float = 0.15
+    # Единственная компонента — линейка: занимает >= RULE_MIN_SPAN стороны кропа, толщиной
+    # <= RULE_MAX_THICKNESS px и длиннее толщины в RULE_MIN_ELONGATION раз (цифра "1" короче)
+    BLANK_FILTER_RULE_MIN_SPAN: float = 0.8
+    BLANK_FILTER_RULE_MAX_THICKNESS: float = 4.0
+    BLANK_FILTER_RULE_MIN_ELONGATION: float = 10.0
+
     # Formula recognizer settings
     FORMULA_RECOGNIZER_MODEL_BACKEND: str = "onnx"
     FORMULA_RECOGNIZER_MODEL_DIR: Path = DATA_DIR / "cache" / "pix2text-mfr-onnx"
@@ -0,0 +1,75 @@
+from typing import NamedTuple, Optional
+import numpy as np
+from PIL import Image
+from src.config import config_provider
+
+settings = config_provider.get_settings()
+
+
+class PixelStats(NamedTuple):
+    ink_ratio: float
+    std: float
+    components: int
+    large_component_ink_ratio: float
+    # Крупнейшая компонента как линия: длина (px), средняя толщина (px) и доля стороны кропа
+    line_length: int = 0
+    line_thickness: float = 0.0
+    line_span: float = 0.0
+
+
+def compute_pixel_stats(image: Image.Image) -> PixelStats:
+    """Считает статистики пикселей кропа: доля чернил, разброс яркости, связные компоненты."""
+    from scipy import ndimage
+
+    gray = np.asarray(image.convert("L"), dtype=np.float32)
+    ink = gray < settings.BLANK_FILTER_INK_THRESHOLD
+    ink_pixels = int(ink.sum())
+    if not ink_pixels:
+        return PixelStats(0.0, float(gray.std()), 0, 0.0)
+
+    labels, components = ndimage.label(ink)
+    sizes = np.bincount(labels.ravel())[1:]
+    large_ink = int(sizes[sizes >= settings.BLANK_FILTER_MIN_COMPONENT_AREA].sum())
+
+    largest = int(sizes.argmax())
+    rows, cols = ndimage.find_objects(labels, max_label=largest + 1)[largest]
+    height, width = rows.stop - rows.start, cols.stop - cols.start
+    length, side = (width, ink.shape[1]) if width >= height else (height, ink.shape[0])
+    return PixelStats(
+        ink_ratio=ink_pixels / ink.size,
+        std=float(gray.std()),
+        components=int(components),
+        large_component_ink_ratio=large_ink / ink_pixels,
+        line_length=length,
+        # Площадь на длину: устойчиво к небольшому наклону линии, в отличие от bbox
+        line_thickness=float(sizes[largest]) / length,
+        line_span=length / side,
+    )
+
+
+def is_thin_rule(stats: PixelStats) -> bool:
+    """Линейка: тонкая вытянутая компонента почти во всю ширину или высоту кропа."""
+    return (
+        stats.line_span >= settings.BLANK_FILTER_RULE_MIN_SPAN
+        and stats.line_thickness <= settings.BLANK_FILTER_RULE_MAX_THICKNESS
+        and stats.line_length >= settings.BLANK_FILTER_RULE_MIN_ELONGATION * stats.line_thickness
+    )
+
+
+def get_skip_reason(image: Image.Image) -> Optional[str]:
+    """
+    Возвращает причину пропуска для пустого или шумового фрагмента
+    (пробелы, шум сканирования, тонкая линейка) либо None, если его стоит распознавать.
+    """
+    stats = compute_pixel_stats(image)
+    if stats.std < settings.BLANK_FILTER_MIN_STD:
+        return "uniform"
+    if stats.ink_ratio < settings.BLANK_FILTER_MIN_INK_RATIO:
+        return "no_ink"
+    if stats.components < settings.BLANK_FILTER_MIN_COMPONENTS:
+        return "too_few_components"
+    if stats.components == 1 and is_thin_rule(stats):
+        return "thin_rule"
+    if stats.large_component_ink_ratio < settings.BLANK_FILTER_MIN_LARGE_INK_RATIO:
+        return "speckle_noise"
+    return None
@@ -0,0 +1,123 @@
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Hashable, Optional
+from PIL import Image
+
+from src.config import config_provider
+from src.converters.pdf_to_page_images import PdfConversionError, convert_pdf_page
+from src.entities import Fragment, Page
+from src.utils.image_saver import crop_fragment, fragment_image_key, page_image_key
+from src.utils.image_store import get_image_store
+from src.utils.memory_governor import memory_governor
+
+settings = config_provider.get_settings()
+cache_requests_total = config_provider.get_metrics().counter(
+    "page_cache_requests_total", "Decoded page cache lookups", ["result"]
+)
+
+FRAGMENT_IMAGE_MODES = ("fragments", "pages", "pdf")
+
+
+class PageImageCache:
+    """
+    LRU декодированных страниц. Фрагменты читаются в порядке страниц, поэтому
+    нескольких страниц хватает, чтобы каждая страница декодировалась один раз.
+    При нехватке памяти memory_governor уменьшает емкость (ресурс "page_cache").
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._pages: "OrderedDict[Hashable, Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, load: Callable[[], Image.Image]) -> Image.Image:
+        with self._lock:
+            image = self._pages.get(key)
+            if image is not None:
+                self._pages.move_to_end(key)
+                self.hits += 1
+                cache_requests_total.inc(result="hit")
+                return image
+            self.misses += 1
+        cache_requests_total.inc(result="miss")
+
+        # Декодирование вне блокировки: соседние потоки читают другие страницы
+        image = load()
+        with self._lock:
+            self._pages[key] = image
+            self._pages.move_to_end(key)
+            capacity = self.capacity()
+            while len(self._pages) > capacity:
+                self._pages.popitem(last=False)
+        return image
+
+    def capacity(self) -> int:
+        limit = memory_governor.limit("page_cache")
+        return self.maxsize if limit is None else min(self.maxsize, limit)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+
+page_cache = PageImageCache(settings.PAGE_IMAGE_CACHE_SIZE)
+memory_governor.register("page_cache", settings.PAGE_IMAGE_CACHE_SIZE)
+
+
+def _render_page(pdf_path: Path, page: Page) -> Image.Image:
+    if not pdf_path.is_file():
+        raise PdfConversionError(f"Source PDF not found: {pdf_path}")
+    result = convert_pdf_page(pdf_path, page.number, page.dpi)
+    if result.error or result.image is None:
+        raise PdfConversionError(f"Cannot render page {page.number} of {pdf_path}: {result.error}")
+    return result.image
+
+
+def load_page_image(
+    output_dir: Path,
+    filename: str,
+    fragment: Fragment,
+    page: Optional[Page] = None,
+    source_pdf: Optional[Path] = None,
+) -> Image.Image:
+    """
+    Страница фрагмента из хранилища ("pages") или из исходного PDF ("pdf") через LRU.
+    Для "pdf" нужны страница (dpi) и путь к исходному файлу (manifest.find_source_file).
+    """
+    if settings.FRAGMENT_IMAGE_MODE == "pdf":
+        if page is None or source_pdf is None:
+            raise ValueError("FRAGMENT_IMAGE_MODE='pdf' requires the fragment page and source PDF")
+        return page_cache.get(
+            ("pdf", str(source_pdf), page.page_id), lambda: _render_page(source_pdf, page)
+        )
+
+    key = page_image_key(filename, fragment.page_number, fragment.page_id)
+    return page_cache.get(
+        (str(output_dir), key), lambda: get_image_store(output_dir).read_image(key)
+    )
+
+
+def load_fragment_image(
+    output_dir: Path,
+    filename: str,
+    fragment: Fragment,
+    page: Optional[Page] = None,
+    source_pdf: Optional[Path] = None,
+) -> Image.Image:
+    """
+    Изображение фрагмента: сохраненная вырезка (FRAGMENT_IMAGE_MODE="fragments")
+    или виртуальная вырезка из страницы по координатам фрагмента.
+    """
+    mode = settings.FRAGMENT_IMAGE_MODE
+    if mode not in FRAGMENT_IMAGE_MODES:
+        raise ValueError(f"Unknown fragment image mode: {mode}")
+    if mode == "fragments":
+        return get_image_store(output_dir).read_image(
+            fragment_image_key(filename, fragment.page_number, fragment)
+        )
+    return crop_fragment(
+        load_page_image(output_dir, filename, fragment, page, source_pdf), fragment
+    )
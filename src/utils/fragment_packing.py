@@ -0,0 +1,149 @@
+import re
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+INK_THRESHOLD = 128
+BLANK_ROW_INK_RATIO = 0.002
+
+
+def find_line_gaps(image: Image.Image) -> List[int]:
+    """
+    Возвращает строки пикселей, лежащие в середине межстрочных промежутков
+    (горизонтальная проекция чернил).
+    """
+    ink = np.asarray(image.convert("L")) < INK_THRESHOLD
+    blank = ink.mean(axis=1) <= BLANK_ROW_INK_RATIO
+    if not blank.any():
+        return []
+
+    edges = np.diff(np.concatenate(([0], blank.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return [int(row) for row in (starts + ends) // 2]
+
+
+def compute_tile_bounds(
+    height: int, gaps: Sequence[int], max_height: int, overlap: int
+) -> List[Tuple[int, int]]:
+    """
+    Делит высоту на тайлы не выше max_height. Границы ставятся на межстрочные промежутки,
+    следующий тайл начинается с самого раннего промежутка в окне overlap,
+    чтобы строки на стыке попали в оба тайла.
+    """
+    if height <= max_height:
+        return [(0, height)]
+
+    bounds = []
+    start = 0
+    while start + max_height < height:
+        limit = start + max_height
+        candidates = [gap for gap in gaps if start + max_height // 2 < gap <= limit]
+        cut = max(candidates) if candidates else limit
+
+        overlap_gaps = [gap for gap in gaps if max(cut - overlap, start) < gap < cut]
+        next_start = min(overlap_gaps) if overlap_gaps else max(cut - overlap, start + 1)
+
+        bounds.append((start, cut))
+        start = next_start
+    bounds.append((start, height))
+    return bounds
+
+
+def split_into_tiles(image: Image.Image, max_height: int, overlap: int) -> List[Image.Image]:
+    if image.height <= max_height:
+        return [image]
+    bounds = compute_tile_bounds(image.height, find_line_gaps(image), max_height, overlap)
+    return [image.crop((0, top, image.width, bottom)) for top, bottom in bounds]
+
+
+def _normalize_spaces(text: str) -> Tuple[str, List[int]]:
+    """Схлопывает пробельные символы в один пробел; для каждого символа — индекс в исходном."""
+    chars, positions = [], []
+    for index, char in enumerate(text):
+        if char.isspace():
+            if chars and chars[-1] == " ":
+                continue
+            char = " "
+        chars.append(char)
+        positions.append(index)
+    return "".join(chars), positions
+
+
+def _within_mismatches(a: str, b: str, allowed: int) -> bool:
+    for char_a, char_b in zip(a, b):
+        if char_a != char_b:
+            allowed -= 1
+            if allowed < 0:
+                return False
+    return True
+
+
+def _merge_overlapping(
+    left: str, right: str, window: int, min_overlap: int, mismatch_ratio: float = 0.04
+) -> str:
+    """
+    Перекрытие ищется только на стыке: конец left должен совпасть с началом right
+    (с точностью до пробелов и mismatch_ratio несовпавших символов). Повтор фразы
+    в глубине тайла стыком не считается.
+    """
+    tail, _ = _normalize_spaces(left[-window:].rstrip())
+    head, head_positions = _normalize_spaces(right[:window].lstrip())
+    skipped = len(right) - len(right.lstrip())
+    for size in range(min(len(tail), len(head)), min_overlap - 1, -1):
+        if _within_mismatches(tail[-size:], head[:size], int(size * mismatch_ratio)):
+            return left.rstrip() + right[skipped + head_positions[size - 1] + 1 :]
+    return f"{left}\n{right}"
+
+
+def stitch_texts(texts: Sequence[Optional[str]], window: int = 300, min_overlap: int = 8) -> str:
+    """Склеивает текст соседних тайлов, удаляя повтор на стыке (перекрытие тайлов)."""
+    result = ""
+    for text in texts:
+        if not text:
+            continue
+        result = _merge_overlapping(result, text, window, min_overlap) if result else text
+    return result
+
+
+def _load_separator_font(size: int) -> ImageFont.ImageFont:
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def pack_images(
+    images: Sequence[Image.Image], separator: str, separator_height: int = 40, padding: int = 10
+) -> Image.Image:
+    """
+    Собирает изображения в одну вертикальную композицию, разделяя их полосой с маркером
+    separator, который модель переносит в распознанный текст.
+    """
+    width = max(image.width for image in images) + 2 * padding
+    height = sum(image.height for image in images) + separator_height * (len(images) - 1)
+    height += 2 * padding
+
+    # Серые фрагменты собираются в серую композицию: каналы расширит распознаватель
+    mode = "L" if all(image.mode in ("L", "1") for image in images) else "RGB"
+    composite = Image.new(mode, (width, height), "white")
+    draw = ImageDraw.Draw(composite)
+    font = _load_separator_font(separator_height // 2)
+
+    top = padding
+    for index, image in enumerate(images):
+        if index:
+            draw.text((padding, top + separator_height // 4), separator, fill="black", font=font)
+            top += separator_height
+        composite.paste(image.convert(mode), (padding, top))
+        top += image.height
+    return composite
+
+
+def split_packed_text(text: str, count: int, separator: str) -> Optional[List[str]]:
+    """Делит текст композиции по строкам-маркерам. None, если число частей не совпало."""
+    pattern = re.compile(rf"^\s*{re.escape(separator)}\s*$", re.MULTILINE)
+    parts = [part.strip() for part in pattern.split(text)]
+    if len(parts) != count:
+        return None
+    return parts
@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+import numpy as np
+from src.entities import ContentType, Fragment, RawFragment
+from src.utils.coordinates import POINTS_PER_INCH
+
+CONTENT_TYPES = tuple(ContentType)
+TYPE_CODES: Dict[str, int] = {
+    content_type.value: code for code, content_type in enumerate(CONTENT_TYPES)
+}
+UNKNOWN_TYPE = -1
+
+# Поправки к рамке фрагмента в px, как в scale_coordinates_from_pt_to_px
+BOX_CORRECTION = np.array([0, -4, 6, 4], dtype=np.float64)
+
+
+@dataclass
+class FragmentTable:
+    """
+    Колоночное представление всех фрагментов документа: массивы NumPy вместо списка
+    dataclass-ов. boxes — (left, top, right, bottom) в pt до scale_to_px и в px после.
+    """
+
+    page_numbers: np.ndarray
+    type_codes: np.ndarray
+    boxes: np.ndarray
+    page_sizes: np.ndarray
+    texts: List[Optional[str]]
+    order_numbers: np.ndarray
+
+    @classmethod
+    def from_raw(cls, raw_fragments: Sequence[RawFragment]) -> "FragmentTable":
+        count = len(raw_fragments)
+        columns = np.array(
+            [
+                (f["left"], f["top"], f["width"], f["height"], f["page_width"], f["page_height"])
+                for f in raw_fragments
+            ],
+            dtype=np.float64,
+        ).reshape(count, 6)
+        boxes = columns[:, :4].copy()
+        boxes[:, 2:] += boxes[:, :2]
+        return cls(
+            page_numbers=np.array([f["page_number"] for f in raw_fragments], dtype=np.int64),
+            type_codes=np.array(
+                [TYPE_CODES.get(f["type"], UNKNOWN_TYPE) for f in raw_fragments], dtype=np.int8
+            ),
+            boxes=boxes,
+            page_sizes=columns[:, 4:].copy(),
+            texts=[f.get("text") for f in raw_fragments],
+            order_numbers=np.full(count, -1, dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.page_numbers)
+
+    def take(self, indices: np.ndarray) -> "FragmentTable":
+        return FragmentTable(
+            page_numbers=self.page_numbers[indices],
+            type_codes=self.type_codes[indices],
+            boxes=self.boxes[indices],
+            page_sizes=self.page_sizes[indices],
+            texts=[self.texts[i] for i in indices],
+            order_numbers=self.order_numbers[indices],
+        )
+
+    def valid_mask(self, min_width: float, min_height: float) -> np.ndarray:
+        sizes = self.boxes[:, 2:] - self.boxes[:, :2]
+        return (
+            (self.type_codes != UNKNOWN_TYPE)
+            & (sizes[:, 0] >= min_width)
+            & (sizes[:, 1] >= min_height)
+        )
+
+    def scale_to_px(self, dpi: int) -> "FragmentTable":
+        """Переводит рамки и размеры страниц из pt в px и обрезает рамки по границам страницы."""
+        scale = dpi / POINTS_PER_INCH
+        page_sizes = np.trunc(self.page_sizes * scale)
+        boxes = np.trunc(self.boxes * scale) + BOX_CORRECTION
+        limits = np.concatenate((page_sizes, page_sizes), axis=1)
+        boxes = np.clip(boxes, 0, limits)
+        return FragmentTable(
+            page_numbers=self.page_numbers,
+            type_codes=self.type_codes,
+            boxes=boxes,
+            page_sizes=page_sizes,
+            texts=self.texts,
+            order_numbers=self.order_numbers,
+        )
+
+    def page_groups(self) -> Dict[int, np.ndarray]:
+        """Индексы фрагментов по номеру страницы (одна стабильная сортировка на документ)."""
+        order = np.argsort(self.page_numbers, kind="stable")
+        pages, starts = np.unique(self.page_numbers[order], return_index=True)
+        return dict(zip(pages.tolist(), np.split(order, starts[1:])))
+
+    def assign_order(
+        self, order_page: Callable[[np.ndarray, np.ndarray], np.ndarray]
+    ) -> "FragmentTable":
+        """order_page(boxes, type_codes) -> перестановка индексов страницы."""
+        order_numbers = np.full(len(self), -1, dtype=np.int64)
+        for indices in self.page_groups().values():
+            order = order_page(self.boxes[indices], self.type_codes[indices])
+            order_numbers[indices[order]] = np.arange(len(indices))
+        self.order_numbers = order_numbers
+        return self
+
+    def content_type(self, index: int) -> ContentType:
+        return CONTENT_TYPES[self.type_codes[index]]
+
+    def to_fragments(self, indices: np.ndarray, page_id: Optional[int] = None) -> List[Fragment]:
+        return [
+            Fragment(
+                fragment_id=None,
+                page_id=page_id,
+                page_number=int(self.page_numbers[i]),
+                content_type=self.content_type(i),
+                order_number=int(self.order_numbers[i]) if self.order_numbers[i] >= 0 else None,
+                left=int(self.boxes[i, 0]),
+                top=int(self.boxes[i, 1]),
+                width=int(self.boxes[i, 2]),
+                height=int(self.boxes[i, 3]),
+                text=self.texts[i],
+            )
+            for i in indices
+        ]
@@ -1,21 +1,98 @@
+import logging
 from pathlib import Path
+from typing import Any, Dict, Optional
 from PIL import Image
 from src.config import config_provider
 from src.entities import Fragment
+from src.utils.image_store import ImageStore, get_image_store
+from src.utils.image_writer import ImageWriter
+from src.utils.timing import span
 
 settings = config_provider.get_settings()
 
 
-def save_page_image(
-    image: Image.Image, output_dir: Path, filename: str, page_number: int, page_id: int
-) -> Path:
-    extension = settings.IMAGE_FORMAT.lower()
-    image_path = output_dir / settings.IMAGE_PAGE_PATH_TEMPLATE.format(
-        filename=filename, page_number=page_number, page_id=page_id, extension=extension
+def get_save_options(image_format: str = settings.IMAGE_FORMAT) -> Dict[str, Any]:
+    """Параметры кодера Pillow для формата: у PNG нет quality, только уровень zlib."""
+    image_format = image_format.upper()
+    if image_format == "PNG":
+        return {"compress_level": settings.IMAGE_PNG_COMPRESS_LEVEL}
+    if image_format == "WEBP":
+        return {
+            "lossless": settings.IMAGE_WEBP_LOSSLESS,
+            "quality": settings.IMAGE_QUALITY,
+            "method": settings.IMAGE_WEBP_METHOD,
+        }
+    return {"quality": settings.IMAGE_QUALITY}
+
+
+def image_nbytes(image: Image.Image) -> int:
+    """Размер декодированного изображения в памяти."""
+    bits = 1 if image.mode == "1" else 8 * len(image.getbands())
+    return (image.width * image.height * bits + 7) // 8
+
+
+def write_image(store: ImageStore, image: Image.Image, key: str) -> int:
+    # JPEG не умеет 1-битные изображения; PNG хранит "L" и "1" как есть
+    if image.mode == "1" and settings.IMAGE_FORMAT.upper() in ("JPEG", "JPG"):
+        image = image.convert("L")
+    with span("image.encode", level=logging.DEBUG, key=key) as encode_span:
+        size = store.write_image(key, image, settings.IMAGE_FORMAT, **get_save_options())
+        encode_span.add(bytes=size, items=1)
+    return size
+
+
+def create_image_writer(output_dir: Path) -> ImageWriter:
+    store = get_image_store(output_dir)
+    return ImageWriter(
+        lambda image, key: write_image(store, image, key),
+        settings.IMAGE_WRITER_WORKERS,
+        settings.IMAGE_WRITER_MAX_PENDING,
+    )
+
+
+def _write(output_dir: Path, image: Image.Image, key: str, writer: Optional[ImageWriter]) -> None:
+    if writer is None:
+        write_image(get_image_store(output_dir), image, key)
+    else:
+        writer.submit(image, key)
+
+
+def page_image_key(filename: str, page_number: int, page_id: int) -> str:
+    return settings.IMAGE_PAGE_PATH_TEMPLATE.format(
+        filename=filename,
+        page_number=page_number,
+        page_id=page_id,
+        extension=settings.IMAGE_FORMAT.lower(),
+    )
+
+
+def fragment_image_key(filename: str, page_number: int, fragment: Fragment) -> str:
+    return settings.IMAGE_FRAGMENT_PATH_TEMPLATE.format(
+        filename=filename,
+        page_number=page_number,
+        order_number=fragment.order_number or 0,
+        fragment_id=fragment.fragment_id,
+        content_type=fragment.content_type.value.lower(),
+        extension=settings.IMAGE_FORMAT.lower(),
     )
-    image_path.parent.mkdir(parents=True, exist_ok=True)
-    image.save(image_path, format=settings.IMAGE_FORMAT, quality=settings.IMAGE_QUALITY)
-    return image_path
+
+
+def crop_fragment(page_image: Image.Image, fragment: Fragment) -> Image.Image:
+    # width/height фрагмента хранят правую и нижнюю границы в px
+    return page_image.crop((fragment.left, fragment.top, fragment.width, fragment.height))
+
+
+def save_page_image(
+    image: Image.Image,
+    output_dir: Path,
+    filename: str,
+    page_number: int,
+    page_id: int,
+    writer: Optional[ImageWriter] = None,
+) -> str:
+    key = page_image_key(filename, page_number, page_id)
+    _write(output_dir, image, key, writer)
+    return key
 
 
 def save_fragment_image(
@@ -24,21 +101,14 @@ def save_fragment_image(
     filename: str,
     page_number: int,
     fragment: Fragment,
-) -> Path:
+    writer: Optional[ImageWriter] = None,
+) -> str:
     """
     Вырезает и сохраняет изображение фрагмента, используя готовые координаты в пикселях.
+    С writer кодирование и запись выполняются в его пуле потоков.
     """
-    fragment_image = page_image.crop((fragment.left, fragment.top, fragment.width, fragment.height))
+    fragment_image = crop_fragment(page_image, fragment)
 
-    extension = settings.IMAGE_FORMAT.lower()
-    image_path = output_dir / settings.IMAGE_FRAGMENT_PATH_TEMPLATE.format(
-        filename=filename,
-        page_number=page_number,
-        order_number=fragment.order_number or 0,
-        fragment_id=fragment.fragment_id,
-        content_type=fragment.content_type.value.lower(),
-        extension=extension,
-    )
-    image_path.parent.mkdir(parents=True, exist_ok=True)
-    fragment_image.save(image_path, format=settings.IMAGE_FORMAT, quality=settings.IMAGE_QUALITY)
-    return image_path
+    key = fragment_image_key(filename, page_number, fragment)
+    _write(output_dir, fragment_image, key, writer)
+    return key
@@ -0,0 +1,266 @@
+import io
+import mmap
+import os
+import shutil
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from PIL import Image
+
+from src.config import config_provider
+
+settings = config_provider.get_settings()
+
+
+class ImageNotFoundError(FileNotFoundError):
+    """Изображение с указанным ключом отсутствует в хранилище."""
+
+    pass
+
+
+class ImageStore(ABC):
+    """
+    Хранилище изображений по ключу вида "{filename}/<имя файла>"
+    (см. IMAGE_*_PATH_TEMPLATE). Первая часть ключа — документ.
+    """
+
+    @abstractmethod
+    def write_bytes(self, key: str, data: bytes) -> None: ...
+
+    @abstractmethod
+    def read_bytes(self, key: str) -> bytes: ...
+
+    @abstractmethod
+    def exists(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def delete_document(self, filename: str) -> None: ...
+
+    def close(self) -> None:
+        pass
+
+    def compact(self) -> Dict[str, int]:
+        """Освобождает место от устаревших версий; байты по документам. Только офлайн."""
+        return {}
+
+    def write_image(self, key: str, image: Image.Image, image_format: str, **options) -> int:
+        """Кодирует и сохраняет изображение; возвращает размер в байтах."""
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, **options)
+        self.write_bytes(key, buffer.getvalue())
+        return buffer.tell()
+
+    def read_image(self, key: str) -> Image.Image:
+        image = Image.open(io.BytesIO(self.read_bytes(key)))
+        image.load()
+        return image
+
+
+class FilesystemImageStore(ImageStore):
+    """Один файл на изображение: root / key."""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def write_bytes(self, key: str, data: bytes) -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    def write_image(self, key: str, image: Image.Image, image_format: str, **options) -> int:
+        # Без промежуточного буфера: Pillow пишет прямо в файл
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        image.save(path, format=image_format, **options)
+        return path.stat().st_size
+
+    def read_bytes(self, key: str) -> bytes:
+        try:
+            return (self.root / key).read_bytes()
+        except FileNotFoundError as e:
+            raise ImageNotFoundError(key) from e
+
+    def exists(self, key: str) -> bool:
+        return (self.root / key).is_file()
+
+    def delete_document(self, filename: str) -> None:
+        shutil.rmtree(self.root / filename, ignore_errors=True)
+
+
+class PackImageStore(ImageStore):
+    """
+    Append-only pack-файл на документ (root/packs/{filename}.pack) и индекс
+    смещений в SQLite (root/packs/index.db). Повторная запись ключа дописывает
+    новую версию в конец и переключает индекс, поэтому pack только растет, пока его
+    не сожмет compact() (python main.py repack). Чтение — через mmap pack-файла;
+    открытыми держатся не больше IMAGE_PACK_MAX_OPEN_MAPS отображений (LRU).
+    """
+
+    INDEX_SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS pack_entry ("
+        "key TEXT PRIMARY KEY, document TEXT NOT NULL, pack_offset INTEGER NOT NULL, "
+        "length INTEGER NOT NULL)"
+    )
+
+    def __init__(self, root: Path):
+        self.pack_dir = root / "packs"
+        self.pack_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.pack_dir / "index.db"
+        self._local = threading.local()
+        self._pack_locks: Dict[str, threading.Lock] = {}
+        self._maps: Dict[str, Tuple[mmap.mmap, int]] = {}
+        self._lock = threading.Lock()
+        with self._connection() as connection:
+            connection.execute(self.INDEX_SCHEMA)
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_pack_entry_document ON pack_entry (document)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # Отдельное соединение на поток (запись идет из пула ImageWriter) и на процесс:
+        # после fork соединение родителя не переиспользуется
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.index_path, timeout=settings.SQLITE_BUSY_TIMEOUT_S)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    @staticmethod
+    def _document(key: str) -> str:
+        return key.split("/", 1)[0]
+
+    def _pack_path(self, document: str) -> Path:
+        return self.pack_dir / f"{document}.pack"
+
+    def _pack_lock(self, document: str) -> threading.Lock:
+        with self._lock:
+            return self._pack_locks.setdefault(document, threading.Lock())
+
+    def write_bytes(self, key: str, data: bytes) -> None:
+        document = self._document(key)
+        with self._pack_lock(document):
+            with open(self._pack_path(document), "ab") as pack:
+                offset = pack.tell()
+                pack.write(data)
+            with self._connection() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO pack_entry (key, document, pack_offset, length) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, document, offset, len(data)),
+                )
+
+    def _lookup(self, key: str) -> Tuple[str, int, int]:
+        row = (
+            self._connection()
+            .execute("SELECT document, pack_offset, length FROM pack_entry WHERE key = ?", (key,))
+            .fetchone()
+        )
+        if row is None:
+            raise ImageNotFoundError(key)
+        return row
+
+    def read_bytes(self, key: str) -> bytes:
+        document, offset, length = self._lookup(key)
+        # mmap переоткрывается, если pack дописан после отображения; срез — под той же
+        # блокировкой, чтобы соседний поток не закрыл отображение посреди чтения
+        with self._lock:
+            mapped = self._maps.pop(document, None)
+            if mapped is None or mapped[1] < offset + length:
+                if mapped:
+                    mapped[0].close()
+                with open(self._pack_path(document), "rb") as pack:
+                    size = os.fstat(pack.fileno()).st_size
+                    mapped = (mmap.mmap(pack.fileno(), size, access=mmap.ACCESS_READ), size)
+            # dict хранит порядок вставки: в конце — последний прочитанный документ
+            self._maps[document] = mapped
+            while len(self._maps) > settings.IMAGE_PACK_MAX_OPEN_MAPS:
+                self._maps.pop(next(iter(self._maps)))[0].close()
+            return mapped[0][offset : offset + length]
+
+    def exists(self, key: str) -> bool:
+        try:
+            self._lookup(key)
+            return True
+        except ImageNotFoundError:
+            return False
+
+    def delete_document(self, filename: str) -> None:
+        with self._pack_lock(filename):
+            with self._lock:
+                mapped = self._maps.pop(filename, None)
+                if mapped:
+                    mapped[0].close()
+            with self._connection() as connection:
+                connection.execute("DELETE FROM pack_entry WHERE document = ?", (filename,))
+            self._pack_path(filename).unlink(missing_ok=True)
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Переписывает pack-файлы без устаревших версий ключей. Запускать, когда хранилище
+        не используют другие процессы: их дозапись во время сжатия была бы потеряна.
+        """
+        reclaimed = {}
+        for pack_path in sorted(self.pack_dir.glob("*.pack")):
+            freed = self._compact_document(pack_path.stem)
+            if freed:
+                reclaimed[pack_path.stem] = freed
+        return reclaimed
+
+    def _compact_document(self, document: str) -> int:
+        pack_path = self._pack_path(document)
+        tmp_path = pack_path.with_name(f"{pack_path.name}.tmp")
+        with self._pack_lock(document), self._lock:
+            connection = self._connection()
+            rows = connection.execute(
+                "SELECT key, pack_offset, length FROM pack_entry WHERE document = ? "
+                "ORDER BY pack_offset",
+                (document,),
+            ).fetchall()
+            size = pack_path.stat().st_size
+            live = sum(length for _, _, length in rows)
+            if live == size:
+                return 0
+
+            moved = []
+            with open(pack_path, "rb") as source, open(tmp_path, "wb") as target:
+                for key, offset, length in rows:
+                    source.seek(offset)
+                    moved.append((target.tell(), key))
+                    target.write(source.read(length))
+                target.flush()
+                os.fsync(target.fileno())
+
+            mapped = self._maps.pop(document, None)
+            if mapped:
+                mapped[0].close()
+            # Файл подменяется внутри транзакции индекса: при ошибке замены смещения откатятся
+            with connection:
+                connection.executemany("UPDATE pack_entry SET pack_offset = ? WHERE key = ?", moved)
+                os.replace(tmp_path, pack_path)
+            return size - live
+
+    def close(self) -> None:
+        with self._lock:
+            for mapped, _ in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+
+
+IMAGE_STORE_BACKENDS = {
+    "filesystem": FilesystemImageStore,
+    "pack": PackImageStore,
+}
+
+
+@lru_cache(maxsize=None)
+def get_image_store(root: Path, backend: Optional[str] = None) -> ImageStore:
+    """Одно хранилище на (root, backend) в процессе; по умолчанию IMAGE_STORE_BACKEND."""
+    backend = backend or settings.IMAGE_STORE_BACKEND
+    if backend not in IMAGE_STORE_BACKENDS:
+        raise ValueError(f"Unknown image store backend: {backend}")
+    return IMAGE_STORE_BACKENDS[backend](root)
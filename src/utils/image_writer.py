@@ -0,0 +1,61 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Tuple
+from PIL import Image
+
+from src.config import config_provider
+
+logger = config_provider.get_logger(__name__)
+
+# (ключ изображения, текст ошибки)
+WriteError = Tuple[str, str]
+
+
+class ImageWriter:
+    """
+    Пул потоков для кодирования и записи изображений: кодеры Pillow (zlib, libwebp)
+    отпускают GIL. Число изображений в очереди ограничено max_pending — submit
+    блокируется, пока пул не догонит. flush() — барьер перед commit.
+    """
+
+    def __init__(self, save: Callable[[Image.Image, str], None], workers: int, max_pending: int):
+        self._save = save
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._futures: List[Tuple[str, Future]] = []
+
+    def submit(self, image: Image.Image, key: str) -> Future:
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._save, image, key)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        with self._lock:
+            self._futures.append((key, future))
+        return future
+
+    def flush(self) -> List[WriteError]:
+        """Ждет все отправленные записи и возвращает (ключ, ошибка) для неудавшихся."""
+        with self._lock:
+            futures, self._futures = self._futures, []
+        errors = []
+        for key, future in futures:
+            error = future.exception()
+            if error is not None:
+                errors.append((key, str(error)))
+                logger.error({"msg": "Failed to write image", "key": key, "error": str(error)})
+        return errors
+
+    def close(self) -> List[WriteError]:
+        errors = self.flush()
+        self._executor.shutdown(wait=True)
+        return errors
+
+    def __enter__(self) -> "ImageWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
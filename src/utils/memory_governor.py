@@ -0,0 +1,235 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from src.config import config_provider
+
+settings = config_provider.get_settings()
+logger = config_provider.get_logger(__name__)
+metrics = config_provider.get_metrics()
+limit_gauge = metrics.gauge(
+    "memory_governor_limit", "Concurrency limit set by the memory governor", ["resource"]
+)
+in_flight_gauge = metrics.gauge("memory_in_flight_bytes", "Image bytes held by in-flight work")
+usage_gauge = metrics.gauge("memory_usage_bytes", "Memory usage seen by the memory governor")
+
+# Как часто ожидающий поток перечитывает RSS: память освобождается и без release()
+POLL_INTERVAL_S = 0.05
+
+MB = 2**20
+
+
+def read_rss_bytes() -> Optional[int]:
+    """Текущий RSS процесса (Linux); None — недоступен, учитываются только байты в полете."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class AcquireCancelled(Exception):
+    """Ожидание прервано: работа, ради которой бралось место, уже не нужна."""
+
+
+@dataclass
+class Limit:
+    current: int
+    maximum: int
+    active: int = 0
+
+
+class Lease:
+    """Слот ресурса и байты одного элемента (страницы, пакета); release() идемпотентен."""
+
+    def __init__(self, governor: Optional["MemoryGovernor"], resource: Optional[str], nbytes: int):
+        self.governor = governor
+        self.resource = resource
+        self.nbytes = nbytes
+        self.released = governor is None
+
+    def resize(self, nbytes: int) -> None:
+        """Уточняет размер после декодирования (до него известна только оценка)."""
+        if self.governor is not None:
+            self.governor._resize(self, nbytes)
+        else:
+            self.nbytes = nbytes
+
+    def release(self) -> None:
+        if self.governor is not None:
+            self.governor._release(self)
+
+    def __enter__(self) -> "Lease":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class MemoryGovernor:
+    """
+    Держит процесс в бюджете памяти: учитывает RSS и байты изображений в полете и
+    ограничивает параллелизм ресурсов (страницы загрузки, кэш страниц распознавания).
+    AIMD: выше high_watermark лимиты делятся пополам, ниже low_watermark растут на 1,
+    не чаще раза в ramp_interval_s. Без бюджета (None) acquire ничего не ждет.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: Optional[int],
+        high_watermark: float = 0.85,
+        low_watermark: float = 0.6,
+        ramp_interval_s: float = 2.0,
+        rss_reader: Callable[[], Optional[int]] = read_rss_bytes,
+    ):
+        self.budget_bytes = budget_bytes
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.ramp_interval_s = ramp_interval_s
+        self._rss_reader = rss_reader
+        self._limits: Dict[str, Limit] = {}
+        self._in_flight = 0
+        self._baseline = 0
+        self._changed_at = float("-inf")
+        self._cond = threading.Condition()
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget_bytes is not None
+
+    def configure(self, budget_bytes: Optional[int]) -> None:
+        with self._cond:
+            self.budget_bytes = budget_bytes
+            self._cond.notify_all()
+
+    def register(self, resource: str, maximum: int) -> None:
+        """Объявляет ресурс с верхней границей параллелизма; лимит стартует с максимума."""
+        with self._cond:
+            limit = self._limits.get(resource)
+            if limit is None:
+                limit = self._limits[resource] = Limit(current=maximum, maximum=maximum)
+            limit.maximum = maximum
+            limit.current = min(limit.current, maximum)
+        limit_gauge.set(limit.current, resource=resource)
+
+    def limit(self, resource: str) -> Optional[int]:
+        """Текущий лимит ресурса или None, если ограничения нет."""
+        limit = self._limits.get(resource)
+        return limit.current if self.enabled and limit is not None else None
+
+    def in_flight_bytes(self) -> int:
+        return self._in_flight
+
+    def acquire(
+        self,
+        nbytes: int,
+        resource: Optional[str] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> Lease:
+        """
+        Ждет слот ресурса (если указан) и места в бюджете под nbytes. Пока в полете
+        ничего нет, элемент пропускается всегда: иначе превышение базового RSS
+        остановило бы обработку. cancel прерывает ожидание (AcquireCancelled).
+        """
+        if not self.enabled:
+            return Lease(None, resource, nbytes)
+        with self._cond:
+            limit = self._limits[resource] if resource else None
+            while True:
+                usage = self._adjust()
+                slot_free = limit is None or limit.active < limit.current
+                fits = usage + nbytes <= self.budget_bytes or self._in_flight == 0
+                if slot_free and fits:
+                    break
+                if cancel is not None and cancel.is_set():
+                    raise AcquireCancelled(f"Waiting for {resource or 'memory'} cancelled")
+                self._cond.wait(POLL_INTERVAL_S)
+            if limit is not None:
+                limit.active += 1
+            self._in_flight += nbytes
+        in_flight_gauge.set(self._in_flight)
+        return Lease(self, resource, nbytes)
+
+    def _resize(self, lease: Lease, nbytes: int) -> None:
+        with self._cond:
+            if not lease.released:
+                self._in_flight += nbytes - lease.nbytes
+            lease.nbytes = nbytes
+        in_flight_gauge.set(self._in_flight)
+
+    def _release(self, lease: Lease) -> None:
+        with self._cond:
+            if lease.released:
+                return
+            lease.released = True
+            if lease.resource is not None:
+                self._limits[lease.resource].active -= 1
+            self._in_flight -= lease.nbytes
+            self._cond.notify_all()
+        in_flight_gauge.set(self._in_flight)
+
+    def _usage(self) -> int:
+        rss = self._rss_reader()
+        if rss is None:
+            return self._in_flight
+        # RSS без работы в полете — база; выделенное под элементы может еще не попасть в RSS
+        if self._in_flight == 0:
+            self._baseline = rss
+        return max(rss, self._baseline + self._in_flight)
+
+    def _adjust(self) -> int:
+        """AIMD-шаг под self._cond. Возвращает текущее использование памяти."""
+        usage = self._usage()
+        usage_gauge.set(usage)
+        now = time.monotonic()
+        if now - self._changed_at < self.ramp_interval_s:
+            return usage
+
+        if usage > self.high_watermark * self.budget_bytes:
+            direction, targets = "reduced", {
+                name: max(1, limit.current // 2) for name, limit in self._limits.items()
+            }
+        elif usage < self.low_watermark * self.budget_bytes:
+            direction, targets = "increased", {
+                name: min(limit.maximum, limit.current + 1) for name, limit in self._limits.items()
+            }
+        else:
+            return usage
+
+        changed = {
+            name: target for name, target in targets.items() if target != self._limits[name].current
+        }
+        if not changed:
+            return usage
+        for name, target in changed.items():
+            self._limits[name].current = target
+            limit_gauge.set(target, resource=name)
+        self._changed_at = now
+        self._cond.notify_all()
+        logger.info(
+            {
+                "msg": f"Memory governor: concurrency {direction}",
+                "usage_mb": round(usage / MB, 1),
+                "budget_mb": round(self.budget_bytes / MB, 1),
+                "in_flight_mb": round(self._in_flight / MB, 1),
+                "limits": changed,
+            }
+        )
+        return usage
+
+
+def budget_from_settings(workers: int = 1) -> Optional[int]:
+    """Бюджет процесса: MEMORY_BUDGET_MB делится поровну между процессами-воркерами."""
+    if settings.MEMORY_BUDGET_MB is None:
+        return None
+    return int(settings.MEMORY_BUDGET_MB * MB / max(1, workers))
+
+
+memory_governor = MemoryGovernor(
+    budget_from_settings(),
+    high_watermark=settings.MEMORY_HIGH_WATERMARK,
+    low_watermark=settings.MEMORY_LOW_WATERMARK,
+    ramp_interval_s=settings.MEMORY_RAMP_INTERVAL_S,
+)
@@ -0,0 +1,113 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from src.config import config_provider
+from src.metrics import MetricsRegistry
+
+settings = config_provider.get_settings()
+logger = config_provider.get_logger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def write_textfile(registry: MetricsRegistry, path: Path) -> None:
+    """Атомарная запись для textfile collector: node_exporter не увидит недописанный файл."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(registry.render(), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def textfile_path(directory: Path, worker: Optional[str] = None) -> Path:
+    suffix = f"_worker_{worker}" if worker else ""
+    return directory / f"{settings.METRICS_NAMESPACE}{suffix}.prom"
+
+
+class TextfileExporter:
+    """Периодически переписывает textfile; при остановке пишет финальные значения."""
+
+    def __init__(self, registry: MetricsRegistry, path: Path, interval_s: float):
+        self.registry = registry
+        self.path = path
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-textfile", daemon=True)
+
+    def start(self) -> "TextfileExporter":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self._write()
+
+    def _write(self) -> None:
+        try:
+            write_textfile(self.registry, self.path)
+        except OSError as e:
+            logger.error({"msg": "Failed to write metrics textfile", "error": str(e)})
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._write()
+
+
+def start_http_server(registry: MetricsRegistry, addr: str, port: int) -> ThreadingHTTPServer:
+    """GET /metrics в фоновом потоке; остановка — server.shutdown()."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((addr, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info({"msg": "Metrics endpoint started", "addr": addr, "port": server.server_port})
+    return server
+
+
+def start_exporters(registry: MetricsRegistry) -> Callable[[], None]:
+    """Запускает экспортеры из настроек METRICS_*; возвращает функцию остановки."""
+    stoppers: List[Callable[[], None]] = []
+    if settings.METRICS_HTTP_PORT is not None:
+        server = start_http_server(registry, settings.METRICS_HTTP_ADDR, settings.METRICS_HTTP_PORT)
+        stoppers.append(server.shutdown)
+    if settings.METRICS_TEXTFILE_DIR is not None:
+        # Файлы воркеров прошлого запуска больше не обновляются
+        for stale in settings.METRICS_TEXTFILE_DIR.glob(
+            f"{settings.METRICS_NAMESPACE}_worker_*.prom"
+        ):
+            stale.unlink(missing_ok=True)
+        exporter = TextfileExporter(
+            registry,
+            textfile_path(settings.METRICS_TEXTFILE_DIR),
+            settings.METRICS_TEXTFILE_INTERVAL_S,
+        ).start()
+        stoppers.append(exporter.stop)
+
+    def stop() -> None:
+        for stopper in stoppers:
+            stopper()
+
+    return stop
+
+
+def export_worker_textfile(registry: MetricsRegistry) -> None:
+    """Процесс-воркер не обслуживает HTTP: его метрики уходят в собственный textfile."""
+    if settings.METRICS_TEXTFILE_DIR is not None:
+        write_textfile(registry, textfile_path(settings.METRICS_TEXTFILE_DIR, str(os.getpid())))
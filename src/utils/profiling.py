@@ -0,0 +1,223 @@
+import cProfile
+import io
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from src.config import config_provider
+
+settings = config_provider.get_settings()
+logger = config_provider.get_logger(__name__)
+
+PROFILE_MODES = ("cprofile", "sampling")
+
+# С Python 3.12 cProfile работает через sys.monitoring: активен один на процесс (второй
+# enable() бросает ValueError), зато видит все потоки. Документ, пришедший, пока
+# cProfile занят, профилируется sampling-профилировщиком
+_cprofile_lock = threading.Lock()
+# До 3.12 cProfile видит только свой поток: потоки замера получают отдельные профилировщики
+PER_THREAD_CPROFILE = sys.version_info < (3, 12)
+
+
+class ThreadProfilers:
+    """
+    cProfile профилирует только поток, в котором включен. Хук threading.setprofile
+    включает отдельный cProfile в каждом потоке, созданном во время замера
+    (стадии пайплайна, пул ImageWriter), и статистика потом объединяется.
+    """
+
+    def __init__(self):
+        self.profilers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def hook(self, frame, event, arg) -> None:
+        profiler = cProfile.Profile()
+        with self._lock:
+            self.profilers.append(profiler)
+        profiler.enable()
+
+
+class SamplingProfiler:
+    """Раз в interval_s снимает стеки всех потоков; результат — collapsed stacks (flamegraph)."""
+
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self) -> None:
+        names = {}
+        while not self._stop.wait(self.interval_s):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self._thread.ident:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileSession:
+    """Замер одного документа; document_id можно указать после создания документа."""
+
+    def __init__(self, kind: str, name: str, document_id: Optional[int], mode: Optional[str]):
+        self.kind = kind
+        self.name = name
+        self.document_id = document_id
+        self.mode = mode
+        self.duration_s = 0.0
+        self._profiler: Optional[cProfile.Profile] = None
+        self._threads: Optional[ThreadProfilers] = None
+        self._sampler: Optional[SamplingProfiler] = None
+        self._tracing = False
+
+    @property
+    def active(self) -> bool:
+        return self.mode is not None
+
+    def start(self) -> None:
+        if settings.PROFILE_TRACEMALLOC and not tracemalloc.is_tracing():
+            tracemalloc.start(settings.PROFILE_TRACEMALLOC_FRAMES)
+            self._tracing = True
+        if self.mode == "cprofile" and not self._start_cprofile():
+            logger.info({"msg": "cProfile is busy, sampling instead", "document": self.name})
+            self.mode = "sampling"
+        if self.mode == "sampling":
+            self._sampler = SamplingProfiler(settings.PROFILE_SAMPLING_INTERVAL_S)
+            self._sampler.start()
+
+    def _start_cprofile(self) -> bool:
+        if not _cprofile_lock.acquire(blocking=False):
+            return False
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Профилировщик включен в обход profile_document (Python 3.12+)
+            _cprofile_lock.release()
+            return False
+        self._profiler = profiler
+        if PER_THREAD_CPROFILE:
+            self._threads = ThreadProfilers()
+            threading.setprofile(self._threads.hook)
+        return True
+
+    def stop(self, keep: bool) -> List[Path]:
+        if self._profiler:
+            self._profiler.disable()
+            if self._threads:
+                threading.setprofile(None)
+            _cprofile_lock.release()
+        if self._sampler:
+            self._sampler.stop()
+        snapshot = None
+        if self._tracing:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return self._write(snapshot, peak if snapshot else 0) if keep else []
+
+    def _path(self, suffix: str) -> Path:
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        document_id = self.document_id if self.document_id is not None else "new"
+        return settings.PROFILE_DIR / f"{self.kind}_doc{document_id}_{self.name}_{stamp}{suffix}"
+
+    def _write(self, snapshot: Optional[tracemalloc.Snapshot], peak: int) -> List[Path]:
+        settings.PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        paths = []
+        if self._profiler:
+            stats = pstats.Stats(self._profiler)
+            for profiler in self._threads.profilers if self._threads else ():
+                # Потоки замера уже завершены; create_stats() внутри Stats их отключает
+                stats.add(profiler)
+            paths.append(self._path(".prof"))
+            stats.dump_stats(paths[-1])
+            report = io.StringIO()
+            pstats.Stats(str(paths[-1]), stream=report).sort_stats("cumulative").print_stats(50)
+            paths.append(self._path(".prof.txt"))
+            paths[-1].write_text(report.getvalue(), encoding="utf-8")
+        if self._sampler:
+            paths.append(self._path(".folded"))
+            paths[-1].write_text(self._sampler.collapsed(), encoding="utf-8")
+        if snapshot:
+            top = snapshot.statistics("lineno")[: settings.PROFILE_TRACEMALLOC_TOP]
+            lines = [f"peak traced memory: {peak / 2**20:.1f} MiB", *map(str, top)]
+            paths.append(self._path(".alloc.txt"))
+            paths[-1].write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return paths
+
+
+def select_mode(name: str) -> Optional[str]:
+    """Профилировать ли документ: по имени, по доле выборки или всех при пороге длительности."""
+    mode = settings.PROFILE_MODE
+    if mode is None:
+        return None
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode}")
+    if (
+        name in settings.PROFILE_DOCUMENTS
+        or random.random() < settings.PROFILE_SAMPLE_RATE
+        or settings.PROFILE_SLOW_THRESHOLD_S is not None
+    ):
+        return mode
+    return None
+
+
+@contextmanager
+def profile_document(
+    kind: str, name: str, document_id: Optional[int] = None
+) -> Iterator[ProfileSession]:
+    """
+    Оборачивает обработку документа профилировщиком (PROFILE_MODE) и tracemalloc.
+    Профили пишутся в PROFILE_DIR; при PROFILE_SLOW_THRESHOLD_S документ, выбранный
+    только порогом, сохраняется, если обрабатывался дольше порога.
+    """
+    session = ProfileSession(kind, name, document_id, select_mode(name))
+    if not session.active:
+        yield session
+        return
+
+    forced = name in settings.PROFILE_DOCUMENTS
+    start = time.perf_counter()
+    session.start()
+    try:
+        yield session
+    finally:
+        session.duration_s = time.perf_counter() - start
+        threshold = settings.PROFILE_SLOW_THRESHOLD_S
+        keep = forced or threshold is None or session.duration_s >= threshold
+        paths = session.stop(keep)
+        if paths:
+            logger.info(
+                {
+                    "msg": "Profile written",
+                    "document": name,
+                    "document_id": session.document_id,
+                    "duration_s": round(session.duration_s, 3),
+                    "files": [str(path) for path in paths],
+                }
+            )
@@ -3,7 +3,10 @@ from src.config import config_provider
 from src.entities import ContentType
 
 
-logger = config_provider.get_logger(__name__)
+debug_log = config_provider.get_debug_sampler(__name__)
+
+MIN_FRAGMENT_WIDTH = 20
+MIN_FRAGMENT_HEIGHT = 10
 
 
 def validate_fragment_dict(fragment: Dict[str, Any]) -> bool:
@@ -13,9 +16,9 @@ def validate_fragment_dict(fragment: Dict[str, Any]) -> bool:
     """
     try:
         ContentType(fragment["type"])
-        if fragment["width"] >= 20 and fragment["height"] >= 10:
+        if fragment["width"] >= MIN_FRAGMENT_WIDTH and fragment["height"] >= MIN_FRAGMENT_HEIGHT:
             return True
-        logger.debug(
+        debug_log.debug(
             "Fragment is NOT VALID by width or height",
             extra={"page": fragment["page_number"], "type": fragment["type"]},
         )
@@ -1,7 +1,11 @@
-from typing import List
+from typing import Callable, List
 import numpy as np
-from sklearn.cluster import KMeans
-from src.entities import Fragment
+from src.config import config_provider
+from src.entities import ContentType, Fragment
+from src.utils.fragment_table import CONTENT_TYPES, TYPE_CODES
+from src.utils.xy_cut import order_page
+
+settings = config_provider.get_settings()
 
 
 class ReadingOrderService:
@@ -27,6 +31,8 @@ class ReadingOrderService:
         if n_clusters == 1:
             indices = np.argsort(centers[:, 1])
         else:
+            from sklearn.cluster import KMeans
+
             kmeans = KMeans(n_clusters=n_clusters, random_state=42)
             labels = kmeans.fit_predict(centers)
             cluster_centers = kmeans.cluster_centers_
@@ -41,3 +47,58 @@ class ReadingOrderService:
 
 def get_default_order(fragments: List[Fragment]) -> List[int]:
     return list(range(len(fragments)))
+
+
+def order_boxes_xy_cut(boxes: np.ndarray, type_codes: np.ndarray) -> np.ndarray:
+    """XY-cut для одной страницы в колоночном виде: рамки (left, top, right, bottom) в px."""
+    return order_page(
+        boxes,
+        headers=type_codes == TYPE_CODES[ContentType.PAGE_HEADER.value],
+        footers=type_codes == TYPE_CODES[ContentType.PAGE_FOOTER.value],
+        min_gap_x=settings.READING_ORDER_MIN_GAP_X,
+        min_gap_y=settings.READING_ORDER_MIN_GAP_Y,
+    )
+
+
+def get_xy_cut_order(fragments: List[Fragment]) -> List[int]:
+    """
+    Порядок чтения методом XY-cut. Координаты фрагмента в px: left, top и
+    правая/нижняя границы в полях width/height (см. scale_coordinates_from_pt_to_px).
+    """
+    if not fragments:
+        return []
+
+    boxes = np.array([(f.left, f.top, f.width, f.height) for f in fragments], dtype=float)
+    type_codes = np.array([TYPE_CODES[f.content_type.value] for f in fragments])
+    return order_boxes_xy_cut(boxes, type_codes).tolist()
+
+
+def as_array_strategy(
+    order_strategy: Callable[[List[Fragment]], List[int]],
+) -> Callable[[np.ndarray, np.ndarray], np.ndarray]:
+    """
+    Приводит order_strategy к виду (boxes, type_codes) -> перестановка для FragmentTable.
+    Для XY-cut используется векторная реализация, остальные стратегии получают Fragment-ы.
+    """
+    if order_strategy is get_xy_cut_order:
+        return order_boxes_xy_cut
+
+    def order(boxes: np.ndarray, type_codes: np.ndarray) -> np.ndarray:
+        fragments = [
+            Fragment(
+                fragment_id=None,
+                page_id=None,
+                page_number=None,
+                content_type=CONTENT_TYPES[code],
+                order_number=None,
+                left=box[0],
+                top=box[1],
+                width=box[2],
+                height=box[3],
+                text=None,
+            )
+            for box, code in zip(boxes.tolist(), type_codes.tolist())
+        ]
+        return np.asarray(order_strategy(fragments), dtype=int)
+
+    return order
@@ -0,0 +1,129 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import numpy as np
+
+from src.config import config_provider
+
+settings = config_provider.get_settings()
+logger = config_provider.get_logger(__name__)
+stage_seconds = config_provider.get_metrics().histogram(
+    "stage_duration_seconds", "Duration of instrumented stages (timing spans)", ["stage"]
+)
+
+SPAN_MESSAGE = "span"
+REPORT_PERCENTILES = (50, 90, 99)
+
+
+@dataclass(slots=True)
+class Span:
+    """
+    Замер одной стадии. context — идентификаторы (document, page, fragment_id),
+    bytes/items — объем работы стадии: байты изображения, число фрагментов и т.п.
+    """
+
+    name: str
+    context: Dict[str, Any] = field(default_factory=dict)
+    bytes: int = 0
+    items: int = 0
+    duration_s: float = 0.0
+    error: Optional[str] = None
+
+    def add(self, bytes: int = 0, items: int = 0) -> None:
+        self.bytes += bytes
+        self.items += items
+
+    def to_extra(self) -> Dict[str, Any]:
+        extra = {
+            "span": self.name,
+            "duration_ms": round(self.duration_s * 1000, 3),
+            "bytes": self.bytes,
+            "items": self.items,
+            "context": self.context,
+        }
+        if self.error:
+            extra["error"] = self.error
+        return extra
+
+
+@contextmanager
+def span(name: str, *, level: int = logging.INFO, **context) -> Iterator[Span]:
+    """
+    Замеряет блок, пишет длительность структурными полями через JsonFormatter
+    и в гистограмму stage_duration_seconds{stage=name}:
+        with span("layout.analyze", document=filename) as s:
+            s.add(items=len(fragments))
+    Стадии на каждый фрагмент пишутся с level=logging.DEBUG: в гистограмму попадают
+    всегда, в лог — только при LOG_LEVEL = "DEBUG".
+    """
+    current = Span(name, context)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.duration_s = time.perf_counter() - start
+        stage_seconds.observe(current.duration_s, stage=name)
+        if settings.TIMING_ENABLED:
+            logger.log(level, SPAN_MESSAGE, extra=current.to_extra())
+
+
+def read_spans(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Выбирает записи span из JSON-лога; прочие и битые строки пропускаются."""
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict) and record.get("message") == SPAN_MESSAGE:
+            extra = record.get("extra") or {}
+            if "span" in extra and "duration_ms" in extra:
+                yield extra
+
+
+def summarize_spans(spans: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Перцентили длительности, суммарные байты и элементы по каждой стадии."""
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for record in spans:
+        grouped.setdefault(record["span"], []).append(record)
+
+    summary = {}
+    for name, records in sorted(grouped.items()):
+        durations = np.array([r["duration_ms"] for r in records], dtype=np.float64)
+        total_s = durations.sum() / 1000
+        items = sum(r.get("items", 0) for r in records)
+        summary[name] = {
+            "count": len(records),
+            "errors": sum(1 for r in records if r.get("error")),
+            "total_s": round(total_s, 3),
+            **{
+                f"p{q}_ms": round(float(np.percentile(durations, q)), 3) for q in REPORT_PERCENTILES
+            },
+            "max_ms": round(float(durations.max()), 3),
+            "bytes": sum(r.get("bytes", 0) for r in records),
+            "items": items,
+            "items_per_s": round(items / total_s, 3) if total_s else 0.0,
+        }
+    return summary
+
+
+def format_report(summary: Dict[str, Dict[str, Any]]) -> str:
+    if not summary:
+        return "No spans found"
+    columns = ["span", *next(iter(summary.values())).keys()]
+    rows = [[name, *map(str, stats.values())] for name, stats in summary.items()]
+    widths = [max(len(column), *(len(row[i]) for row in rows)) for i, column in enumerate(columns)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(columns, widths))]
+    lines += ["  ".join(v.ljust(w) for v, w in zip(row, widths)) for row in rows]
+    return "\n".join(lines)
+
+
+def build_report(log_file: Path) -> str:
+    with open(log_file, encoding="utf-8") as lines:
+        return format_report(summarize_spans(read_spans(lines)))
@@ -0,0 +1,126 @@
+import heapq
+from typing import Iterable, List, Tuple
+import numpy as np
+
+LEFT, TOP, RIGHT, BOTTOM = range(4)
+
+
+def split_by_gaps(starts: np.ndarray, ends: np.ndarray, min_gap: float) -> List[np.ndarray]:
+    """
+    Делит интервалы [start, end] на группы по пустым промежуткам проекции шириной >= min_gap.
+    Возвращает позиции интервалов для каждой группы в порядке возрастания координаты.
+    """
+    order = np.argsort(starts, kind="stable")
+    reach = np.maximum.accumulate(ends[order])
+    breaks = (np.flatnonzero(starts[order][1:] - reach[:-1] >= min_gap) + 1).tolist()
+    # Срезы дешевле np.split на малых массивах: функция вызывается на каждом уровне рекурсии
+    return [order[start:end] for start, end in zip([0] + breaks, breaks + [len(order)])]
+
+
+def _sort_by_position(boxes: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    return indices[np.lexsort((boxes[indices, LEFT], boxes[indices, TOP]))]
+
+
+def _split_columns(boxes: np.ndarray, indices: np.ndarray, min_gap_x: float) -> List[np.ndarray]:
+    groups = split_by_gaps(boxes[indices, LEFT], boxes[indices, RIGHT], min_gap_x)
+    return [indices[group] for group in groups]
+
+
+def _split_bands(boxes: np.ndarray, indices: np.ndarray, min_gap_y: float) -> List[np.ndarray]:
+    groups = split_by_gaps(boxes[indices, TOP], boxes[indices, BOTTOM], min_gap_y)
+    return [indices[group] for group in groups]
+
+
+def _coalesce(intervals: Iterable[Tuple[float, float]], min_gap: float) -> List[List[float]]:
+    """Сливает отсортированные по началу интервалы, между которыми пустота уже min_gap."""
+    segments: List[List[float]] = []
+    for start, end in intervals:
+        if segments and start - segments[-1][1] < min_gap:
+            segments[-1][1] = max(segments[-1][1], end)
+        else:
+            segments.append([start, end])
+    return segments
+
+
+def _merge_column_bands(
+    boxes: np.ndarray, bands: List[np.ndarray], min_gap_x: float
+) -> List[np.ndarray]:
+    """
+    Объединяет соседние полосы, если вместе они по-прежнему делятся на колонки:
+    иначе случайно совпавшие межабзацные промежутки или колонки разной длины
+    перемешали бы колонки при чтении.
+    Один проход по полосам: для накопленной группы хранится только ее x-проекция
+    (по отрезку на колонку), и она сливается с проекцией следующей полосы за линейное
+    время — O(n log n) на сортировку полос вместо пересортировки группы на каждом шаге.
+    """
+    members = np.concatenate(bands)
+    intervals = list(zip(boxes[members, LEFT].tolist(), boxes[members, RIGHT].tolist()))
+    groups: List[List[np.ndarray]] = []
+    projection: List[List[float]] = []
+    offset = 0
+    for band in bands:
+        band_projection = _coalesce(sorted(intervals[offset : offset + len(band)]), min_gap_x)
+        offset += len(band)
+        combined = _coalesce(heapq.merge(projection, band_projection), min_gap_x)
+        if groups and len(combined) > 1:
+            groups[-1].append(band)
+            projection = combined
+        else:
+            groups.append([band])
+            projection = band_projection
+    return [np.concatenate(group) if len(group) > 1 else group[0] for group in groups]
+
+
+def _xy_cut(
+    boxes: np.ndarray, indices: np.ndarray, min_gap_x: float, min_gap_y: float, out: List[int]
+) -> None:
+    if len(indices) <= 1:
+        out.extend(indices.tolist())
+        return
+
+    columns = _split_columns(boxes, indices, min_gap_x)
+    if len(columns) > 1:
+        for column in columns:
+            _xy_cut(boxes, column, min_gap_x, min_gap_y, out)
+        return
+
+    bands = _split_bands(boxes, indices, min_gap_y)
+    if len(bands) > 1:
+        for band in _merge_column_bands(boxes, bands, min_gap_x):
+            _xy_cut(boxes, band, min_gap_x, min_gap_y, out)
+        return
+
+    out.extend(_sort_by_position(boxes, indices).tolist())
+
+
+def xy_cut_order(boxes: np.ndarray, min_gap_x: float = 5.0, min_gap_y: float = 0.0) -> np.ndarray:
+    """
+    Рекурсивный XY-cut по проекциям прямоугольников (left, top, right, bottom).
+    Сначала пробуется деление на колонки, затем на горизонтальные полосы.
+    """
+    out: List[int] = []
+    _xy_cut(np.asarray(boxes, dtype=float), np.arange(len(boxes)), min_gap_x, min_gap_y, out)
+    return np.array(out, dtype=int)
+
+
+def order_page(
+    boxes: np.ndarray,
+    headers: np.ndarray,
+    footers: np.ndarray,
+    min_gap_x: float = 5.0,
+    min_gap_y: float = 0.0,
+) -> np.ndarray:
+    """
+    Порядок чтения страницы: колонтитулы сверху и снизу вынесены из XY-cut,
+    чтобы не блокировать деление на колонки.
+    """
+    boxes = np.asarray(boxes, dtype=float)
+    body = np.flatnonzero(~(headers | footers))
+    ordered_body = body[xy_cut_order(boxes[body], min_gap_x, min_gap_y)]
+    return np.concatenate(
+        (
+            _sort_by_position(boxes, np.flatnonzero(headers)),
+            ordered_body,
+            _sort_by_position(boxes, np.flatnonzero(footers)),
+        )
+    ).astype(int)
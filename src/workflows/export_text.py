@@ -0,0 +1,196 @@
+import json
+import os
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from itertools import groupby
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from src.config import config_provider
+from src.entities import Document
+from src.repository import documents as doc_repo, recognized_fragments as recognized_repo
+from src.utils.timing import span
+
+settings = config_provider.get_settings()
+logger = config_provider.get_logger(__name__)
+
+EXPORT_FORMATS = ("jsonl", "parquet")
+
+ExportRecord = Dict[str, Any]
+
+
+class ExportError(Exception):
+    pass
+
+
+@dataclass
+class ExportStats:
+    documents: int = 0
+    fragments: int = 0
+    unrecognized: int = 0
+
+
+class ExportWriter(ABC):
+    """Пишет записи по одной; в памяти держится не больше одной группы строк."""
+
+    @abstractmethod
+    def write(self, record: ExportRecord) -> None: ...
+
+    @abstractmethod
+    def close(self) -> None: ...
+
+    def __enter__(self) -> "ExportWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class JsonlExportWriter(ExportWriter):
+    def __init__(self, path: Path):
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, record: ExportRecord) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write("\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetExportWriter(ExportWriter):
+    """Parquet по группам строк row_group_size; pyarrow нужен только для этого формата."""
+
+    def __init__(self, path: Path, row_group_size: int):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ExportError("Parquet export requires pyarrow") from e
+
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                ("document_id", pa.int64()),
+                ("document", pa.string()),
+                ("page_number", pa.int32()),
+                ("page_width", pa.int32()),
+                ("page_height", pa.int32()),
+                ("dpi", pa.int32()),
+                ("fragment_id", pa.int64()),
+                ("order_number", pa.int32()),
+                ("content_type", pa.string()),
+                ("bbox", pa.list_(pa.float64(), 4)),
+                ("recognizer", pa.string()),
+                ("text", pa.string()),
+            ]
+        )
+        self._writer = pq.ParquetWriter(str(path), self._schema, compression="zstd")
+        self._row_group_size = row_group_size
+        self._rows: List[ExportRecord] = []
+
+    def write(self, record: ExportRecord) -> None:
+        self._rows.append(record)
+        if len(self._rows) >= self._row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+
+def open_export_writer(path: Path, fmt: str) -> ExportWriter:
+    if fmt == "jsonl":
+        return JsonlExportWriter(path)
+    if fmt == "parquet":
+        return ParquetExportWriter(path, settings.EXPORT_PARQUET_ROW_GROUP_SIZE)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def iter_document_records(
+    session: Session,
+    document: Document,
+    recognizer_priority: Sequence[str],
+    stats: Optional[ExportStats] = None,
+    include_unrecognized: bool = False,
+) -> Iterator[ExportRecord]:
+    """
+    Записи документа в порядке чтения, по одной на фрагмент: текст лучшего по
+    приоритету распознавателя. bbox — (left, top, right, bottom) в px страницы.
+    """
+    stats = stats if stats is not None else ExportStats()
+    rows = recognized_repo.iter_document_texts(
+        session, document.document_id, recognizer_priority, settings.EXPORT_BATCH_SIZE
+    )
+    for _, group in groupby(rows, key=attrgetter("fragment_id")):
+        # Первая строка группы — лучший результат; остальные groupby пропустит сам
+        row = next(group)
+        if row.recognized_text is None:
+            stats.unrecognized += 1
+            if not include_unrecognized:
+                continue
+        stats.fragments += 1
+        yield {
+            "document_id": document.document_id,
+            "document": document.filename,
+            "page_number": row.page_number,
+            "page_width": row.page_width,
+            "page_height": row.page_height,
+            "dpi": row.dpi,
+            "fragment_id": row.fragment_id,
+            "order_number": row.order_number,
+            "content_type": row.content_type,
+            # Fragment.width/height хранят правую и нижнюю границы
+            "bbox": [row.left, row.top, row.width, row.height],
+            "recognizer": row.recognizer,
+            "text": row.recognized_text,
+        }
+
+
+def export_documents(
+    session: Session,
+    output: Path,
+    fmt: str = "jsonl",
+    recognizer_priority: Optional[Sequence[str]] = None,
+    filenames: Optional[Sequence[str]] = None,
+    include_unrecognized: bool = False,
+) -> ExportStats:
+    """
+    Потоковый экспорт успешно обработанных документов: документы, страницы и фрагменты
+    читаются курсорами пачками по EXPORT_BATCH_SIZE, память не зависит от размера корпуса.
+    Файл пишется во временный и переименовывается только после успешного завершения.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    priority = list(recognizer_priority or settings.EXPORT_RECOGNIZER_PRIORITY)
+    stats = ExportStats()
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+    try:
+        with open_export_writer(tmp_path, fmt) as writer:
+            for document in doc_repo.iter_documents(
+                session, filenames, batch_size=settings.EXPORT_BATCH_SIZE
+            ):
+                with span("export.document", document=document.filename) as export_span:
+                    before = stats.fragments
+                    for record in iter_document_records(
+                        session, document, priority, stats, include_unrecognized
+                    ):
+                        writer.write(record)
+                    export_span.add(items=stats.fragments - before)
+                stats.documents += 1
+        os.replace(tmp_path, output)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    logger.info({"msg": "Export finished", "output": str(output), "format": fmt, **asdict(stats)})
+    return stats
@@ -0,0 +1,196 @@
+import hashlib
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence
+from sqlalchemy.orm import Session
+
+from src.config import config_provider
+from src.entities import Document, InputFile
+from src.repository import documents as doc_repo, input_files as input_file_repo
+from src.utils.image_store import get_image_store
+
+logger = config_provider.get_logger(__name__)
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class InputStatus(Enum):
+    NEW = "new"
+    UNCHANGED = "unchanged"
+    CHANGED = "changed"
+    DUPLICATE = "duplicate"
+
+
+class ManifestEntry(NamedTuple):
+    pdf_path: Path
+    status: InputStatus
+    input_file: InputFile
+
+
+class IngestionPlan(NamedTuple):
+    entries: List[ManifestEntry]
+
+    @property
+    def to_process(self) -> List[Path]:
+        return [
+            entry.pdf_path
+            for entry in self.entries
+            if entry.status in (InputStatus.NEW, InputStatus.CHANGED)
+        ]
+
+    @property
+    def unlinked(self) -> List[Path]:
+        """Файлы без документа: после record_ingested — не обработанные из-за ошибки."""
+        return [entry.pdf_path for entry in self.entries if entry.input_file.document_id is None]
+
+    @property
+    def document_ids(self) -> List[int]:
+        return sorted({e.input_file.document_id for e in self.entries if e.input_file.document_id})
+
+
+def sha256_file(path: Path, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _release_document(session: Session, output_dir: Path, pdf_path: Path, document_id: int) -> None:
+    """
+    Удаляет устаревший документ (БД и изображения), чтобы он был обработан заново.
+    Документ, на который файл лишь ссылался как дубликат, не трогается. Дубликаты
+    удаляемого документа отвязываются и при следующей классификации станут NEW.
+    """
+    document = doc_repo.get_document_by_id(session, document_id)
+    if document is None or document.filename != pdf_path.stem:
+        return
+    detached = input_file_repo.detach_input_files(session, document_id, pdf_path.name)
+    doc_repo.delete_document_tree(session, document_id)
+    get_image_store(output_dir).delete_document(document.filename)
+    logger.info(
+        {"document": document.filename, "status": "reset_changed_input", "detached": detached}
+    )
+
+
+def classify_input(session: Session, pdf_path: Path, output_dir: Path) -> ManifestEntry:
+    """
+    Сначала сравнивает size и mtime с манифестом; SHA-256 считается только при расхождении.
+    Файл с уже известным содержимым под другим именем становится ссылкой на готовый документ.
+    """
+    stat = pdf_path.stat()
+    known = input_file_repo.get_input_file_by_path(session, pdf_path.name)
+    if known and known.document_id and (known.size, known.mtime) == (stat.st_size, stat.st_mtime):
+        return ManifestEntry(pdf_path, InputStatus.UNCHANGED, known)
+
+    sha256 = sha256_file(pdf_path)
+    entry = known or InputFile(None, pdf_path.name, stat.st_size, stat.st_mtime, sha256)
+    entry.size, entry.mtime = stat.st_size, stat.st_mtime
+
+    if known and known.document_id and known.sha256 == sha256:
+        # Файл только "тронули": содержимое то же, обновляем stat в манифесте
+        input_file_repo.save_input_file(session, entry)
+        return ManifestEntry(pdf_path, InputStatus.UNCHANGED, entry)
+
+    original = input_file_repo.get_processed_input_file_by_sha256(session, sha256)
+    if original and original.path != pdf_path.name:
+        if known and known.document_id and known.document_id != original.document_id:
+            _release_document(session, output_dir, pdf_path, known.document_id)
+        entry.sha256, entry.document_id = sha256, original.document_id
+        input_file_repo.save_input_file(session, entry)
+        return ManifestEntry(pdf_path, InputStatus.DUPLICATE, entry)
+
+    if known and known.document_id:
+        _release_document(session, output_dir, pdf_path, known.document_id)
+        entry.sha256, entry.document_id = sha256, None
+        input_file_repo.save_input_file(session, entry)
+        return ManifestEntry(pdf_path, InputStatus.CHANGED, entry)
+
+    entry.sha256 = sha256
+    # Документ обработан до появления манифеста: привязываем без повторной обработки
+    document = doc_repo.get_document_by_filename(session, pdf_path.stem)
+    if document and document.is_success_processed:
+        entry.document_id = document.document_id
+        input_file_repo.save_input_file(session, entry)
+        return ManifestEntry(pdf_path, InputStatus.UNCHANGED, entry)
+    return ManifestEntry(pdf_path, InputStatus.NEW, entry)
+
+
+def find_source_file(session: Session, document: Document, input_dir: Path) -> Path:
+    """
+    Исходный файл документа: сначала записи манифеста (файл с именем документа, затем
+    переименованные копии и дубликаты), потом имя документа с его расширением.
+    """
+    linked = sorted(
+        input_file_repo.get_input_files_by_document_id(session, document.document_id),
+        key=lambda input_file: Path(input_file.path).stem != document.filename,
+    )
+    candidates = [input_dir / input_file.path for input_file in linked]
+    candidates.append(input_dir / f"{document.filename}.{document.extension}")
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate
+    raise FileNotFoundError(
+        f"Source file of document {document.filename!r} not found: "
+        + ", ".join(str(candidate) for candidate in dict.fromkeys(candidates))
+    )
+
+
+def _is_released(session: Session, entry: ManifestEntry) -> bool:
+    document_id = entry.input_file.document_id
+    return document_id is not None and doc_repo.get_document_by_id(session, document_id) is None
+
+
+def plan_ingestion(session: Session, pdf_files: Sequence[Path], output_dir: Path) -> IngestionPlan:
+    """Классифицирует входные файлы; одинаковые новые файлы в одном батче обрабатываются один раз."""
+    classified = [classify_input(session, pdf_path, output_dir) for pdf_path in pdf_files]
+    # Измененный оригинал, классифицированный позже своего дубликата, удаляет документ,
+    # на который дубликат уже сослался: такие файлы классифицируются заново (станут NEW)
+    classified = [
+        (
+            classify_input(session, entry.pdf_path, output_dir)
+            if _is_released(session, entry)
+            else entry
+        )
+        for entry in classified
+    ]
+
+    entries, first_by_sha = [], {}
+    for entry in classified:
+        pdf_path = entry.pdf_path
+        if entry.status in (InputStatus.NEW, InputStatus.CHANGED):
+            sha256 = entry.input_file.sha256
+            if sha256 in first_by_sha:
+                entry = entry._replace(status=InputStatus.DUPLICATE)
+            else:
+                first_by_sha[sha256] = pdf_path
+        entries.append(entry)
+
+    plan = IngestionPlan(entries)
+    logger.info(
+        {
+            "msg": "Ingestion plan",
+            **{status.value: sum(e.status is status for e in entries) for status in InputStatus},
+        }
+    )
+    return plan
+
+
+def record_ingested(
+    session: Session,
+    plan: IngestionPlan,
+    documents: Dict[Path, Optional[Document]],
+) -> None:
+    """Привязывает успешно обработанные входные файлы (и их дубликаты из батча) к документам."""
+    by_sha = {}
+    for entry in plan.entries:
+        document = documents.get(entry.pdf_path)
+        if entry.status in (InputStatus.NEW, InputStatus.CHANGED) and document:
+            by_sha[entry.input_file.sha256] = document.document_id
+
+    for entry in plan.entries:
+        input_file = entry.input_file
+        if input_file.document_id is None and input_file.sha256 in by_sha:
+            input_file.document_id = by_sha[input_file.sha256]
+            input_file_repo.save_input_file(session, input_file)
+            logger.info({"file": entry.pdf_path.name, "document_id": input_file.document_id})
@@ -0,0 +1,189 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.config import config_provider
+
+queue_depth = config_provider.get_metrics().gauge(
+    "pipeline_queue_depth", "Items waiting in front of a pipeline stage", ["stage"]
+)
+stage_items_total = config_provider.get_metrics().counter(
+    "pipeline_items_total", "Items processed by a pipeline stage", ["stage"]
+)
+
+# Маркер конца потока: каждая стадия получает по одному на воркер
+_DONE = object()
+
+
+class PipelineError(Exception):
+    """Ошибка в обработчике одной из стадий пайплайна."""
+
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+@dataclass
+class Stage:
+    """
+    Стадия пайплайна: handler(item) возвращает итерируемое выходных элементов
+    (0..n, для последней стадии — результаты run) или None.
+    """
+
+    name: str
+    handler: Callable[[Any], Optional[Iterable[Any]]]
+    workers: int = 1
+    queue_size: int = 4
+
+
+@dataclass
+class StageStats:
+    workers: int
+    queue_size: int
+    processed: int = 0
+    emitted: int = 0
+    failed: int = 0
+    busy_s: float = 0.0
+    max_queue_depth: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+class Pipeline:
+    """
+    Стадии связаны ограниченными очередями: медленная стадия блокирует запись
+    в свою очередь, и число элементов в памяти не превышает сумму queue_size.
+    Каждая стадия обслуживается собственным пулом потоков.
+    """
+
+    def __init__(self, stages: List[Stage]):
+        if not stages:
+            raise ValueError("Pipeline requires at least one stage")
+        self.stages = stages
+        self._queues = [queue.Queue(maxsize=stage.queue_size) for stage in stages]
+        self._stats = [StageStats(stage.workers, stage.queue_size) for stage in stages]
+        self._alive = [stage.workers for stage in stages]
+        self._lock = threading.Lock()
+        self._failed = threading.Event()
+        self._error: Optional[PipelineError] = None
+        self._results: List[Any] = []
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """Прогоняет items через все стадии и возвращает выход последней стадии."""
+        threads = [
+            threading.Thread(
+                target=self._work, args=(index,), name=f"{stage.name}-{n}", daemon=True
+            )
+            for index, stage in enumerate(self.stages)
+            for n in range(stage.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for item in items:
+                if self._failed.is_set():
+                    break
+                self._put(0, item)
+        except BaseException as e:
+            self._fail("source", e)
+        finally:
+            for _ in range(self.stages[0].workers):
+                self._queues[0].put(_DONE)
+            for thread in threads:
+                thread.join()
+
+        if self._error:
+            raise self._error
+        return self._results
+
+    @property
+    def failed(self) -> threading.Event:
+        """Устанавливается при первой ошибке: элементы дальше не обрабатываются."""
+        return self._failed
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Текущая глубина очередей и пропускная способность по стадиям."""
+        now = time.perf_counter()
+        report = {}
+        for stage, stats, inbox in zip(self.stages, self._stats, self._queues):
+            elapsed = ((stats.finished_at or now) - stats.started_at) if stats.started_at else 0.0
+            report[stage.name] = {
+                "workers": stats.workers,
+                "queue_size": stats.queue_size,
+                "queue_depth": inbox.qsize(),
+                "max_queue_depth": stats.max_queue_depth,
+                "processed": stats.processed,
+                "emitted": stats.emitted,
+                "failed": stats.failed,
+                "busy_s": round(stats.busy_s, 4),
+                "items_per_s": round(stats.processed / elapsed, 3) if elapsed else 0.0,
+                "utilization": (
+                    round(stats.busy_s / (elapsed * stats.workers), 3) if elapsed else 0.0
+                ),
+            }
+        return report
+
+    def _put(self, index: int, item: Any) -> None:
+        self._queues[index].put(item)
+        stats, depth = self._stats[index], self._queues[index].qsize()
+        queue_depth.set(depth, stage=self.stages[index].name)
+        with self._lock:
+            stats.max_queue_depth = max(stats.max_queue_depth, depth)
+
+    def _emit(self, index: int, item: Any) -> None:
+        with self._lock:
+            self._stats[index].emitted += 1
+        if index + 1 < len(self.stages):
+            self._put(index + 1, item)
+        else:
+            with self._lock:
+                self._results.append(item)
+
+    def _fail(self, stage: str, error: BaseException) -> None:
+        with self._lock:
+            if self._error is None:
+                self._error = PipelineError(stage, error)
+        self._failed.set()
+
+    def _work(self, index: int) -> None:
+        stage, stats, inbox = self.stages[index], self._stats[index], self._queues[index]
+        with self._lock:
+            if stats.started_at is None:
+                stats.started_at = time.perf_counter()
+
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            queue_depth.set(inbox.qsize(), stage=stage.name)
+            # После ошибки очереди только дренируются, чтобы не заблокировать соседей
+            if self._failed.is_set():
+                continue
+            start = time.perf_counter()
+            try:
+                for output in stage.handler(item) or ():
+                    self._emit(index, output)
+            except BaseException as e:
+                with self._lock:
+                    stats.failed += 1
+                self._fail(stage.name, e)
+            finally:
+                with self._lock:
+                    stats.processed += 1
+                    stats.busy_s += time.perf_counter() - start
+                stage_items_total.inc(stage=stage.name)
+
+        with self._lock:
+            self._alive[index] -= 1
+            last_worker = self._alive[index] == 0
+            if last_worker:
+                stats.finished_at = time.perf_counter()
+        if last_worker:
+            queue_depth.set(0, stage=stage.name)
+        if last_worker and index + 1 < len(self.stages):
+            for _ in range(self.stages[index + 1].workers):
+                self._queues[index + 1].put(_DONE)
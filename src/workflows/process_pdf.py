@@ -1,42 +1,83 @@
-from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Callable, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, NamedTuple, Optional, Dict, Callable, Iterator, Sequence, Tuple
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 from PIL import Image
 import logging
+import os
+import time
+import numpy as np
 
+from src.config import config_provider
 from src.converters.pdf_to_page_images import (
-    convert_pdf_to_images,
+    convert_pdf_page,
+    get_pdf_page_count,
     PdfConversionError,
     PageConversionResult,
 )
+from src.database.engine import create_db_engine
 from src.repository import documents as doc_repo, pages as page_repo, fragments as fragment_repo
 from src.recognizers.layout_analyzer import analyze_pdf, LayoutAnalyzerError
-from src.utils.image_saver import save_page_image, save_fragment_image
-from src.utils.coordinates import scale_coordinates_from_pt_to_px
+from src.utils.image_saver import (
+    create_image_writer,
+    image_nbytes,
+    save_page_image,
+    save_fragment_image,
+)
+from src.utils.image_writer import ImageWriter
+from src.utils.fragment_table import FragmentTable
+from src.utils.memory_governor import Lease, budget_from_settings, memory_governor
+from src.utils.raw_fragment_validators import MIN_FRAGMENT_HEIGHT, MIN_FRAGMENT_WIDTH
+from src.utils.reading_order import as_array_strategy
+from src.utils.metrics_exporter import export_worker_textfile
+from src.utils.profiling import profile_document
+from src.utils.timing import span
+from src.workflows.pipeline import Pipeline, PipelineError, Stage
 from src.entities import Document, Fragment, Page, RawFragment
 
+settings = config_provider.get_settings()
+logger = config_provider.get_logger(__name__)
+metrics = config_provider.get_metrics()
+documents_total = metrics.counter("documents_total", "Processed PDF documents", ["status"])
+pages_total = metrics.counter("pages_total", "PDF pages persisted")
+fragments_total = metrics.counter("fragments_total", "Fragments persisted")
+layout_errors_total = metrics.counter(
+    "layout_analyzer_errors_total", "Layout analyzer failures", ["error"]
+)
 
-def group_fragments_by_page_number(fragments: List[RawFragment]) -> Dict[int, List[RawFragment]]:
-    """Группирует фрагменты по номеру страницы (page_number из анализатора)."""
-    pages: Dict[int, List[RawFragment]] = defaultdict(list)
-    for fragment in fragments:
-        pages[fragment["page_number"]].append(fragment)
-    return pages
+# Страница, сохраненная в БД, на пути к стадии нарезки
+PersistedPage = Tuple[Image.Image, Page, List[Fragment]]
 
 
-def convert_raw_fragments_to_fragments(
-    raw_page_fragments: List[RawFragment], dpi: int, image_size: Tuple[int, int]
-) -> List[Fragment]:
-    page_fragments = []
+def build_fragment_table(
+    raw_fragments: Sequence[RawFragment],
+    dpi: int,
+    order_strategy: Callable[[List[Fragment]], List[int]],
+) -> FragmentTable:
+    """
+    Загружает все сырые фрагменты документа в колоночную таблицу и за несколько
+    векторных проходов валидирует размеры, масштабирует координаты в px и
+    вычисляет порядок чтения для всех страниц.
+    """
+    table = FragmentTable.from_raw(raw_fragments)
+    table = table.take(np.flatnonzero(table.valid_mask(MIN_FRAGMENT_WIDTH, MIN_FRAGMENT_HEIGHT)))
+    table = table.scale_to_px(dpi)
+    table = table.take(np.flatnonzero(table.valid_mask(1, 1)))
+    return table.assign_order(as_array_strategy(order_strategy))
 
-    for raw_fr in raw_page_fragments:
-        px_crop_box = scale_coordinates_from_pt_to_px(
-            raw_fr["left"], raw_fr["top"], raw_fr["width"], raw_fr["height"], image_size, dpi
-        )
-        page_fragments.append(Fragment.from_dict(raw_fr, px_crop_box))
-    return page_fragments
+
+def estimate_page_nbytes(
+    table: FragmentTable, page_groups: Dict[int, np.ndarray]
+) -> Dict[int, int]:
+    """Размер декодированных страниц до растеризации (размер страницы из разметки, px)."""
+    bytes_per_px = 3 if settings.RENDER_COLOR_MODE == "rgb" else 1
+    return {
+        page: int(np.prod(table.page_sizes[indices[0]])) * bytes_per_px
+        for page, indices in page_groups.items()
+    }
 
 
 class PdfProcessor:
@@ -62,31 +103,93 @@ class PdfProcessor:
         self.filename = pdf_path.stem
         self.extension = pdf_path.suffix.lstrip(".")
         self.document: Optional[Document] = None
+        self.image_writer: Optional[ImageWriter] = None
+        # Страницы в полете (от растеризации до нарезки) под бюджетом памяти
+        self._leases: Dict[int, Lease] = {}
+        self._pipeline: Optional[Pipeline] = None
+        self._page_estimates: Dict[int, int] = {}
 
     def process(self) -> Optional[Document]:
         """Основной метод, запускающий пайплайн обработки."""
         if not self._get_or_create_document():
             self.logger.info({"file": self.filename, "status": "skipped"})
+            documents_total.inc(status="skipped")
             return None
 
+        self.image_writer = create_image_writer(self.output_dir)
         try:
-            # 1. Анализируем разметку документа
+            # 1. Анализируем разметку документа, масштабируем и упорядочиваем фрагменты
             raw_fragments = analyze_pdf(str(self.pdf_path))
-            grouped_raw_fragments_by_page = group_fragments_by_page_number(raw_fragments)
-
-            # 2. Конвертируем PDF в изображения и обрабатываем постранично
-            for result in convert_pdf_to_images(self.pdf_path, dpi=self.dpi):
-                self._process_page(result, grouped_raw_fragments_by_page)
-
-            # 3. Завершаем обработку
-            self._finalize_processing(success=True)
+            with span("pdf.fragment_table", document=self.filename) as table_span:
+                table = build_fragment_table(raw_fragments, self.dpi, self.order_strategy)
+                page_groups = table.page_groups()
+                table_span.add(items=len(table))
+            self._page_estimates = estimate_page_nbytes(table, page_groups)
+
+            # 2. Растеризация, запись в БД и нарезка идут параллельными стадиями
+            pipeline = self._pipeline = self._build_pipeline(table, page_groups)
+            pipeline.run(range(1, get_pdf_page_count(self.pdf_path) + 1))
+            self.logger.info({"file": self.filename, "pipeline": pipeline.stats()})
+
+            # 3. Завершаем обработку: документ с незаписанными изображениями не успешен
+            if not self._finalize_processing(success=True):
+                documents_total.inc(status="failed")
+                return None
+            documents_total.inc(status="success")
             return self.document
 
-        except (LayoutAnalyzerError, PdfConversionError) as e:
+        except (LayoutAnalyzerError, PdfConversionError, PipelineError) as e:
             self.logger.error({"file": self.filename, "error": str(e)})
+            if isinstance(e, LayoutAnalyzerError):
+                layout_errors_total.inc(error=type(e).__name__)
+            documents_total.inc(status="failed")
             self._finalize_processing(success=False)
             return None
 
+        finally:
+            # После ошибки пайплайна часть страниц не дошла до нарезки
+            for lease in self._leases.values():
+                lease.release()
+            self._leases.clear()
+            self.image_writer.close()
+
+    def _build_pipeline(self, table: FragmentTable, page_groups: Dict[int, np.ndarray]) -> Pipeline:
+        """
+        rasterize -> persist -> crop. Запись в БД — один поток: сессия не потокобезопасна.
+        Ограниченные очереди держат в памяти не больше PIPELINE_QUEUE_SIZE страниц на стадию;
+        при заданном MEMORY_BUDGET_MB число страниц в полете дополнительно ограничивает
+        memory_governor.
+        """
+        memory_governor.register(
+            "pages",
+            settings.PIPELINE_RASTERIZE_WORKERS
+            + 2 * settings.PIPELINE_QUEUE_SIZE
+            + 1
+            + settings.PIPELINE_CROP_WORKERS,
+        )
+        return Pipeline(
+            [
+                Stage(
+                    "rasterize",
+                    self._rasterize_page,
+                    workers=settings.PIPELINE_RASTERIZE_WORKERS,
+                    queue_size=settings.PIPELINE_QUEUE_SIZE,
+                ),
+                Stage(
+                    "persist",
+                    lambda result: self._persist_page(result, table, page_groups),
+                    workers=1,
+                    queue_size=settings.PIPELINE_QUEUE_SIZE,
+                ),
+                Stage(
+                    "crop",
+                    self._save_page_images,
+                    workers=settings.PIPELINE_CROP_WORKERS,
+                    queue_size=settings.PIPELINE_QUEUE_SIZE,
+                ),
+            ]
+        )
+
     def _get_or_create_document(self) -> bool:
         """Получает документ из БД или создает новый. Возвращает False, если документ уже успешно обработан."""
         doc = doc_repo.get_document_by_filename(self.session, self.filename)
@@ -100,37 +203,82 @@ class PdfProcessor:
         self.document = doc
         return True
 
-    def _process_page(
-        self, conv_result: PageConversionResult, all_fragments: Dict[int, List[RawFragment]]
-    ):
-        """Обрабатывает одну страницу: сохраняет, создает сущности, нарезает фрагменты."""
+    def _rasterize_page(self, page_number: int) -> List[PageConversionResult]:
+        estimate = self._page_estimates.get(
+            page_number, max(self._page_estimates.values(), default=0)
+        )
+        # После ошибки пайплайна страницы не дойдут до нарезки и не освободят слоты
+        self._leases[page_number] = memory_governor.acquire(
+            estimate, "pages", cancel=self._pipeline.failed if self._pipeline else None
+        )
+        with span("pdf.rasterize", document=self.filename, page=page_number) as page_span:
+            result = convert_pdf_page(self.pdf_path, page_number, self.dpi)
+            if result.image:
+                nbytes = image_nbytes(result.image)
+                self._leases[page_number].resize(nbytes)
+                page_span.add(bytes=nbytes, items=1)
+        return [result]
+
+    def _release_page(self, page_number: int) -> None:
+        lease = self._leases.pop(page_number, None)
+        if lease is not None:
+            lease.release()
+
+    def _persist_page(
+        self,
+        conv_result: PageConversionResult,
+        table: FragmentTable,
+        page_groups: Dict[int, np.ndarray],
+    ) -> Iterator[PersistedPage]:
+        """Создает записи о странице и ее фрагментах в БД."""
         if conv_result.error or not conv_result.image:
             self.logger.error(
                 {"file": self.filename, "page": conv_result.page_number, "error": conv_result.error}
             )
+            self._release_page(conv_result.page_number)
             return
 
-        # 1. Создаем запись о странице в БД
-        page = self._create_and_save_page(conv_result)
+        with span("pdf.persist", document=self.filename, page=conv_result.page_number) as db_span:
+            # 1. Создаем запись о странице в БД
+            page = self._create_page(conv_result)
 
-        # 2.1 Получаем фрагменты для текущей страницы
-        raw_fragments = all_fragments.get(page.number, [])
-        if not raw_fragments:
-            return
-
-        # 2.2 Преобразовываем сырые фрагменты
-        page_fragments = convert_raw_fragments_to_fragments(
-            raw_fragments, self.dpi, conv_result.image._size
-        )
-        self._set_fragments_order(page_fragments)
-
-        # 3. Создаем записи о фрагментах в БД и нарезаем фрагменты по координатам
-        self._create_fragments(page, page_fragments)
-        self._crop_and_save_fragments(conv_result.image, page.number, page_fragments)
+            # 2. Получаем уже масштабированные и упорядоченные фрагменты текущей страницы
+            indices = page_groups.get(page.number)
+            page_fragments = table.to_fragments(indices) if indices is not None else []
 
+            # 3. Создаем записи о фрагментах в БД
+            self._create_fragments(page, page_fragments)
+            db_span.add(items=len(page_fragments))
+        pages_total.inc()
+        fragments_total.inc(len(page_fragments))
         self.logger.info({"page": page.number, "fragments_created": len(page_fragments)})
-
-    def _create_and_save_page(self, conv_result: PageConversionResult) -> Page:
+        yield conv_result.image, page, page_fragments
+
+    def _save_page_images(self, item: PersistedPage) -> None:
+        """
+        Сохраняет изображение страницы и нарезает фрагменты по координатам.
+        В режимах "pages"/"pdf" (FRAGMENT_IMAGE_MODE) фрагменты вырезаются при чтении.
+        """
+        page_image, page, page_fragments = item
+        try:
+            with span("pdf.crop", document=self.filename, page=page.number) as crop_span:
+                if settings.FRAGMENT_IMAGE_MODE != "pdf":
+                    save_page_image(
+                        page_image,
+                        self.output_dir,
+                        self.document.filename,
+                        page.number,
+                        page.page_id,
+                        writer=self.image_writer,
+                    )
+                if settings.FRAGMENT_IMAGE_MODE == "fragments":
+                    self._crop_and_save_fragments(page_image, page.number, page_fragments)
+                    crop_span.add(items=len(page_fragments))
+        finally:
+            self._release_page(page.number)
+        self.logger.info({"page": page.number, "status": "processed"})
+
+    def _create_page(self, conv_result: PageConversionResult) -> Page:
         page_entity = Page(
             page_id=None,
             document_id=self.document.document_id,
@@ -140,20 +288,12 @@ class PdfProcessor:
             height=conv_result.image.height,
         )
         page_repo.create_page(self.session, page_entity)
-        save_page_image(
-            conv_result.image,
-            self.output_dir,
-            self.document.filename,
-            page_entity.number,
-            page_entity.page_id,
-        )
-        self.logger.info({"page": page_entity.number, "status": "processed"})
         return page_entity
 
     def _create_fragments(self, page: Page, fragments: List[Fragment]):
         for frag in fragments:
             frag.page_id = page.page_id
-            fragment_repo.create_fragment(self.session, frag)
+        fragment_repo.create_fragments(self.session, fragments)
 
     def _crop_and_save_fragments(
         self, page_image: Image.Image, page_number: int, fragments: List[Fragment]
@@ -166,6 +306,7 @@ class PdfProcessor:
                     filename=self.filename,
                     page_number=page_number,
                     fragment=fragment,
+                    writer=self.image_writer,
                 )
             except Exception as e:
                 self.logger.error(
@@ -177,25 +318,29 @@ class PdfProcessor:
                     }
                 )
 
-    def _set_fragments_order(self, fragments: List[Fragment]):
-        if not fragments:
-            return
-        ordered_indices = self.order_strategy(fragments)
-        for order_num, original_index in enumerate(ordered_indices):
-            fragments[original_index].order_number = order_num
+    def _finalize_processing(self, success: bool) -> bool:
+        """Возвращает итоговый статус: ошибка записи изображений переводит документ в failed."""
+        # Барьер: все изображения документа записаны до commit
+        if self.image_writer:
+            with span("image.flush", document=self.filename):
+                write_errors = self.image_writer.flush()
+            if write_errors and success:
+                success = False
+                self.logger.error({"file": self.filename, "image_write_errors": len(write_errors)})
 
-    def _finalize_processing(self, success: bool):
         if self.document:
             self.document.is_success_processed = success
             self.document.processed_at = datetime.utcnow()
             doc_repo.update_document_status(self.session, self.document)
 
         if success:
-            self.session.commit()
+            with span("db.commit", document=self.filename):
+                self.session.commit()
             self.logger.info({"file": self.filename, "status": "successfully_processed"})
         else:
             self.session.rollback()
             self.logger.error({"file": self.filename, "status": "processing_failed"})
+        return success
 
 
 def process_single_pdf(
@@ -210,7 +355,219 @@ def process_single_pdf(
     Создает экземпляр PdfProcessor и запускает обработку для одного файла.
     """
     processor = PdfProcessor(pdf_path, output_dir, dpi, session, logger, order_strategy)
-    return processor.process()
+    with span("pdf.document", document=pdf_path.stem), profile_document(
+        "pdf", pdf_path.stem
+    ) as profile:
+        try:
+            return processor.process()
+        finally:
+            if processor.document:
+                profile.document_id = processor.document.document_id
+
+
+class DocumentResult(NamedTuple):
+    """Итог обработки одного PDF: document=None и error=None — документ уже был обработан."""
+
+    pdf_path: Path
+    document: Optional[Document]
+    error: Optional[str]
+    page_count: int
+
+
+# Engine процесса-воркера: создается один раз в initializer пула
+_worker_engine: Optional[Engine] = None
+
+
+def _init_worker(database_uri: str, workers: int) -> None:
+    global _worker_engine
+    _worker_engine = create_db_engine(database_uri)
+    # Бюджет памяти общий для узла: каждому процессу — своя доля
+    memory_governor.configure(budget_from_settings(workers))
+    # После fork реестр содержит значения родителя: воркер считает только свои
+    metrics.reset()
+    metrics.const_labels["worker"] = str(os.getpid())
+
+
+def _process_pdf_in_worker(
+    pdf_path: Path,
+    output_dir: Path,
+    dpi: int,
+    order_strategy: Callable[[List[Fragment]], List[int]],
+) -> Optional[Document]:
+    try:
+        with Session(_worker_engine) as session:
+            return process_single_pdf(pdf_path, output_dir, dpi, session, logger, order_strategy)
+    finally:
+        export_worker_textfile(metrics)
+
+
+def _safe_page_count(pdf_path: Path) -> Tuple[int, Optional[str]]:
+    try:
+        return get_pdf_page_count(pdf_path), None
+    except PdfConversionError as e:
+        return 0, str(e)
+
+
+def schedule_largest_first(
+    pdf_files: Sequence[Path],
+) -> Tuple[List[Tuple[Path, int]], List[DocumentResult]]:
+    """
+    Сортирует документы по числу страниц по убыванию (LPT): длинные документы
+    стартуют первыми и не остаются хвостом в конце батча.
+    PDF, для которых не удалось получить число страниц, сразу попадают в ошибки.
+    """
+    jobs, failures = [], []
+    for pdf_path in pdf_files:
+        page_count, error = _safe_page_count(pdf_path)
+        if error:
+            failures.append(DocumentResult(pdf_path, None, error, 0))
+        else:
+            jobs.append((pdf_path, page_count))
+    jobs.sort(key=lambda job: job[1], reverse=True)
+    return jobs, failures
+
+
+def document_timeout(page_count: int) -> Optional[float]:
+    if settings.PDF_DOCUMENT_TIMEOUT_BASE_S is None:
+        return None
+    return (
+        settings.PDF_DOCUMENT_TIMEOUT_BASE_S + settings.PDF_DOCUMENT_TIMEOUT_PER_PAGE_S * page_count
+    )
+
+
+def _terminate_pool(pool: ProcessPoolExecutor) -> None:
+    # Зависший воркер не завершится сам: shutdown ждал бы его бесконечно.
+    # Публичный terminate_workers() появился только в Python 3.14; в старых версиях
+    # процессы пула есть лишь в приватном _processes ({pid: Process}). getattr — чтобы
+    # исчезновение атрибута дало предупреждение, а не AttributeError посреди таймаута
+    terminate_workers = getattr(pool, "terminate_workers", None)
+    if terminate_workers is not None:
+        terminate_workers()
+        return
+    processes = getattr(pool, "_processes", None)
+    if processes is None:
+        logger.warning({"msg": "Cannot terminate pool workers: no process handles"})
+        return
+    for process in list(processes.values()):
+        process.terminate()
+
+
+def _run_pool(
+    jobs: List[Tuple[Path, int]],
+    workers: int,
+    database_uri: str,
+    submit_args: Tuple,
+) -> Tuple[List[DocumentResult], List[Tuple[Path, int]], List[Tuple[Path, int]]]:
+    """
+    Запускает jobs в пуле, отправляя не больше workers задач сразу: срок документа
+    (document_timeout) отсчитывается от фактического старта. Возвращает готовые
+    результаты, задачи, оборванные падением пула, и задачи, не доведенные до конца
+    из-за перезапуска пула после зависшего документа (их можно запустить снова).
+    """
+    results, interrupted, requeued = [], [], []
+    queue = list(jobs)
+    running: Dict[Future, Tuple[Path, int, float]] = {}
+    pool = ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(database_uri, workers)
+    )
+    try:
+        while queue or running:
+            while queue and len(running) < workers:
+                pdf_path, page_count = queue.pop(0)
+                timeout = document_timeout(page_count)
+                deadline = time.monotonic() + timeout if timeout is not None else float("inf")
+                future = pool.submit(_process_pdf_in_worker, pdf_path, *submit_args)
+                running[future] = (pdf_path, page_count, deadline)
+
+            nearest = min(deadline for _, _, deadline in running.values())
+            wait_s = None if nearest == float("inf") else max(nearest - time.monotonic(), 0)
+            done, _ = wait(running, timeout=wait_s, return_when=FIRST_COMPLETED)
+            for future in done:
+                pdf_path, page_count, _ = running.pop(future)
+                try:
+                    results.append(DocumentResult(pdf_path, future.result(), None, page_count))
+                except BrokenProcessPool:
+                    interrupted.append((pdf_path, page_count))
+                except Exception as e:
+                    results.append(DocumentResult(pdf_path, None, str(e), page_count))
+            if interrupted:
+                # Пул сломан: оставшиеся в полете задачи тоже оборваны
+                interrupted.extend((path, count) for path, count, _ in running.values())
+                requeued.extend(queue)
+                break
+
+            now = time.monotonic()
+            expired = [future for future, (_, _, deadline) in running.items() if deadline <= now]
+            if expired:
+                for future in expired:
+                    pdf_path, page_count, _ = running.pop(future)
+                    error = f"Timed out after {document_timeout(page_count):.0f}s"
+                    logger.error({"file": pdf_path.name, "pages": page_count, "error": error})
+                    results.append(DocumentResult(pdf_path, None, error, page_count))
+                requeued.extend((path, count) for path, count, _ in running.values())
+                requeued.extend(queue)
+                _terminate_pool(pool)
+                break
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return results, interrupted, requeued
+
+
+def _run_isolated(
+    jobs: List[Tuple[Path, int]], database_uri: str, submit_args: Tuple
+) -> List[DocumentResult]:
+    """По одному документу на пул: падение пула затрагивает только сам документ."""
+    results = []
+    for job in jobs:
+        done, interrupted, _ = _run_pool([job], 1, database_uri, submit_args)
+        results.extend(done)
+        results.extend(
+            DocumentResult(pdf_path, None, "Worker process crashed", page_count)
+            for pdf_path, page_count in interrupted
+        )
+    return results
+
+
+def process_bulk_pdf_parallel(
+    pdf_files: List[Path],
+    output_dir: Path,
+    dpi: int,
+    logger: logging.LoggerAdapter,
+    order_strategy: Callable[[List[Fragment]], List[int]],
+    workers: int = settings.PDF_PROCESS_WORKERS,
+    database_uri: str = settings.SQLALCHEMY_DATABASE_URI,
+) -> List[DocumentResult]:
+    """
+    Обрабатывает до workers документов одновременно в отдельных процессах, у каждого
+    свой engine и сессия. Если процесс-воркер падает (например, OOM на битом PDF),
+    оборванные документы перезапускаются по одному, чтобы найти виновника и не
+    потерять остальные. Документ, не уложившийся в document_timeout (зависший
+    pdftoppm или анализатор), считается ошибкой; пул перезапускается, прерванные
+    вместе с ним документы обрабатываются заново.
+    """
+    jobs, results = schedule_largest_first(pdf_files)
+    submit_args = (output_dir, dpi, order_strategy)
+    crashed = []
+    while jobs:
+        done, interrupted, jobs = _run_pool(jobs, workers, database_uri, submit_args)
+        results.extend(done)
+        crashed.extend(interrupted)
+        if jobs:
+            logger.warning({"msg": "Worker pool restarted", "remaining": len(jobs)})
+    if crashed:
+        logger.warning({"msg": "Worker pool broke", "interrupted": len(crashed)})
+        results.extend(_run_isolated(crashed, database_uri, submit_args))
+
+    for result in results:
+        logger.info(
+            {
+                "file": result.pdf_path.name,
+                "pages": result.page_count,
+                "document_id": result.document.document_id if result.document else None,
+                "error": result.error,
+            }
+        )
+    return results
 
 
 def process_bulk_pdf(
@@ -220,14 +577,30 @@ def process_bulk_pdf(
     session: Session,
     logger: logging.LoggerAdapter,
     order_strategy: Callable[[List[Fragment]], List[int]],
-) -> List[Document]:
+    workers: int = 1,
+) -> List[DocumentResult]:
     """
-    Обрабатывает все PDF-файлы в указанной директории.
+    Обрабатывает все PDF-файлы в указанной директории. При workers > 1 документы
+    обрабатываются параллельно в процессах (см. process_bulk_pdf_parallel), session
+    при этом не используется.
     """
-    processed_docs = []
+    if workers > 1:
+        session.commit()
+        database_uri = session.get_bind().url.render_as_string(hide_password=False)
+        return process_bulk_pdf_parallel(
+            pdf_files, output_dir, dpi, logger, order_strategy, workers, database_uri
+        )
+
+    results = []
     for pdf_path in pdf_files:
         logger.info(f"Starting processing for {pdf_path.name}")
-        document = process_single_pdf(pdf_path, output_dir, dpi, session, logger, order_strategy)
-        if document:
-            processed_docs.append(document)
-    return processed_docs
+        try:
+            document = process_single_pdf(
+                pdf_path, output_dir, dpi, session, logger, order_strategy
+            )
+            results.append(DocumentResult(pdf_path, document, None, 0))
+        except Exception as e:
+            session.rollback()
+            logger.error({"file": pdf_path.name, "error": str(e)})
+            results.append(DocumentResult(pdf_path, None, str(e), 0))
+    return results
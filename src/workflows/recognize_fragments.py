@@ -1,11 +1,12 @@
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 from sqlalchemy.orm import Session
 from functools import reduce
+from PIL import Image
 import logging
 
 from src.config import config_provider
-from src.entities import Document, Fragment, RecognizedFragment
+from src.entities import ContentType, Document, Fragment, Page, RecognizedFragment
 from src.repository import (
     fragments as fragment_repo,
     pages as page_repo,
@@ -13,9 +14,32 @@ from src.repository import (
 )
 from src.recognizers.base_recognizer import BaseRecognizer
 from src.recognizers.text_recognizer import TextRecognizer
-from src.utils.image_saver import settings
+from src.utils.fragment_filters import get_skip_reason
+from src.utils.fragment_packing import (
+    pack_images,
+    split_into_tiles,
+    split_packed_text,
+    stitch_texts,
+)
+from src.utils.fragment_images import load_fragment_image, page_cache
+from src.utils.image_saver import image_nbytes
+from src.utils.memory_governor import memory_governor
+from src.utils.profiling import profile_document
+from src.utils.timing import span
+from src.workflows.manifest import find_source_file
 
+settings = config_provider.get_settings()
 logger = config_provider.get_logger(__name__)
+debug_log = config_provider.get_debug_sampler(__name__)
+metrics = config_provider.get_metrics()
+recognized_total = metrics.counter(
+    "recognized_fragments_total", "Fragments passed to a recognizer", ["recognizer", "status"]
+)
+recognizer_seconds = metrics.histogram(
+    "recognizer_latency_seconds", "Recognition time per batch", ["recognizer"]
+)
+
+FragmentImage = Tuple[Fragment, Image.Image]
 
 RECOGNIZER_FACTORIES: Dict[str, callable] = {
     "text": lambda: TextRecognizer(),
@@ -34,63 +58,257 @@ def get_recognizer_instance(recognizer_type: str) -> BaseRecognizer:
 def get_fragments_to_recognize(
     session: Session, document: Document, allowed_types: List[str]
 ) -> List[Fragment]:
-    pages = page_repo.get_pages_by_document_id(session, document.document_id)
-    all_fragments = [
-        f
-        for page in pages
-        for f in fragment_repo.get_fragments_by_page_id(session, page.page_id)
-        if f.content_type.value in allowed_types
-    ]
-    return all_fragments
+    fragments = fragment_repo.get_fragments_by_document_id(
+        session, document.document_id, allowed_types
+    )
+    return sorted(fragments, key=lambda f: (f.page_number, f.order_number or 0))
 
 
-def process_single_fragment(
+def is_already_recognized(session: Session, fragment: Fragment, recognizer_name: str) -> bool:
+    existing = recognized_repo.get_recognized_fragment_by_fragment_id(
+        session, fragment.fragment_id, recognizer_name
+    )
+    if existing:
+        logger.info(
+            {"fragment_id": fragment.fragment_id, "msg": "Already recognized by this tool."}
+        )
+    return bool(existing)
+
+
+def recognize_fragment_image(
+    recognizer: BaseRecognizer, image: Image.Image, content_type: ContentType
+) -> Optional[str]:
+    """Распознает фрагмент; высокие текстовые фрагменты режутся на тайлы и склеиваются обратно."""
+    if (
+        recognizer.supports_composites
+        and content_type.value in settings.RECOGNITION_TILE_TYPES
+        and image.height > settings.RECOGNITION_TILE_MAX_HEIGHT
+    ):
+        tiles = split_into_tiles(
+            image, settings.RECOGNITION_TILE_MAX_HEIGHT, settings.RECOGNITION_TILE_OVERLAP
+        )
+        debug_log.debug(
+            {"msg": "Fragment split into tiles", "height": image.height, "tiles": len(tiles)}
+        )
+        return stitch_texts([recognizer.recognize(tile, content_type) for tile in tiles]) or None
+    return recognizer.recognize(image, content_type)
+
+
+def is_packable(fragment: Fragment, image: Image.Image) -> bool:
+    return (
+        fragment.content_type.value in settings.RECOGNITION_PACK_TYPES
+        and image.height <= settings.RECOGNITION_PACK_MAX_FRAGMENT_HEIGHT
+    )
+
+
+def plan_recognition_batches(
+    items: Iterable[FragmentImage], allow_packing: bool
+) -> Iterator[List[FragmentImage]]:
+    """
+    Группирует соседние (в порядке чтения, на одной странице) мелкие фрагменты в пакеты
+    для одной композиции; остальные фрагменты идут по одному.
+    """
+    batch: List[FragmentImage] = []
+    batch_height = 0
+    for fragment, image in items:
+        if not (allow_packing and is_packable(fragment, image)):
+            if batch:
+                yield batch
+                batch, batch_height = [], 0
+            yield [(fragment, image)]
+            continue
+
+        fits = (
+            batch
+            and batch[0][0].page_number == fragment.page_number
+            and len(batch) < settings.RECOGNITION_PACK_MAX_ITEMS
+            and batch_height + image.height <= settings.RECOGNITION_PACK_MAX_HEIGHT
+        )
+        if batch and not fits:
+            yield batch
+            batch, batch_height = [], 0
+        batch.append((fragment, image))
+        batch_height += image.height
+    if batch:
+        yield batch
+
+
+def save_recognized_text(
+    session: Session, fragment: Fragment, recognizer_name: str, recognized_text: Optional[str]
+) -> bool:
+    if not recognized_text:
+        return False
+
+    new_entity = RecognizedFragment(
+        recognized_fragment_id=None,
+        fragment_id=fragment.fragment_id,
+        recognizer=recognizer_name,
+        text=recognized_text,
+        confidence=None,
+    )
+    recognized_repo.create_recognized_fragment(session, new_entity)
+    return True
+
+
+def recognize_single_item(
     session: Session,
     fragment: Fragment,
+    image: Image.Image,
     recognizer: BaseRecognizer,
     recognizer_name: str,
-    output_dir: Path,
-    filename: str,
 ) -> bool:
-    image_path = output_dir / settings.IMAGE_FRAGMENT_PATH_TEMPLATE.format(
-        filename=filename,
-        page_number=fragment.page_number,
-        order_number=fragment.order_number or 0,
-        fragment_id=fragment.fragment_id,
-        content_type=fragment.content_type.value.lower(),
-        extension=settings.IMAGE_FORMAT.lower(),
-    )
     try:
-        existing = recognized_repo.get_recognized_fragment_by_fragment_id(
-            session, fragment.fragment_id, recognizer_name
+        recognized_text = recognize_fragment_image(recognizer, image, fragment.content_type)
+        return save_recognized_text(session, fragment, recognizer_name, recognized_text)
+    except Exception as e:
+        logger.error({"fragment_id": fragment.fragment_id, "error": str(e)})
+        return False
+
+
+def recognize_packed_batch(
+    session: Session,
+    batch: List[FragmentImage],
+    recognizer: BaseRecognizer,
+    recognizer_name: str,
+) -> int:
+    """Распознает пакет одной композицией и раскладывает текст по fragment_id."""
+    separator = settings.RECOGNITION_PACK_SEPARATOR
+    try:
+        composite = pack_images([image for _, image in batch], separator)
+        packed_text = recognizer.recognize(composite, prompt=settings.TEXT_RECOGNIZER_PACKED_PROMPT)
+        parts = split_packed_text(packed_text or "", len(batch), separator)
+    except Exception as e:
+        logger.error({"fragment_ids": [f.fragment_id for f, _ in batch], "error": str(e)})
+        parts = None
+
+    if parts is None:
+        logger.warning(
+            {
+                "msg": "Packed recognition could not be split, falling back to single fragments",
+                "fragment_ids": [f.fragment_id for f, _ in batch],
+            }
+        )
+        return sum(
+            recognize_single_item(session, fragment, image, recognizer, recognizer_name)
+            for fragment, image in batch
         )
-        if existing:
-            logger.info(
-                {"fragment_id": fragment.fragment_id, "msg": "Already recognized by this tool."}
+
+    return sum(
+        save_recognized_text(session, fragment, recognizer_name, part)
+        for (fragment, _), part in zip(batch, parts)
+    )
+
+
+def recognize_batch(
+    session: Session,
+    batch: List[FragmentImage],
+    recognizer: BaseRecognizer,
+    recognizer_name: str,
+) -> int:
+    fragment_ids = [fragment.fragment_id for fragment, _ in batch]
+    # Изображения пакета уже декодированы: учет нужен, чтобы при нехватке памяти
+    # memory_governor уменьшил кэш страниц
+    nbytes = sum(image_nbytes(image) for _, image in batch)
+    with memory_governor.acquire(nbytes), span(
+        "recognize.batch", fragment_ids=fragment_ids
+    ) as batch_span:
+        batch_span.add(bytes=nbytes, items=len(batch))
+        if len(batch) == 1:
+            fragment, image = batch[0]
+            recognized = int(
+                recognize_single_item(session, fragment, image, recognizer, recognizer_name)
             )
-            return False
+        else:
+            recognized = recognize_packed_batch(session, batch, recognizer, recognizer_name)
 
-        recognized_text = recognizer.recognize_image(image_path)
-        if not recognized_text:
-            return False
+    recognizer_seconds.observe(batch_span.duration_s, recognizer=recognizer_name)
+    recognized_total.inc(recognized, recognizer=recognizer_name, status="recognized")
+    recognized_total.inc(len(batch) - recognized, recognizer=recognizer_name, status="failed")
+    return recognized
 
-        new_entity = RecognizedFragment(
+
+def mark_fragment_skipped(
+    session: Session, fragment: Fragment, recognizer_name: str, reason: str
+) -> None:
+    debug_log.debug(
+        {"fragment_id": fragment.fragment_id, "msg": "Fragment skipped", "reason": reason}
+    )
+    recognized_total.inc(recognizer=recognizer_name, status="skipped")
+    recognized_repo.create_recognized_fragment(
+        session,
+        RecognizedFragment(
             recognized_fragment_id=None,
             fragment_id=fragment.fragment_id,
             recognizer=recognizer_name,
-            text=recognized_text,
+            text=None,
             confidence=None,
-        )
-        recognized_repo.create_recognized_fragment(session, new_entity)
+            skip_reason=reason,
+        ),
+    )
 
-        return True
-    except Exception as e:
-        logger.error({"fragment_id": fragment.fragment_id, "error": str(e)})
+
+def iter_pending_fragments(
+    session: Session,
+    fragments: Iterable[Fragment],
+    recognizer_name: str,
+    output_dir: Path,
+    filename: str,
+    pages: Optional[Dict[int, Page]] = None,
+    source_pdf: Optional[Path] = None,
+) -> Iterator[FragmentImage]:
+    """
+    pages (page_id -> Page) и source_pdf нужны для виртуальных вырезок из PDF
+    (FRAGMENT_IMAGE_MODE="pdf").
+    """
+    pages = pages or {}
+    for fragment in fragments:
+        if is_already_recognized(session, fragment, recognizer_name):
+            continue
+        try:
+            image = load_fragment_image(
+                output_dir, filename, fragment, pages.get(fragment.page_id), source_pdf
+            )
+            skip_reason = get_skip_reason(image) if settings.BLANK_FILTER_ENABLED else None
+        except Exception as e:
+            logger.error({"fragment_id": fragment.fragment_id, "error": str(e)})
+            continue
+
+        if skip_reason:
+            mark_fragment_skipped(session, fragment, recognizer_name, skip_reason)
+            continue
+        yield fragment, image
+
+
+def process_single_fragment(
+    session: Session,
+    fragment: Fragment,
+    recognizer: BaseRecognizer,
+    recognizer_name: str,
+    output_dir: Path,
+    filename: str,
+    page: Optional[Page] = None,
+    source_pdf: Optional[Path] = None,
+) -> bool:
+    pages = {page.page_id: page} if page else None
+    pending = list(
+        iter_pending_fragments(
+            session, [fragment], recognizer_name, output_dir, filename, pages, source_pdf
+        )
+    )
+    if not pending:
         return False
+    return recognize_batch(session, pending, recognizer, recognizer_name) > 0
 
 
 def recognize_single_document(
     document: Document, session: Session, logger: logging.LoggerAdapter, recognizer_type: str
+) -> Document:
+    with profile_document("recognize", document.filename, document.document_id):
+        return _recognize_document(document, session, logger, recognizer_type)
+
+
+def _recognize_document(
+    document: Document, session: Session, logger: logging.LoggerAdapter, recognizer_type: str
 ) -> Document:
     allowed_types = settings.RECOGNIZER_ALLOWED_TYPES.get(recognizer_type, [])
     fragments = get_fragments_to_recognize(session, document, allowed_types)
@@ -98,17 +316,36 @@ def recognize_single_document(
         logger.info({"document": document.filename, "msg": "No fragments to recognize"})
         return document
 
+    source_pdf = None
+    if settings.FRAGMENT_IMAGE_MODE == "pdf":
+        # До загрузки модели: без исходного файла страницы документа не отрисовать
+        source_pdf = find_source_file(session, document, settings.PDF_INPUT_DIR)
+
     recognizer = get_recognizer_instance(recognizer_type)
     recognizer_name = recognizer.recognizer_type
 
-    results = map(
-        lambda f: process_single_fragment(
-            session, f, recognizer, recognizer_name, settings.IMAGE_OUTPUT_DIR, document.filename
-        ),
+    pages = {
+        page.page_id: page
+        for page in page_repo.get_pages_by_document_id(session, document.document_id)
+    }
+    pending = iter_pending_fragments(
+        session,
         fragments,
+        recognizer_name,
+        settings.IMAGE_OUTPUT_DIR,
+        document.filename,
+        pages,
+        source_pdf,
+    )
+    batches = plan_recognition_batches(pending, allow_packing=recognizer.supports_composites)
+    successful = reduce(
+        lambda acc, batch: acc + recognize_batch(session, batch, recognizer, recognizer_name),
+        batches,
+        0,
     )
-    successful = reduce(lambda acc, res: acc + (1 if res else 0), results, 0)
 
+    # Страницы документа больше не нужны; id страниц SQLite может переиспользовать
+    page_cache.clear()
     logger.info({"document": document.filename, "recognized": successful, "total": len(fragments)})
     session.commit()
     return document
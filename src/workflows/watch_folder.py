@@ -0,0 +1,118 @@
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.config import config_provider
+
+logger = config_provider.get_logger(__name__)
+
+# (size, mtime) файла
+FileSignature = Tuple[int, float]
+
+
+class FolderWatcher:
+    """
+    Опрос директории без внешних зависимостей. Файл считается дописанным, когда его
+    size и mtime не менялись settle_s секунд; пустые файлы не отдаются.
+    Отданный файл считается обработанным после complete(); после retry() он снова
+    отдается через retry_delay_s (плюс settle_s), либо раньше, если изменился.
+    """
+
+    def __init__(
+        self,
+        input_dir: Path,
+        settle_s: float,
+        pattern: str = "*.pdf",
+        clock: Callable[[], float] = time.monotonic,
+        retry_delay_s: float = 30.0,
+    ):
+        self.input_dir = input_dir
+        self.settle_s = settle_s
+        self.pattern = pattern
+        self.clock = clock
+        self.retry_delay_s = retry_delay_s
+        self._pending: Dict[Path, Tuple[FileSignature, float]] = {}
+        # Отданы, но еще не подтверждены complete()/retry()
+        self._in_flight: Dict[Path, FileSignature] = {}
+        self._emitted: Dict[Path, FileSignature] = {}
+
+    def _scan(self) -> Dict[Path, FileSignature]:
+        signatures = {}
+        for path in self.input_dir.glob(self.pattern):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            signatures[path] = (stat.st_size, stat.st_mtime)
+        return signatures
+
+    def poll(self) -> List[Path]:
+        now = self.clock()
+        current = self._scan()
+        ready = []
+        for path, signature in current.items():
+            if self._emitted.get(path) == signature or path in self._in_flight:
+                continue
+            seen = self._pending.get(path)
+            if seen is None or seen[0] != signature:
+                self._pending[path] = (signature, now)
+            elif now - seen[1] >= self.settle_s and signature[0] > 0:
+                ready.append(path)
+                self._in_flight[path] = signature
+                del self._pending[path]
+
+        for known in (self._pending, self._in_flight, self._emitted):
+            for path in set(known) - set(current):
+                del known[path]
+        return sorted(ready)
+
+    def complete(self, paths: Sequence[Path]) -> None:
+        """Файлы обработаны: повторно отдаются, только если изменится их сигнатура."""
+        for path in paths:
+            signature = self._in_flight.pop(path, None)
+            if signature is not None:
+                self._emitted[path] = signature
+
+    def retry(self, paths: Sequence[Path]) -> None:
+        """Файлы не обработаны: вернутся в ожидание и будут отданы снова после паузы."""
+        retry_at = self.clock() + self.retry_delay_s
+        for path in paths:
+            signature = self._in_flight.pop(path, None)
+            if signature is not None:
+                self._pending[path] = (signature, retry_at)
+
+
+def run_watch(
+    watcher: FolderWatcher,
+    handle_batch: Callable[[List[Path]], Optional[List[Path]]],
+    poll_interval_s: float,
+    stop_event: threading.Event,
+) -> None:
+    """
+    Цикл сервиса: готовые файлы передаются в handle_batch пачкой за один опрос.
+    handle_batch возвращает файлы, которые не удалось обработать; они, как и вся пачка
+    при исключении, повторяются через retry_delay_s. Ошибка не останавливает сервис.
+    """
+    logger.info({"msg": "Watching input directory", "dir": str(watcher.input_dir)})
+    while not stop_event.is_set():
+        ready = watcher.poll()
+        if ready:
+            logger.info({"msg": "New input files", "files": [path.name for path in ready]})
+            try:
+                failed = handle_batch(ready) or []
+            except Exception as e:
+                logger.exception({"msg": "Batch failed", "error": str(e)})
+                failed = ready
+            watcher.complete([path for path in ready if path not in failed])
+            if failed:
+                logger.warning(
+                    {
+                        "msg": "Input files will be retried",
+                        "files": [path.name for path in failed],
+                        "retry_delay_s": watcher.retry_delay_s,
+                    }
+                )
+                watcher.retry(failed)
+        stop_event.wait(poll_interval_s)
+    logger.info({"msg": "Watcher stopped"})
@@ -0,0 +1,64 @@
+import json
+import pytest
+from benchmarks import compare
+from benchmarks.compare import compare_samples, compare_scenario, format_diff
+
+BASE = [1.00, 1.02, 0.98, 1.01, 0.99]
+
+
+def test_slower_and_faster_samples_are_flagged():
+    slower = compare_samples(BASE, [1.30, 1.32, 1.28, 1.31, 1.29], threshold=0.1, alpha=0.05)
+    assert slower["status"] == "regression"
+    assert slower["ratio"] == 1.3
+    assert slower["p_value"] < 0.05
+
+    faster = compare_samples(BASE, [0.70, 0.72, 0.68, 0.71, 0.69], threshold=0.1, alpha=0.05)
+    assert faster["status"] == "improvement"
+    assert faster["ratio"] == 0.7
+
+
+def test_small_or_insignificant_changes_are_ok():
+    within_threshold = [1.05, 1.07, 1.03, 1.06, 1.04]
+    assert compare_samples(BASE, within_threshold, 0.1, 0.05)["status"] == "ok"
+    # Медиана выросла, но выборки перекрываются: рост не значим
+    noisy = [0.90, 1.50, 0.95, 1.60, 1.40]
+    assert compare_samples(BASE, noisy, 0.1, 0.05)["status"] == "ok"
+    # Метрики короче MIN_GATED_SECONDS не гейтятся
+    tiny = compare_samples([0.001] * 5, [0.003] * 5, 0.1, 0.05)
+    assert (tiny["ratio"], tiny["status"]) == (3.0, "ok")
+
+
+def test_ties_and_zero_medians_do_not_produce_inf():
+    tie = compare_samples([0.5] * 5, [0.5] * 5, 0.1, 0.05)
+    assert (tie["ratio"], tie["p_value"], tie["status"]) == (1.0, 1.0, "ok")
+
+    zeros = compare_samples([0.0] * 5, [0.0] * 5, 0.1, 0.05)
+    assert (zeros["ratio"], zeros["status"]) == (1.0, "ok")
+
+    from_zero = compare_samples([0.0] * 5, [0.2, 0.21, 0.19, 0.2, 0.22], 0.1, 0.05)
+    assert (from_zero["ratio"], from_zero["status"]) == (None, "regression")
+    json.dumps(from_zero, allow_nan=False)
+    assert "xNone" in format_diff({"scenarios": {"s": {"stage/x_s": from_zero}}})
+
+
+def test_scenario_reports_new_and_missing_metrics():
+    diff = compare_scenario(
+        {"end_to_end_s": BASE, "stage/old_s": BASE},
+        {"end_to_end_s": BASE, "stage/new_s": BASE},
+        threshold=0.1,
+        alpha=0.05,
+    )
+    assert list(diff) == ["end_to_end_s", "stage/new_s", "stage/old_s"]
+    assert diff["end_to_end_s"]["status"] == "ok"
+    assert diff["stage/new_s"] == {"status": "new"}
+    assert diff["stage/old_s"] == {"status": "missing"}
+
+
+def test_too_few_repeats_are_rejected(tmp_path):
+    with pytest.raises(SystemExit):
+        compare.main(["compare", "--repeats", "3"])
+
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"scenarios": {"reading_order": {"m": [1.0, 1.0, 1.0]}}}))
+    with pytest.raises(compare.BenchmarkRunError, match="fewer than 4"):
+        compare.compare(["reading_order"], 5, baseline, 0.1, 0.05)
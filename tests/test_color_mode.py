@@ -0,0 +1,34 @@
+from PIL import Image
+from src.converters.pdf_to_page_images import apply_color_mode
+from src.recognizers.text_recognizer import TextRecognizer
+from src.utils.fragment_packing import pack_images
+from src.utils.image_saver import write_image
+from src.utils.image_store import FilesystemImageStore
+
+
+def make_page():
+    page = Image.new("RGB", (4, 1), "white")
+    for x, value in enumerate((0, 100, 200, 255)):
+        page.putpixel((x, 0), (value, value, value))
+    return page
+
+
+def test_gray_and_1bit_modes():
+    gray = apply_color_mode(make_page(), "gray")
+    bw = apply_color_mode(make_page(), "1bit", threshold=150)
+
+    assert gray.mode == "L"
+    assert gray.tobytes() == bytes([0, 100, 200, 255])
+    assert bw.mode == "1"
+    assert bw.convert("L").tobytes() == bytes([0, 0, 255, 255])
+
+
+def test_mode_is_kept_in_storage_and_expanded_by_recognizer(tmp_path):
+    store = FilesystemImageStore(tmp_path)
+    bw = apply_color_mode(make_page(), "1bit", threshold=150)
+    write_image(store, bw.crop((1, 0, 3, 1)), "doc/frag.png")
+
+    stored = store.read_image("doc/frag.png")
+    assert stored.mode == "1"
+    assert pack_images([stored, stored], "###").mode == "L"
+    assert TextRecognizer().prepare_image(stored).mode == "RGB"
@@ -0,0 +1,74 @@
+import json
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from src.database.models import Base
+from src.entities import ContentType, Document, Fragment, Page, RecognizedFragment
+from src.repository import (
+    documents as doc_repo,
+    fragments as fragment_repo,
+    pages as page_repo,
+    recognized_fragments as recognized_repo,
+)
+from src.workflows import export_text
+from src.workflows.export_text import export_documents
+
+FORMULA, TEXT = "pix2text-mfr-onnx", "text-qwen2-vl-ocr-2b-instruct"
+
+
+def add_document(session, filename, processed=True):
+    doc = doc_repo.create_document(session, Document(None, filename, "pdf"))
+    doc.is_success_processed = processed
+    doc_repo.update_document_status(session, doc)
+    return doc
+
+
+def add_fragment(session, page, order_number, results, content_type=ContentType.TEXT):
+    fragment = Fragment(
+        fragment_id=None,
+        page_id=page.page_id,
+        page_number=page.number,
+        content_type=content_type,
+        order_number=order_number,
+        left=10,
+        top=20 + order_number,
+        width=110,
+        height=60 + order_number,
+        text=None,
+    )
+    fragment_repo.create_fragment(session, fragment)
+    for recognizer, text in results:
+        recognized_repo.create_recognized_fragment(
+            session, RecognizedFragment(None, fragment.fragment_id, recognizer, text, None)
+        )
+    return fragment
+
+
+def test_export_streams_reading_order_with_recognizer_priority(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_text.settings, "EXPORT_BATCH_SIZE", 2)
+    engine = create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        doc = add_document(session, "doc")
+        add_document(session, "failed", processed=False)
+        page2 = page_repo.create_page(session, Page(None, doc.document_id, 2, 150, 1240, 1754))
+        page1 = page_repo.create_page(session, Page(None, doc.document_id, 1, 150, 1240, 1754))
+        add_fragment(session, page2, 0, [(TEXT, "вторая страница")])
+        add_fragment(session, page1, 1, [(TEXT, "x^2"), (FORMULA, "$x^2$")], ContentType.FORMULA)
+        add_fragment(session, page1, 0, [(TEXT, "заголовок"), ("other", "мусор")])
+        add_fragment(session, page1, 2, [(TEXT, None)], ContentType.PICTURE)
+        session.commit()
+
+        output = tmp_path / "out" / "documents.jsonl"
+        stats = export_documents(session, output, "jsonl")
+
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert [(r["page_number"], r["order_number"], r["text"]) for r in records] == [
+        (1, 0, "заголовок"),
+        (1, 1, "$x^2$"),
+        (2, 0, "вторая страница"),
+    ]
+    assert records[1]["recognizer"] == FORMULA
+    assert records[0]["bbox"] == [10, 20, 110, 60]
+    assert {r["document"] for r in records} == {"doc"}
+    assert (stats.documents, stats.fragments, stats.unrecognized) == (1, 3, 1)
+    assert list(output.parent.iterdir()) == [output]
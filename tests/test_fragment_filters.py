@@ -0,0 +1,69 @@
+import numpy as np
+from PIL import Image, ImageDraw
+from src.utils.fragment_filters import compute_pixel_stats, get_skip_reason
+
+
+def blank(width=120, height=40):
+    return Image.new("L", (width, height), 255)
+
+
+def test_blank_crop_is_uniform():
+    stats = compute_pixel_stats(blank())
+    assert (stats.ink_ratio, stats.components) == (0.0, 0)
+    assert get_skip_reason(blank()) == "uniform"
+
+
+def test_speckle_noise_is_skipped():
+    rng = np.random.default_rng(0)
+    pixels = np.full((40, 120), 255, dtype=np.uint8)
+    # Изолированные точки на нечетной сетке: каждая — отдельная компонента из одного пикселя
+    rows, cols = rng.integers(0, 20, 60) * 2, rng.integers(0, 60, 60) * 2
+    pixels[rows, cols] = 0
+    image = Image.fromarray(pixels)
+
+    stats = compute_pixel_stats(image)
+    assert stats.components > 10
+    assert stats.large_component_ink_ratio == 0.0
+    assert get_skip_reason(image) == "speckle_noise"
+
+
+def test_single_glyph_is_recognized():
+    # Номер страницы из одной цифры: одна связная компонента
+    image = blank(60, 40)
+    ImageDraw.Draw(image).rectangle((28, 8, 31, 31), fill=0)
+
+    stats = compute_pixel_stats(image)
+    assert stats.components == 1
+    assert stats.large_component_ink_ratio == 1.0
+    assert get_skip_reason(image) is None
+
+    # Та же "1" в плотном кропе: почти во всю высоту, но короткая для линейки
+    tight = blank(10, 26)
+    ImageDraw.Draw(tight).rectangle((3, 1, 6, 24), fill=0)
+    assert get_skip_reason(tight) is None
+
+
+def test_thin_rule_is_skipped():
+    image = blank(300, 40)
+    ImageDraw.Draw(image).rectangle((10, 19, 289, 20), fill=0)
+
+    stats = compute_pixel_stats(image)
+    assert stats.components == 1
+    assert (stats.line_length, stats.line_thickness) == (280, 2.0)
+    assert get_skip_reason(image) == "thin_rule"
+
+    # Вертикальная линейка слегка наклонена: толщина считается по площади, а не по bbox
+    vertical = blank(40, 300)
+    ImageDraw.Draw(vertical).line((18, 10, 22, 289), fill=0, width=2)
+    assert compute_pixel_stats(vertical).line_thickness <= 3
+    assert get_skip_reason(vertical) == "thin_rule"
+
+
+def test_text_line_is_recognized():
+    image = blank()
+    draw = ImageDraw.Draw(image)
+    for left in range(10, 110, 12):
+        draw.rectangle((left, 10, left + 6, 28), fill=0)
+
+    assert compute_pixel_stats(image).components == 9
+    assert get_skip_reason(image) is None
@@ -0,0 +1,62 @@
+import pytest
+from PIL import Image, ImageDraw
+from src.converters.pdf_to_page_images import PdfConversionError
+from src.entities import ContentType, Fragment, Page
+from src.utils import fragment_images
+from src.utils.fragment_images import PageImageCache, load_fragment_image, page_cache
+from src.utils.image_saver import save_fragment_image, save_page_image
+
+
+def make_fragment(fragment_id, left, top, right, bottom):
+    return Fragment(
+        fragment_id=fragment_id,
+        page_id=1,
+        page_number=1,
+        content_type=ContentType.TEXT,
+        order_number=fragment_id,
+        left=left,
+        top=top,
+        width=right,
+        height=bottom,
+        text=None,
+    )
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PageImageCache(maxsize=2)
+    for key in ("a", "b", "a", "c"):
+        cache.get(key, lambda: Image.new("L", (1, 1)))
+
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert list(cache._pages) == ["a", "c"]
+
+
+def test_virtual_crop_matches_stored_crop(tmp_path, monkeypatch):
+    page = Image.new("RGB", (300, 200), "white")
+    ImageDraw.Draw(page).rectangle((40, 30, 120, 90), fill="black")
+    fragments = [make_fragment(1, 20, 10, 140, 100), make_fragment(2, 150, 20, 290, 180)]
+
+    save_page_image(page, tmp_path, "doc", 1, 1)
+    for fragment in fragments:
+        save_fragment_image(page, tmp_path, "doc", 1, fragment)
+    stored = [load_fragment_image(tmp_path, "doc", f).tobytes() for f in fragments]
+
+    monkeypatch.setattr(fragment_images.settings, "FRAGMENT_IMAGE_MODE", "pages")
+    page_cache.clear()
+    misses = page_cache.misses
+    virtual = [load_fragment_image(tmp_path, "doc", f).tobytes() for f in fragments]
+
+    assert virtual == stored
+    assert page_cache.misses - misses == 1
+
+
+def test_pdf_mode_reports_missing_source(tmp_path, monkeypatch):
+    monkeypatch.setattr(fragment_images.settings, "FRAGMENT_IMAGE_MODE", "pdf")
+    page_cache.clear()
+    page = Page(page_id=1, document_id=1, number=1, dpi=150, width=300, height=200)
+    fragment = make_fragment(1, 20, 10, 140, 100)
+
+    with pytest.raises(ValueError):
+        load_fragment_image(tmp_path, "doc", fragment, page)
+    with pytest.raises(PdfConversionError, match="not found"):
+        load_fragment_image(tmp_path, "doc", fragment, page, tmp_path / "moved.pdf")
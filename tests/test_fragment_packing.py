@@ -0,0 +1,132 @@
+import pytest
+from PIL import Image, ImageDraw
+from src.entities import ContentType, Fragment
+from src.utils.fragment_packing import (
+    compute_tile_bounds,
+    find_line_gaps,
+    pack_images,
+    split_into_tiles,
+    split_packed_text,
+    stitch_texts,
+)
+from src.workflows.recognize_fragments import plan_recognition_batches
+
+
+def make_lines_image(lines: int, line_height: int = 20, gap: int = 10) -> Image.Image:
+    image = Image.new("L", (200, lines * (line_height + gap) + gap), 255)
+    draw = ImageDraw.Draw(image)
+    for index in range(lines):
+        top = gap + index * (line_height + gap)
+        draw.rectangle((10, top, 190, top + line_height - 1), fill=0)
+    return image
+
+
+def make_fragment(fragment_id: int, page_number: int, content_type: ContentType) -> Fragment:
+    return Fragment(
+        fragment_id=fragment_id,
+        page_id=1,
+        page_number=page_number,
+        content_type=content_type,
+        order_number=fragment_id,
+        left=0,
+        top=0,
+        width=100,
+        height=20,
+        text=None,
+    )
+
+
+def test_find_line_gaps_returns_gap_centers():
+    gaps = find_line_gaps(make_lines_image(3))
+    assert gaps == [5, 35, 65, 95]
+
+
+def test_tiles_cut_on_line_gaps_and_overlap():
+    image = make_lines_image(20)
+    gaps = find_line_gaps(image)
+    bounds = compute_tile_bounds(image.height, gaps, max_height=200, overlap=40)
+
+    assert bounds[0][0] == 0 and bounds[-1][1] == image.height
+    for (_, bottom), (next_top, _) in zip(bounds, bounds[1:]):
+        assert bottom in gaps
+        assert next_top in gaps
+        assert next_top < bottom
+    assert all(bottom - top <= 200 for top, bottom in bounds)
+
+
+def test_split_into_tiles_keeps_short_image():
+    image = make_lines_image(2)
+    assert split_into_tiles(image, max_height=500, overlap=40) == [image]
+
+
+def test_stitch_texts_removes_overlap():
+    first = "Первая строка текста\nВторая строка текста"
+    second = "Вторая строка текста\nТретья строка текста"
+    assert stitch_texts([first, second]) == (
+        "Первая строка текста\nВторая строка текста\nТретья строка текста"
+    )
+
+
+def test_stitch_texts_ignores_phrase_repeated_inside_tiles():
+    first = "В соответствии с приказом\nпервая часть документа\nобщая строка"
+    second = "общая строка\nвторая часть в соответствии с приказом\nконец"
+    assert stitch_texts([first, second]) == (
+        "В соответствии с приказом\nпервая часть документа\nобщая строка"
+        "\nвторая часть в соответствии с приказом\nконец"
+    )
+    # Повтор есть, но не на стыке: тексты не обрезаются
+    assert stitch_texts(
+        ["в соответствии с приказом\nитог", "шапка\nв соответствии с приказом"]
+    ) == ("в соответствии с приказом\nитог\nшапка\nв соответствии с приказом")
+
+
+def test_stitch_texts_tolerates_spacing_and_single_ocr_error():
+    first = "Первая строка текста\nВторая строка  текста о поставке товара"
+    second = "Вторая строка текста о пoставке товара\nТретья строка"
+    assert stitch_texts([first, second]) == (
+        "Первая строка текста\nВторая строка  текста о поставке товара\nТретья строка"
+    )
+
+
+def test_stitch_texts_without_overlap_joins_lines():
+    assert stitch_texts(["Начало", None, "Конец"]) == "Начало\nКонец"
+
+
+def test_pack_images_stacks_with_separators():
+    images = [Image.new("RGB", (50, 20), "black"), Image.new("RGB", (80, 30), "black")]
+    composite = pack_images(images, "###", separator_height=40, padding=10)
+    assert composite.size == (100, 20 + 30 + 40 + 20)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Подпись\n###\nСноска\n###\nКолонтитул", ["Подпись", "Сноска", "Колонтитул"]),
+        ("Подпись\n###\nСноска", None),
+    ],
+)
+def test_split_packed_text(text, expected):
+    assert split_packed_text(text, 3, "###") == expected
+
+
+def test_plan_recognition_batches_packs_neighbours_on_same_page():
+    small = Image.new("L", (100, 20), 255)
+    large = Image.new("L", (100, 400), 255)
+    items = [
+        (make_fragment(1, 1, ContentType.LIST_ITEM), small),
+        (make_fragment(2, 1, ContentType.LIST_ITEM), small),
+        (make_fragment(3, 1, ContentType.TEXT), large),
+        (make_fragment(4, 1, ContentType.PAGE_FOOTER), small),
+        (make_fragment(5, 2, ContentType.PAGE_HEADER), small),
+    ]
+
+    batches = list(plan_recognition_batches(items, allow_packing=True))
+
+    assert [[f.fragment_id for f, _ in batch] for batch in batches] == [[1, 2], [3], [4], [5]]
+
+
+def test_plan_recognition_batches_without_packing():
+    small = Image.new("L", (100, 20), 255)
+    items = [(make_fragment(i, 1, ContentType.LIST_ITEM), small) for i in range(3)]
+    batches = list(plan_recognition_batches(items, allow_packing=False))
+    assert len(batches) == 3
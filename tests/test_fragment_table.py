@@ -0,0 +1,69 @@
+import numpy as np
+from src.entities import ContentType
+from src.utils.coordinates import scale_coordinates_from_pt_to_px
+from src.utils.fragment_table import FragmentTable
+from src.utils.reading_order import get_default_order, get_xy_cut_order
+from src.workflows.process_pdf import build_fragment_table
+
+
+def make_raw(page_number, left, top, width, height, type_="Text"):
+    return {
+        "left": left,
+        "top": top,
+        "width": width,
+        "height": height,
+        "page_number": page_number,
+        "page_width": 595,
+        "page_height": 842,
+        "type": type_,
+        "text": None,
+    }
+
+
+def test_scale_matches_scalar_conversion_inside_page():
+    raw = [make_raw(1, 100.3, 200.7, 150.2, 40.1), make_raw(2, 60.0, 70.0, 300.0, 20.0)]
+    table = FragmentTable.from_raw(raw).scale_to_px(150)
+
+    for row, fragment in enumerate(raw):
+        expected = scale_coordinates_from_pt_to_px(
+            fragment["left"], fragment["top"], fragment["width"], fragment["height"], (0, 0), 150
+        )
+        assert table.boxes[row].tolist() == list(expected)
+
+
+def test_scale_clamps_boxes_to_page():
+    table = FragmentTable.from_raw([make_raw(1, 0.5, 1.0, 594.0, 841.0)]).scale_to_px(150)
+    left, top, right, bottom = table.boxes[0]
+    assert (left, top) == (1, 0)
+    assert (right, bottom) == tuple(table.page_sizes[0])
+
+
+def test_build_fragment_table_filters_and_orders_every_page():
+    raw = [
+        make_raw(1, 300, 100, 200, 300),
+        make_raw(2, 50, 400, 500, 100),
+        make_raw(1, 50, 100, 200, 300),
+        make_raw(1, 50, 50, 10, 5),
+        make_raw(1, 50, 20, 100, 12, "Page header"),
+        make_raw(2, 50, 100, 500, 100, "Unknown"),
+    ]
+
+    table = build_fragment_table(raw, 150, get_xy_cut_order)
+
+    assert len(table) == 4
+    groups = table.page_groups()
+    assert sorted(groups) == [1, 2]
+    page_one = table.to_fragments(groups[1])
+    assert [f.content_type for f in page_one] == [
+        ContentType.TEXT,
+        ContentType.TEXT,
+        ContentType.PAGE_HEADER,
+    ]
+    assert [f.order_number for f in page_one] == [2, 1, 0]
+    assert table.to_fragments(groups[2])[0].order_number == 0
+
+
+def test_list_strategies_are_supported():
+    raw = [make_raw(1, 300, 100, 200, 300), make_raw(1, 50, 100, 200, 300)]
+    table = build_fragment_table(raw, 150, get_default_order)
+    assert np.array_equal(table.order_numbers, [0, 1])
@@ -0,0 +1,138 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from src.database.fulltext import FTS_TABLE, ensure_fulltext_index
+from src.database.models import Base
+from src.entities import ContentType, Document, Fragment, Page, RecognizedFragment
+from src.repository import (
+    documents as doc_repo,
+    fragments as fragment_repo,
+    pages as page_repo,
+    recognized_fragments as recognized_repo,
+)
+from src.repository.fulltext import (
+    FullTextSearchUnavailableError,
+    build_match_query,
+    search_fragments,
+)
+
+TEXT = "text-qwen2-vl-ocr-2b-instruct"
+
+
+def add_text(session, page, order_number, recognized_text):
+    fragment = Fragment(
+        fragment_id=None,
+        page_id=page.page_id,
+        page_number=page.number,
+        content_type=ContentType.TEXT,
+        order_number=order_number,
+        left=10,
+        top=20,
+        width=110,
+        height=60,
+        text=None,
+    )
+    fragment_repo.create_fragment(session, fragment)
+    return recognized_repo.create_recognized_fragment(
+        session, RecognizedFragment(None, fragment.fragment_id, TEXT, recognized_text, None)
+    )
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def corpus(engine):
+    with Session(engine) as session:
+        documents = {}
+        for filename in ("orders", "other"):
+            doc = doc_repo.create_document(session, Document(None, filename, "pdf"))
+            documents[filename] = page_repo.create_page(
+                session, Page(None, doc.document_id, 3, 150, 1240, 1754)
+            )
+        added = {
+            "order": add_text(session, documents["orders"], 0, "Текст ПРИКАЗА о новой Ёлке"),
+            "noise": add_text(session, documents["orders"], 1, "Пояснительная записка"),
+            "other": add_text(session, documents["other"], 0, "Копия приказа"),
+            "empty": add_text(session, documents["other"], 1, None),
+        }
+        session.commit()
+    return added
+
+
+def test_build_match_query_quotes_words_and_folds_yo():
+    assert build_match_query('Ёлка "OR" x*') == '"Елка"* "OR"* "x"*'
+    assert build_match_query("приказ", prefix=False) == '"приказ"'
+    with pytest.raises(ValueError):
+        build_match_query(" - ")
+
+
+def test_search_returns_location_and_snippet(engine, corpus):
+    with Session(engine) as session:
+        hits = search_fragments(session, "приказ ёлк")
+
+    assert len(hits) == 1
+    hit = hits[0]
+    assert (hit.document, hit.page_number, hit.bbox) == ("orders", 3, (10, 20, 110, 60))
+    assert hit.recognizer == TEXT
+    assert hit.snippet == "Текст [ПРИКАЗА] о новой [Ёлке]"
+
+
+def test_search_is_case_insensitive_prefix_and_filterable(engine, corpus):
+    with Session(engine) as session:
+        assert {h.document for h in search_fragments(session, "ПРИКАЗ")} == {"orders", "other"}
+        assert search_fragments(session, "приказ", prefix=False) == []
+        assert [h.document for h in search_fragments(session, "приказ", filenames=["other"])] == [
+            "other"
+        ]
+        assert len(search_fragments(session, "приказ", limit=1)) == 1
+
+
+def test_index_follows_updates_and_deletes(engine, corpus):
+    with Session(engine) as session:
+        recognized_repo.update_recognized_fragment(session, corpus["noise"], "Служебная записка")
+        recognized_repo.update_recognized_fragment(session, corpus["empty"], "Новая елка")
+        session.commit()
+        assert search_fragments(session, "пояснительная") == []
+        assert [h.fragment_id for h in search_fragments(session, "служебная")] == [
+            corpus["noise"].fragment_id
+        ]
+        assert {h.document for h in search_fragments(session, "елк")} == {"orders", "other"}
+
+        other = doc_repo.get_document_by_filename(session, "other")
+        doc_repo.delete_document_tree(session, other.document_id)
+        session.commit()
+        assert {h.document for h in search_fragments(session, "елк")} == {"orders"}
+        # Без rank=1: индекс хранит свернутое "ё", сверка с исходным текстом не сойдется
+        session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('integrity-check')"))
+
+
+def test_existing_database_is_indexed_once(engine, corpus):
+    with engine.begin() as connection:
+        for trigger in ("ai", "ad", "au"):
+            connection.exec_driver_sql(f"DROP TRIGGER {FTS_TABLE}_{trigger}")
+        connection.exec_driver_sql(f"DROP TABLE {FTS_TABLE}")
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        assert ensure_fulltext_index(connection)
+
+    with Session(engine) as session:
+        assert len(search_fragments(session, "приказ")) == 2
+        assert len(search_fragments(session, "елке")) == 1
+
+
+def test_search_without_fts5_raises_clear_error(engine, corpus):
+    # Как в SQLite без FTS5: ensure_fulltext_index вернул False, таблицы индекса нет
+    with engine.begin() as connection:
+        for trigger in ("ai", "ad", "au"):
+            connection.exec_driver_sql(f"DROP TRIGGER {FTS_TABLE}_{trigger}")
+        connection.exec_driver_sql(f"DROP TABLE {FTS_TABLE}")
+
+    with Session(engine) as session:
+        with pytest.raises(FullTextSearchUnavailableError, match="unavailable"):
+            search_fragments(session, "приказ")
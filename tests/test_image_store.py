@@ -0,0 +1,69 @@
+import pytest
+from src.utils import image_store
+from PIL import Image
+from src.utils.image_store import ImageNotFoundError, PackImageStore
+from src.utils.image_writer import ImageWriter
+
+
+def test_pack_store_round_trip_overwrite_and_delete(tmp_path):
+    store = PackImageStore(tmp_path)
+    store.write_bytes("doc/a.png", b"first")
+    store.write_bytes("doc/b.png", b"second")
+    assert store.read_bytes("doc/a.png") == b"first"
+
+    # перезапись дописывает новую версию, pack растет, mmap переоткрывается
+    store.write_bytes("doc/a.png", b"first, v2")
+    assert store.read_bytes("doc/a.png") == b"first, v2"
+    assert store.read_bytes("doc/b.png") == b"second"
+    assert list((tmp_path / "packs").glob("*.pack")) == [tmp_path / "packs" / "doc.pack"]
+
+    store.delete_document("doc")
+    assert not store.exists("doc/a.png")
+    with pytest.raises(ImageNotFoundError):
+        store.read_bytes("doc/b.png")
+    store.close()
+
+
+def test_pack_store_concurrent_image_writes(tmp_path):
+    store = PackImageStore(tmp_path)
+    images = {f"doc/frag_{i}.png": Image.new("L", (10 + i, 10), i * 10) for i in range(20)}
+
+    with ImageWriter(lambda image, key: store.write_image(key, image, "PNG"), 4, 8) as writer:
+        for key, image in images.items():
+            writer.submit(image, key)
+        assert writer.flush() == []
+
+    reopened = PackImageStore(tmp_path)
+    for key, image in images.items():
+        assert reopened.read_image(key).tobytes() == image.tobytes()
+
+
+def test_pack_store_bounds_open_maps(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_store.settings, "IMAGE_PACK_MAX_OPEN_MAPS", 2)
+    store = PackImageStore(tmp_path)
+    for document in ("a", "b", "c"):
+        store.write_bytes(f"{document}/x.png", document.encode())
+    for document in ("a", "b", "a", "c"):
+        assert store.read_bytes(f"{document}/x.png") == document.encode()
+
+    # "b" прочитан раньше всех: его отображение закрыто
+    assert list(store._maps) == ["a", "c"]
+    assert store.read_bytes("b/x.png") == b"b"
+    store.close()
+
+
+def test_pack_store_compact_drops_stale_versions(tmp_path):
+    store = PackImageStore(tmp_path)
+    store.write_bytes("doc/a.png", b"first")
+    store.write_bytes("doc/b.png", b"second")
+    store.write_bytes("doc/a.png", b"first, v2")
+    store.write_bytes("other/c.png", b"third")
+    assert store.read_bytes("doc/b.png") == b"second"
+
+    assert store.compact() == {"doc": len(b"first")}
+    assert (tmp_path / "packs" / "doc.pack").stat().st_size == len(b"secondfirst, v2")
+    assert store.read_bytes("doc/a.png") == b"first, v2"
+    assert store.read_bytes("doc/b.png") == b"second"
+    assert store.compact() == {}
+    assert PackImageStore(tmp_path).read_bytes("other/c.png") == b"third"
+    store.close()
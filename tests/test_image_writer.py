@@ -0,0 +1,26 @@
+from PIL import Image
+from src.utils.image_saver import get_save_options, write_image
+from src.utils.image_store import FilesystemImageStore
+from src.utils.image_writer import ImageWriter
+
+
+def test_writer_flushes_all_images_and_reports_errors(tmp_path):
+    (tmp_path / "not_a_dir").write_text("file")
+    store = FilesystemImageStore(tmp_path)
+    image = Image.new("L", (40, 20), 255)
+
+    with ImageWriter(lambda img, key: write_image(store, img, key), 2, 2) as writer:
+        keys = [f"doc/frag_{i}.png" for i in range(10)]
+        for key in keys:
+            writer.submit(image, key)
+        writer.submit(image, "not_a_dir/frag.png")
+        errors = writer.flush()
+
+    assert all(store.exists(key) for key in keys)
+    assert [key for key, _ in errors] == ["not_a_dir/frag.png"]
+    assert store.read_image(keys[0]).size == (40, 20)
+
+
+def test_png_has_no_quality_option():
+    assert "quality" not in get_save_options("PNG")
+    assert get_save_options("webp")["lossless"] is True
@@ -0,0 +1,86 @@
+import json
+import logging
+import multiprocessing
+import queue
+from logging.handlers import QueueListener
+from src.config import (
+    ContextLoggerAdapter,
+    DebugSampler,
+    InProcessQueueHandler,
+    JsonFormatter,
+    config_provider,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(JsonFormatter())
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def test_queue_handler_keeps_message_and_extra():
+    handler = ListHandler()
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler)
+    logger = logging.getLogger("tests.queue")
+    logger.propagate = False
+    logger.addHandler(InProcessQueueHandler(log_queue))
+    listener.start()
+    try:
+        logger.warning("page %s", 3, extra={"document": "doc", "huge": 2**70, "ids": {1: "a"}})
+    finally:
+        listener.stop()
+        logger.handlers.clear()
+
+    record = json.loads(handler.lines[0])
+    assert record["message"] == "page 3"
+    assert record["extra"] == {"document": "doc", "huge": 2**70, "ids": {"1": "a"}}
+
+
+def test_debug_sampler_limits_rate_and_counts_suppressed(monkeypatch):
+    handler = ListHandler()
+    logger = logging.getLogger("tests.sampler")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    clock = [100.0]
+    monkeypatch.setattr("src.config.time.monotonic", lambda: clock[0])
+    try:
+        sampler = DebugSampler(ContextLoggerAdapter(logger, {}), rate_per_s=2)
+        for _ in range(5):
+            sampler.debug({"msg": "Fragment skipped"})
+        clock[0] += 1
+        sampler.debug({"msg": "Fragment skipped"}, extra={"fragment_id": 1})
+    finally:
+        logger.handlers.clear()
+
+    records = [json.loads(line) for line in handler.lines]
+    assert len(records) == 3
+    assert records[-1]["extra"] == {"fragment_id": 1, "suppressed": 3}
+
+
+def _log_from_child():
+    config_provider.get_logger("tests.child").info("from child")
+
+
+def test_forked_worker_flushes_its_log_queue(tmp_path):
+    if config_provider.log_listener is None:
+        return
+    log_file = tmp_path / "child.log"
+    handler = logging.FileHandler(log_file, encoding="utf-8")
+    handler.setFormatter(JsonFormatter())
+    config_provider.log_handlers.append(handler)
+    try:
+        process = multiprocessing.get_context("fork").Process(target=_log_from_child)
+        process.start()
+        process.join(10)
+    finally:
+        config_provider.log_handlers.remove(handler)
+        handler.close()
+
+    assert process.exitcode == 0
+    assert json.loads(log_file.read_text(encoding="utf-8"))["message"] == "from child"
@@ -0,0 +1,151 @@
+import os
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from src.database.models import Base
+from src.entities import Document, Page
+from src.repository import documents as doc_repo, pages as page_repo
+from src.workflows.manifest import (
+    InputStatus,
+    find_source_file,
+    plan_ingestion,
+    record_ingested,
+)
+
+
+def make_session() -> Session:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return Session(engine)
+
+
+def ingest(session, paths, output_dir):
+    """Имитация обработки: создает документ для каждого файла к обработке."""
+    plan = plan_ingestion(session, paths, output_dir)
+    documents = {}
+    for path in plan.to_process:
+        document = doc_repo.create_document(
+            session, Document(None, path.stem, "pdf", is_success_processed=True)
+        )
+        page_repo.create_page(session, Page(None, document.document_id, 1, 150, 10, 10))
+        documents[path] = document
+    record_ingested(session, plan, documents)
+    return {entry.pdf_path.name: entry for entry in plan.entries}
+
+
+def test_unchanged_renamed_and_changed_inputs(tmp_path):
+    a, b = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    a.write_bytes(b"%PDF-1 first")
+    b.write_bytes(b"%PDF-1 first")
+
+    with make_session() as session:
+        first = ingest(session, [a, b], tmp_path)
+        assert first["a.pdf"].status is InputStatus.NEW
+        assert first["b.pdf"].status is InputStatus.DUPLICATE
+        assert first["b.pdf"].input_file.document_id == first["a.pdf"].input_file.document_id
+
+        c = tmp_path / "c.pdf"
+        a.rename(c)
+        second = ingest(session, [b, c], tmp_path)
+        assert second["b.pdf"].status is InputStatus.UNCHANGED
+        assert second["c.pdf"].status is InputStatus.DUPLICATE
+
+        b.write_bytes(b"%PDF-1 second version")
+        os.utime(b, (1, 1))
+        third = ingest(session, [b], tmp_path)
+        assert third["b.pdf"].status is InputStatus.CHANGED
+        # b.pdf ссылался на документ a.pdf как дубликат: общий документ не удаляется
+        assert doc_repo.get_document_by_id(session, first["a.pdf"].input_file.document_id)
+
+
+def test_changed_content_resets_document(tmp_path):
+    a = tmp_path / "a.pdf"
+    a.write_bytes(b"%PDF-1 first")
+    with make_session() as session:
+        ingest(session, [a], tmp_path)
+        (tmp_path / "a").mkdir()
+
+        a.write_bytes(b"%PDF-1 changed")
+        os.utime(a, (2, 2))
+        entry = ingest(session, [a], tmp_path)["a.pdf"]
+
+        assert entry.status is InputStatus.CHANGED
+        assert not (tmp_path / "a").exists()
+        # старые страницы удалены, документ создан заново с одной страницей
+        document = doc_repo.get_document_by_filename(session, "a")
+        assert len(page_repo.get_pages_by_document_id(session, document.document_id)) == 1
+
+
+def test_touched_file_is_rehashed_but_not_reprocessed(tmp_path):
+    a = tmp_path / "a.pdf"
+    a.write_bytes(b"%PDF-1 first")
+    with make_session() as session:
+        ingest(session, [a], tmp_path)
+        os.utime(a, (3, 3))
+        assert ingest(session, [a], tmp_path)["a.pdf"].status is InputStatus.UNCHANGED
+
+
+def test_changed_original_releases_its_duplicates(tmp_path):
+    a, b = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    a.write_bytes(b"%PDF-1 first")
+    b.write_bytes(b"%PDF-1 first")
+    with make_session() as session:
+        ingest(session, [a, b], tmp_path)
+
+        a.write_bytes(b"%PDF-1 changed")
+        os.utime(a, (4, 4))
+        second = ingest(session, [a, b], tmp_path)
+        assert second["a.pdf"].status is InputStatus.CHANGED
+        # b.pdf ссылался на удаленный документ "a": его содержимое обрабатывается заново
+        assert second["b.pdf"].status is InputStatus.NEW
+        documents = {
+            name: doc_repo.get_document_by_id(session, entry.input_file.document_id)
+            for name, entry in second.items()
+        }
+        assert {name: doc.filename for name, doc in documents.items()} == {
+            "a.pdf": "a",
+            "b.pdf": "b",
+        }
+
+        third = ingest(session, [a, b], tmp_path)
+        assert {entry.status for entry in third.values()} == {InputStatus.UNCHANGED}
+
+
+def test_changed_original_after_its_duplicate_in_batch(tmp_path):
+    a, b = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    b.write_bytes(b"%PDF-1 first")
+    with make_session() as session:
+        ingest(session, [b], tmp_path)
+        a.write_bytes(b"%PDF-1 first")
+        assert ingest(session, [a, b], tmp_path)["a.pdf"].status is InputStatus.DUPLICATE
+
+        b.write_bytes(b"%PDF-1 changed")
+        os.utime(b, (4, 4))
+        plan = plan_ingestion(session, [a, b], tmp_path)
+        statuses = {entry.pdf_path.name: entry.status for entry in plan.entries}
+        assert statuses == {"a.pdf": InputStatus.NEW, "b.pdf": InputStatus.CHANGED}
+        # Документ "b" удален: ни один файл плана на него не ссылается
+        assert plan.document_ids == []
+        assert plan.unlinked == [a, b]
+
+
+def test_find_source_file_follows_manifest_and_extension(tmp_path):
+    a, b = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    a.write_bytes(b"%PDF-1 first")
+    b.write_bytes(b"%PDF-1 first")
+    with make_session() as session:
+        ingest(session, [a, b], tmp_path)
+        document = doc_repo.get_document_by_filename(session, "a")
+        assert find_source_file(session, document, tmp_path) == a
+
+        # Исходник удален: берется дубликат с тем же содержимым
+        a.unlink()
+        assert find_source_file(session, document, tmp_path) == b
+
+        b.unlink()
+        with pytest.raises(FileNotFoundError, match="a.pdf"):
+            find_source_file(session, document, tmp_path)
+
+        scan = doc_repo.create_document(session, Document(None, "scan", "PDF"))
+        (tmp_path / "scan.PDF").write_bytes(b"%PDF-1 scan")
+        assert find_source_file(session, scan, tmp_path) == tmp_path / "scan.PDF"
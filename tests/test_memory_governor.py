@@ -0,0 +1,83 @@
+import threading
+import pytest
+from src.utils.memory_governor import AcquireCancelled, MemoryGovernor
+
+
+def make_governor(rss=None, budget=100):
+    readings = {"rss": rss}
+    governor = MemoryGovernor(
+        budget,
+        high_watermark=0.8,
+        low_watermark=0.5,
+        ramp_interval_s=0.0,
+        rss_reader=lambda: readings["rss"],
+    )
+    return governor, readings
+
+
+def test_limits_halve_under_pressure_and_ramp_up_with_headroom():
+    governor, readings = make_governor(rss=90)
+    governor.register("pages", 8)
+
+    governor.acquire(0, "pages").release()
+    assert governor.limit("pages") == 4
+    governor.acquire(0, "pages").release()
+    assert governor.limit("pages") == 2
+
+    readings["rss"] = 60
+    governor.acquire(0, "pages").release()
+    assert governor.limit("pages") == 2
+
+    readings["rss"] = 10
+    for expected in (3, 4):
+        governor.acquire(0, "pages").release()
+        assert governor.limit("pages") == expected
+
+
+def test_acquire_waits_for_in_flight_bytes_to_be_released():
+    governor, _ = make_governor(rss=None)
+    first = governor.acquire(60)
+    admitted = threading.Event()
+
+    def second():
+        with governor.acquire(60):
+            admitted.set()
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    assert not admitted.wait(0.2)
+    first.release()
+    assert admitted.wait(2)
+    thread.join()
+    assert governor.in_flight_bytes() == 0
+
+
+def test_oversized_item_is_admitted_when_nothing_is_in_flight():
+    governor, _ = make_governor(rss=None)
+    lease = governor.acquire(500)
+    lease.resize(300)
+    assert governor.in_flight_bytes() == 300
+    lease.release()
+    lease.release()
+    assert governor.in_flight_bytes() == 0
+
+
+def test_waiting_for_a_slot_can_be_cancelled():
+    governor, _ = make_governor(rss=None)
+    governor.register("pages", 1)
+    held = governor.acquire(10, "pages")
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(AcquireCancelled):
+        governor.acquire(10, "pages", cancel=cancel)
+    held.release()
+
+
+def test_disabled_governor_never_blocks():
+    governor, _ = make_governor(rss=10**12, budget=None)
+    governor.register("pages", 1)
+    leases = [governor.acquire(10**9, "pages") for _ in range(3)]
+    assert governor.limit("pages") is None
+    assert governor.in_flight_bytes() == 0
+    for lease in leases:
+        lease.release()
@@ -0,0 +1,46 @@
+import urllib.request
+from src.metrics import MetricsRegistry
+from src.utils.metrics_exporter import start_http_server, write_textfile
+
+
+def make_registry():
+    registry = MetricsRegistry(namespace="test")
+    pages = registry.counter("pages_total", "Pages")
+    latency = registry.histogram("latency_seconds", "Latency", ["stage"], buckets=(0.1, 1.0))
+    pages.inc()
+    pages.inc(2)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, stage="commit")
+    return registry
+
+
+def test_prometheus_text_format():
+    registry = make_registry()
+    assert registry.counter("pages_total", "Pages") is registry.counter("pages_total", "Pages")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE test_pages_total counter" in lines
+    assert "test_pages_total 3" in lines
+    assert 'test_latency_seconds_bucket{stage="commit",le="0.1"} 2' in lines
+    assert 'test_latency_seconds_bucket{stage="commit",le="1"} 3' in lines
+    assert 'test_latency_seconds_bucket{stage="commit",le="+Inf"} 4' in lines
+    assert 'test_latency_seconds_count{stage="commit"} 4' in lines
+
+    registry.reset()
+    assert "test_pages_total 3" not in registry.render()
+
+
+def test_http_and_textfile_exporters(tmp_path):
+    registry = make_registry()
+    server = start_http_server(registry, "127.0.0.1", 0)
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.read().decode() == registry.render()
+    finally:
+        server.shutdown()
+
+    path = tmp_path / "textfile" / "test.prom"
+    write_textfile(registry, path)
+    assert path.read_text() == registry.render()
+    assert [p.name for p in path.parent.iterdir()] == ["test.prom"]
@@ -0,0 +1,43 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from src.database.migrations import add_missing_columns
+from src.database.models import Base
+from src.entities import RecognizedFragment
+from src.repository import recognized_fragments as recognized_repo
+
+# recognized_fragment до появления skip_reason
+BASELINE_RECOGNIZED_FRAGMENT = """
+CREATE TABLE recognized_fragment (
+    recognized_fragment_id INTEGER NOT NULL,
+    fragment_id INTEGER NOT NULL,
+    recognizer VARCHAR NOT NULL,
+    text VARCHAR,
+    confidence FLOAT,
+    recognized_at DATETIME NOT NULL,
+    PRIMARY KEY (recognized_fragment_id),
+    FOREIGN KEY(fragment_id) REFERENCES fragment (fragment_id)
+)
+"""
+
+
+def test_create_all_upgrades_baseline_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql(BASELINE_RECOGNIZED_FRAGMENT)
+        connection.exec_driver_sql(
+            "INSERT INTO recognized_fragment VALUES (1, 7, 'text', 'старый', NULL, '2024-01-01')"
+        )
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        assert add_missing_columns(connection) == []
+
+    with Session(engine) as session:
+        recognized_repo.create_recognized_fragment(
+            session, RecognizedFragment(None, 8, "text", None, None, skip_reason="blank")
+        )
+        session.commit()
+        rows = session.execute(
+            Base.metadata.tables["recognized_fragment"].select().order_by("recognized_fragment_id")
+        ).all()
+    assert [(row.text, row.skip_reason) for row in rows] == [("старый", None), (None, "blank")]
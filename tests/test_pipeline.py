@@ -0,0 +1,62 @@
+import threading
+import time
+import pytest
+from src.workflows.pipeline import Pipeline, PipelineError, Stage
+
+
+def test_items_flow_through_all_stages():
+    pipeline = Pipeline(
+        [
+            Stage("split", lambda n: range(n), workers=2, queue_size=2),
+            Stage("square", lambda n: [n * n], workers=3, queue_size=2),
+            Stage("collect", lambda n: [n], workers=1, queue_size=2),
+        ]
+    )
+    results = pipeline.run([3, 4])
+    assert sorted(results) == [0, 0, 1, 1, 4, 4, 9]
+
+    stats = pipeline.stats()
+    assert stats["split"]["processed"] == 2
+    assert stats["split"]["emitted"] == 7
+    assert stats["square"]["processed"] == 7
+    assert all(s["queue_depth"] == 0 for s in stats.values())
+
+
+def test_bounded_queue_caps_items_in_flight():
+    in_flight = []
+    active = 0
+    lock = threading.Lock()
+
+    def produce(n):
+        nonlocal active
+        with lock:
+            active += 1
+            in_flight.append(active)
+        yield n
+
+    def consume(n):
+        nonlocal active
+        time.sleep(0.005)
+        with lock:
+            active -= 1
+
+    pipeline = Pipeline(
+        [Stage("produce", produce, queue_size=1), Stage("consume", consume, queue_size=2)]
+    )
+    pipeline.run(range(20))
+    # очередь consume (2) + элемент в обработке + элемент, ожидающий put
+    assert max(in_flight) <= 4
+    assert pipeline.stats()["consume"]["max_queue_depth"] <= 2
+
+
+def test_stage_error_stops_pipeline():
+    def fail_on_three(n):
+        if n == 3:
+            raise ValueError("bad page")
+        return [n]
+
+    pipeline = Pipeline([Stage("check", fail_on_three, workers=2), Stage("sink", lambda n: None)])
+    with pytest.raises(PipelineError) as error:
+        pipeline.run(range(100))
+    assert error.value.stage == "check"
+    assert pipeline.stats()["check"]["failed"] == 1
@@ -0,0 +1,121 @@
+import logging
+import os
+import time
+from pathlib import Path
+from PIL import Image
+from sqlalchemy.orm import Session
+from src.converters.pdf_to_page_images import PageConversionResult, PdfConversionError
+from src.database.engine import create_db_engine
+from src.database.models import Base
+from src.entities import Document
+from src.repository import documents as doc_repo
+from src.utils.image_writer import ImageWriter
+from src.utils.reading_order import get_default_order
+from src.workflows import process_pdf
+
+logger = logging.LoggerAdapter(logging.getLogger("test"), {})
+PAGE_COUNTS = {"small.pdf": 2, "large.pdf": 40, "medium.pdf": 10, "crash.pdf": 5}
+
+
+def fake_page_count(pdf_path: Path) -> int:
+    if pdf_path.name not in PAGE_COUNTS:
+        raise PdfConversionError(f"Failed to get page count for {pdf_path}")
+    return PAGE_COUNTS[pdf_path.name]
+
+
+def fake_worker(pdf_path, output_dir, dpi, order_strategy):
+    if pdf_path.name == "crash.pdf":
+        os._exit(1)
+    if pdf_path.name == "hang.pdf":
+        time.sleep(600)
+    return Document(document_id=PAGE_COUNTS[pdf_path.name], filename=pdf_path.stem, extension="pdf")
+
+
+def test_schedule_largest_first(monkeypatch):
+    monkeypatch.setattr(process_pdf, "get_pdf_page_count", fake_page_count)
+    files = [Path(name) for name in ("small.pdf", "broken.pdf", "large.pdf", "medium.pdf")]
+
+    jobs, failures = process_pdf.schedule_largest_first(files)
+
+    assert [path.name for path, _ in jobs] == ["large.pdf", "medium.pdf", "small.pdf"]
+    assert [(f.pdf_path.name, f.page_count) for f in failures] == [("broken.pdf", 0)]
+
+
+def test_crashing_worker_does_not_lose_other_documents(monkeypatch, tmp_path):
+    monkeypatch.setattr(process_pdf, "get_pdf_page_count", fake_page_count)
+    monkeypatch.setattr(process_pdf, "_process_pdf_in_worker", fake_worker)
+    files = [Path(name) for name in PAGE_COUNTS] + [Path("broken.pdf")]
+
+    results = process_pdf.process_bulk_pdf_parallel(
+        files, tmp_path, 150, logger, None, workers=2, database_uri="sqlite://"
+    )
+
+    by_name = {result.pdf_path.name: result for result in results}
+    assert len(results) == len(files)
+    assert by_name["crash.pdf"].error == "Worker process crashed"
+    assert by_name["broken.pdf"].error.startswith("Failed to get page count")
+    for name in ("small.pdf", "large.pdf", "medium.pdf"):
+        assert by_name[name].document.document_id == PAGE_COUNTS[name]
+        assert by_name[name].error is None
+
+
+def test_hung_document_times_out_and_pool_is_recycled(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        process_pdf,
+        "get_pdf_page_count",
+        lambda path: 1 if path.name == "hang.pdf" else fake_page_count(path),
+    )
+    monkeypatch.setattr(process_pdf, "_process_pdf_in_worker", fake_worker)
+    monkeypatch.setattr(process_pdf.settings, "PDF_DOCUMENT_TIMEOUT_BASE_S", 1.0)
+    monkeypatch.setattr(process_pdf.settings, "PDF_DOCUMENT_TIMEOUT_PER_PAGE_S", 0.01)
+    files = [Path(name) for name in ("hang.pdf", "small.pdf", "medium.pdf", "large.pdf")]
+
+    started = time.monotonic()
+    results = process_pdf.process_bulk_pdf_parallel(
+        files, tmp_path, 150, logger, None, workers=2, database_uri="sqlite://"
+    )
+
+    assert time.monotonic() - started < 30
+    by_name = {result.pdf_path.name: result for result in results}
+    assert len(results) == len(files)
+    assert by_name["hang.pdf"].error.startswith("Timed out after")
+    for name in ("small.pdf", "large.pdf", "medium.pdf"):
+        assert by_name[name].document.document_id == PAGE_COUNTS[name]
+
+
+def test_failed_image_write_fails_the_document(monkeypatch, tmp_path):
+    def failing_save(image, key):
+        raise OSError("disk full")
+
+    raw = {
+        "left": 10.0,
+        "top": 10.0,
+        "width": 200.0,
+        "height": 40.0,
+        "page_number": 1,
+        "page_width": 595,
+        "page_height": 842,
+        "type": "Text",
+        "text": None,
+    }
+    monkeypatch.setattr(process_pdf, "analyze_pdf", lambda path: [raw])
+    monkeypatch.setattr(process_pdf, "get_pdf_page_count", lambda path: 1)
+    monkeypatch.setattr(
+        process_pdf,
+        "convert_pdf_page",
+        lambda path, number, dpi: PageConversionResult(number, Image.new("L", (620, 877)), None),
+    )
+    monkeypatch.setattr(
+        process_pdf, "create_image_writer", lambda output_dir: ImageWriter(failing_save, 1, 2)
+    )
+    # Файловая база: запись в БД идет в потоке стадии persist
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        processor = process_pdf.PdfProcessor(
+            tmp_path / "doc.pdf", tmp_path, 75, session, logger, get_default_order
+        )
+        assert processor.process() is None
+        # Страницы откатываются, документ не помечен успешным и будет обработан заново
+        assert doc_repo.get_document_by_filename(session, "doc") is None
@@ -0,0 +1,97 @@
+import pstats
+import threading
+import time
+from src.utils import profiling
+from src.utils.profiling import profile_document
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(100))
+
+
+def configure(monkeypatch, tmp_path, **overrides):
+    values = {
+        "PROFILE_DIR": tmp_path,
+        "PROFILE_DOCUMENTS": (),
+        "PROFILE_SAMPLE_RATE": 0.0,
+        "PROFILE_SLOW_THRESHOLD_S": None,
+        "PROFILE_SAMPLING_INTERVAL_S": 0.001,
+        "PROFILE_TRACEMALLOC": False,
+        **overrides,
+    }
+    for name, value in values.items():
+        monkeypatch.setattr(profiling.settings, name, value)
+
+
+def test_cprofile_covers_worker_threads(monkeypatch, tmp_path):
+    configure(
+        monkeypatch,
+        tmp_path,
+        PROFILE_MODE="cprofile",
+        PROFILE_DOCUMENTS=("doc",),
+        PROFILE_TRACEMALLOC=True,
+    )
+    with profile_document("pdf", "doc") as profile:
+        worker = threading.Thread(target=busy_loop, args=(0.05,))
+        worker.start()
+        worker.join()
+        profile.document_id = 7
+
+    names = sorted(path.name.split("_", 3)[-1].split(".", 1)[-1] for path in tmp_path.iterdir())
+    assert names == ["alloc.txt", "prof", "prof.txt"]
+    prof = next(tmp_path.glob("pdf_doc7_doc_*.prof"))
+    functions = {name for _, _, name in pstats.Stats(str(prof)).stats}
+    assert "busy_loop" in functions
+    assert "peak traced memory" in next(tmp_path.glob("*.alloc.txt")).read_text()
+
+
+def test_overlapping_documents_fall_back_to_sampling(monkeypatch, tmp_path):
+    configure(monkeypatch, tmp_path, PROFILE_MODE="cprofile", PROFILE_DOCUMENTS=("a", "b", "c"))
+    with profile_document("pdf", "a", document_id=1) as first:
+        with profile_document("pdf", "b", document_id=2) as second:
+            busy_loop(0.02)
+        assert (first.mode, second.mode) == ("cprofile", "sampling")
+    with profile_document("pdf", "c", document_id=3) as third:
+        assert third.mode == "cprofile"
+
+    suffixes = {path.name.split("_", 2)[1]: path.suffix for path in tmp_path.glob("*.*")}
+    assert suffixes["doc2"] == ".folded"
+    assert sorted(path.name.split("_")[1] for path in tmp_path.glob("*.prof")) == [
+        "doc1",
+        "doc3",
+    ]
+
+
+def test_sampling_profiler_writes_collapsed_stacks(monkeypatch, tmp_path):
+    configure(monkeypatch, tmp_path, PROFILE_MODE="sampling", PROFILE_SAMPLE_RATE=1.0)
+    with profile_document("recognize", "doc", document_id=3):
+        busy_loop(0.05)
+
+    folded = next(tmp_path.glob("recognize_doc3_doc_*.folded")).read_text()
+    samples = dict(line.rsplit(" ", 1) for line in folded.splitlines())
+    busy = [stack for stack in samples if stack.endswith(":busy_loop")]
+    assert busy and all(stack.startswith("MainThread;") for stack in busy)
+    assert all(int(count) > 0 for count in samples.values())
+
+
+def test_threshold_keeps_only_slow_documents(monkeypatch, tmp_path):
+    configure(monkeypatch, tmp_path, PROFILE_MODE="sampling", PROFILE_SLOW_THRESHOLD_S=0.03)
+    with profile_document("pdf", "fast"):
+        pass
+    with profile_document("pdf", "slow"):
+        busy_loop(0.05)
+
+    assert [path.name.split("_")[2] for path in tmp_path.iterdir()] == ["slow"]
+
+
+def test_disabled_or_unselected_documents_are_not_profiled(monkeypatch, tmp_path):
+    configure(monkeypatch, tmp_path, PROFILE_MODE=None, PROFILE_DOCUMENTS=("doc",))
+    with profile_document("pdf", "doc") as profile:
+        assert not profile.active
+
+    configure(monkeypatch, tmp_path, PROFILE_MODE="cprofile", PROFILE_DOCUMENTS=("other",))
+    with profile_document("pdf", "doc") as profile:
+        assert not profile.active
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,105 @@
+import numpy as np
+from src.entities import ContentType, Fragment
+from src.utils.reading_order import get_xy_cut_order
+from src.utils.xy_cut import (
+    _merge_column_bands,
+    _split_bands,
+    _split_columns,
+    split_by_gaps,
+    xy_cut_order,
+)
+
+
+def make_fragment(box, content_type=ContentType.TEXT) -> Fragment:
+    left, top, right, bottom = box
+    return Fragment(
+        fragment_id=None,
+        page_id=None,
+        page_number=1,
+        content_type=content_type,
+        order_number=None,
+        left=left,
+        top=top,
+        width=right,
+        height=bottom,
+        text=None,
+    )
+
+
+def test_split_by_gaps_groups_overlapping_intervals():
+    groups = split_by_gaps(np.array([50.0, 0.0, 10.0]), np.array([60.0, 20.0, 30.0]), 5.0)
+    assert [group.tolist() for group in groups] == [[1, 2], [0]]
+
+
+def test_single_column_is_top_to_bottom():
+    boxes = np.array([[50, 300, 550, 400], [50, 100, 550, 200], [50, 210, 550, 290]])
+    assert xy_cut_order(boxes).tolist() == [1, 2, 0]
+
+
+def test_two_columns_with_title_and_full_width_footnote():
+    boxes = [
+        (50, 400, 290, 600),  # 0: левая колонка, абзац 2
+        (50, 100, 550, 150),  # 1: заголовок на всю ширину
+        (310, 180, 550, 390),  # 2: правая колонка, абзац 1
+        (50, 180, 290, 380),  # 3: левая колонка, абзац 1
+        (310, 400, 550, 600),  # 4: правая колонка, абзац 2
+        (50, 700, 550, 750),  # 5: сноска на всю ширину
+    ]
+    assert xy_cut_order(np.array(boxes)).tolist() == [1, 3, 0, 2, 4, 5]
+
+
+def test_aligned_paragraph_gaps_do_not_interleave_columns():
+    boxes = [
+        (50, 100, 290, 300),
+        (50, 320, 290, 500),
+        (310, 100, 550, 280),
+        (310, 310, 550, 500),
+    ]
+    assert xy_cut_order(np.array(boxes)).tolist() == [0, 1, 2, 3]
+
+
+def test_columns_of_different_length_stay_together():
+    boxes = [
+        (50, 100, 290, 300),
+        (310, 100, 550, 300),
+        (50, 320, 290, 500),
+        (50, 520, 290, 700),
+    ]
+    assert xy_cut_order(np.array(boxes)).tolist() == [0, 2, 3, 1]
+
+
+def test_headers_and_footers_frame_the_body():
+    fragments = [
+        make_fragment((500, 1000, 540, 1020), ContentType.PAGE_FOOTER),
+        make_fragment((310, 100, 550, 900)),
+        make_fragment((50, 20, 200, 40), ContentType.PAGE_HEADER),
+        make_fragment((50, 100, 290, 900)),
+    ]
+    assert get_xy_cut_order(fragments) == [2, 3, 1, 0]
+
+
+def test_empty_page():
+    assert get_xy_cut_order([]) == []
+
+
+def test_merge_column_bands_matches_resplitting_each_candidate():
+    rng = np.random.default_rng(7)
+    for _ in range(200):
+        count = int(rng.integers(2, 30))
+        lefts = rng.choice([10.0, 120.0, 230.0], count) + rng.integers(0, 20, count)
+        tops = np.sort(rng.integers(0, 800, count)).astype(float)
+        widths = rng.choice([90.0, 200.0, 310.0], count, p=[0.8, 0.15, 0.05])
+        boxes = np.column_stack((lefts, tops, lefts + widths, tops + rng.integers(5, 30, count)))
+        bands = _split_bands(boxes, np.arange(count), 0.0)
+
+        # Прежняя реализация: каждая группа-кандидат заново делится на колонки
+        expected = [bands[0]]
+        for band in bands[1:]:
+            candidate = np.concatenate((expected[-1], band))
+            if len(_split_columns(boxes, candidate, 5.0)) > 1:
+                expected[-1] = candidate
+            else:
+                expected.append(band)
+
+        merged = _merge_column_bands(boxes, bands, 5.0)
+        assert [group.tolist() for group in merged] == [group.tolist() for group in expected]
@@ -0,0 +1,75 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from src.database.models import Base
+from src.entities import ContentType, Document, Fragment, Page, RecognizedFragment
+from src.repository import (
+    documents as doc_repo,
+    fragments as fragment_repo,
+    pages as page_repo,
+    recognized_fragments as recognized_repo,
+)
+
+
+def make_session() -> Session:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return Session(engine)
+
+
+def make_fragment(page_number, order_number, content_type=ContentType.TEXT) -> Fragment:
+    return Fragment(
+        fragment_id=None,
+        page_id=None,
+        page_number=page_number,
+        content_type=content_type,
+        order_number=order_number,
+        left=10,
+        top=20,
+        width=110,
+        height=60,
+        text=None,
+    )
+
+
+def test_entities_use_slots():
+    fragment = make_fragment(1, 0)
+    assert not hasattr(fragment, "__dict__")
+
+
+def test_core_round_trip_and_bulk_insert():
+    with make_session() as session:
+        doc = doc_repo.create_document(session, Document(None, "doc", "pdf"))
+        assert doc_repo.get_document_by_filename(session, "doc").document_id == doc.document_id
+
+        pages = [
+            page_repo.create_page(session, Page(None, doc.document_id, number, 150, 1240, 1754))
+            for number in (1, 2)
+        ]
+        fragments = []
+        for page in pages:
+            page_fragments = [make_fragment(page.number, 1), make_fragment(page.number, 0)]
+            for fragment in page_fragments:
+                fragment.page_id = page.page_id
+            fragments += fragment_repo.create_fragments(session, page_fragments)
+        fragments.append(make_fragment(2, 2, ContentType.PICTURE))
+        fragments[-1].page_id = pages[1].page_id
+        fragment_repo.create_fragment(session, fragments[-1])
+
+        assert len({f.fragment_id for f in fragments}) == 5
+        stored = fragment_repo.get_fragments_by_document_id(
+            session, doc.document_id, [ContentType.TEXT.value]
+        )
+        assert [(f.page_number, f.order_number) for f in stored] == [(1, 0), (1, 1), (2, 0), (2, 1)]
+        assert stored[0].fragment_id == fragments[1].fragment_id
+
+        recognized_repo.create_recognized_fragment(
+            session, RecognizedFragment(None, fragments[0].fragment_id, "qwen", "текст", None)
+        )
+        assert [r.text for r in recognized_repo.iter_recognized_fragments(session, "qwen")] == [
+            "текст"
+        ]
+        assert len(list(fragment_repo.iter_fragments(session, batch_size=2))) == 5
+
+        doc.is_success_processed = True
+        doc_repo.update_document_status(session, doc)
+        assert [d.filename for d in doc_repo.get_cut_documents(session)] == ["doc"]
@@ -0,0 +1,57 @@
+import json
+import logging
+from src.config import JsonFormatter, config_provider
+from src.utils.timing import read_spans, span, summarize_spans
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(JsonFormatter())
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def test_spans_are_logged_and_summarized():
+    handler = ListHandler()
+    base_logger = config_provider.get_base_logger()
+    base_logger.addHandler(handler)
+    try:
+        for page in range(1, 5):
+            with span("pdf.rasterize", document="doc", page=page) as page_span:
+                page_span.add(bytes=100, items=1)
+        try:
+            with span("layout.analyze", document="doc"):
+                raise RuntimeError("down")
+        except RuntimeError:
+            pass
+    finally:
+        base_logger.removeHandler(handler)
+
+    record = json.loads(handler.lines[0])["extra"]
+    assert record["context"] == {"document": "doc", "page": 1}
+    assert record["context_module"] == "src.utils.timing"
+
+    summary = summarize_spans(read_spans(handler.lines + ["not json"]))
+    assert summary["pdf.rasterize"]["count"] == 4
+    assert summary["pdf.rasterize"]["bytes"] == 400
+    assert summary["pdf.rasterize"]["p50_ms"] <= summary["pdf.rasterize"]["max_ms"]
+    assert summary["layout.analyze"]["errors"] == 1
+
+
+def test_debug_spans_reach_histogram_but_not_info_log():
+    handler = ListHandler()
+    handler.setLevel(logging.INFO)
+    base_logger = config_provider.get_base_logger()
+    base_logger.addHandler(handler)
+    try:
+        with span("image.encode", level=logging.DEBUG, key="doc/1") as encode_span:
+            encode_span.add(bytes=10, items=1)
+        with span("recognize.batch", fragment_ids=[1]):
+            pass
+    finally:
+        base_logger.removeHandler(handler)
+
+    assert [record["span"] for record in read_spans(handler.lines)] == ["recognize.batch"]
@@ -0,0 +1,48 @@
+import pytest
+from src.entities import ContentType
+from src.recognizers import token_budget
+from src.recognizers.token_budget import (
+    estimate_max_new_tokens,
+    get_pixel_bounds,
+    get_retry_budget,
+)
+
+
+@pytest.fixture(autouse=True)
+def budget_settings(monkeypatch):
+    for name, value in {
+        "TEXT_RECOGNIZER_PX_PER_TOKEN": 100,
+        "TEXT_RECOGNIZER_MIN_NEW_TOKENS": 32,
+        "TEXT_RECOGNIZER_MAX_NEW_TOKENS": 1024,
+        "TEXT_RECOGNIZER_TOKEN_FACTORS": {ContentType.FORMULA.value: 2.0},
+        "TEXT_RECOGNIZER_MIN_PIXELS": 100,
+        "TEXT_RECOGNIZER_MAX_PIXELS": 1000,
+        "TEXT_RECOGNIZER_PIXEL_BOUNDS": {ContentType.CAPTION.value: (10, 500)},
+    }.items():
+        monkeypatch.setattr(token_budget.settings, name, value)
+
+
+def test_budget_scales_with_area_and_content_type():
+    assert estimate_max_new_tokens(100, 100, ContentType.TEXT) == 100
+    assert estimate_max_new_tokens(200, 100, ContentType.TEXT) == 200
+    assert estimate_max_new_tokens(101, 100, None) == 101
+    assert estimate_max_new_tokens(100, 100, ContentType.FORMULA) == 200
+
+
+def test_budget_is_clamped_to_settings_bounds():
+    assert estimate_max_new_tokens(10, 10, ContentType.TEXT) == 32
+    assert estimate_max_new_tokens(-5, 100, ContentType.TEXT) == 32
+    assert estimate_max_new_tokens(2000, 2000, ContentType.TEXT) == 1024
+    assert estimate_max_new_tokens(1000, 1000, ContentType.FORMULA) == 1024
+
+
+def test_pixel_bounds_per_content_type():
+    assert get_pixel_bounds(ContentType.CAPTION) == (10, 500)
+    assert get_pixel_bounds(ContentType.TEXT) == (100, 1000)
+    assert get_pixel_bounds(None) == (100, 1000)
+
+
+def test_exhausted_budget_is_retried_with_maximum_once():
+    assert get_retry_budget(100, exhausted=True) == 1024
+    assert get_retry_budget(100, exhausted=False) is None
+    assert get_retry_budget(1024, exhausted=True) is None
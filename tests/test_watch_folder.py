@@ -0,0 +1,101 @@
+import os
+import threading
+from src.workflows.watch_folder import FolderWatcher, run_watch
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_file_is_ready_after_settle_period(tmp_path):
+    clock = FakeClock()
+    watcher = FolderWatcher(tmp_path, settle_s=3.0, clock=clock)
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF")
+    (tmp_path / "notes.txt").write_text("skip")
+
+    assert watcher.poll() == []
+    clock.now = 2.0
+    assert watcher.poll() == []
+
+    # файл еще дописывается: отсчет начинается заново
+    with open(pdf, "ab") as file:
+        file.write(b" more")
+    clock.now = 4.0
+    assert watcher.poll() == []
+    clock.now = 6.0
+    assert watcher.poll() == []
+    clock.now = 7.0
+    assert watcher.poll() == [pdf]
+    watcher.complete([pdf])
+    clock.now = 20.0
+    assert watcher.poll() == []
+
+
+def test_changed_file_is_emitted_again_and_empty_files_wait(tmp_path):
+    clock = FakeClock()
+    watcher = FolderWatcher(tmp_path, settle_s=1.0, clock=clock)
+    pdf, empty = tmp_path / "doc.pdf", tmp_path / "empty.pdf"
+    pdf.write_bytes(b"%PDF")
+    empty.write_bytes(b"")
+
+    watcher.poll()
+    clock.now = 1.0
+    assert watcher.poll() == [pdf]
+    watcher.complete([pdf])
+
+    pdf.write_bytes(b"%PDF new")
+    os.utime(pdf, (100, 100))
+    clock.now = 2.0
+    watcher.poll()
+    clock.now = 3.0
+    assert watcher.poll() == [pdf]
+
+
+def test_run_watch_retries_failed_batch_and_documents(tmp_path):
+    (tmp_path / "a.pdf").write_bytes(b"%PDF")
+    (tmp_path / "b.pdf").write_bytes(b"%PDF")
+    watcher = FolderWatcher(tmp_path, settle_s=0.0, retry_delay_s=0.0)
+    stop_event = threading.Event()
+    batches = []
+
+    def handle_batch(paths):
+        batches.append([path.name for path in paths])
+        if len(batches) == 1:
+            raise RuntimeError("analyzer unavailable")
+        if len(batches) == 2:
+            # b.pdf не загрузился: повторяется только он
+            return [tmp_path / "b.pdf"]
+        stop_event.set()
+        return []
+
+    run_watch(watcher, handle_batch, 0.01, stop_event)
+
+    assert batches == [["a.pdf", "b.pdf"], ["a.pdf", "b.pdf"], ["b.pdf"]]
+    assert watcher.poll() == []
+
+
+def test_retry_waits_for_delay(tmp_path):
+    clock = FakeClock()
+    watcher = FolderWatcher(tmp_path, settle_s=1.0, clock=clock, retry_delay_s=10.0)
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF")
+    watcher.poll()
+    clock.now = 1.0
+    assert watcher.poll() == [pdf]
+    # пока файл в работе, он не отдается повторно
+    clock.now = 5.0
+    assert watcher.poll() == []
+
+    watcher.retry([pdf])
+    clock.now = 15.0
+    assert watcher.poll() == []
+    clock.now = 16.0
+    assert watcher.poll() == [pdf]
+    watcher.complete([pdf])
+    clock.now = 100.0
+    assert watcher.poll() == []